@@ -1,13 +1,246 @@
-import numpy as np
+import hashlib
+import json
 import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Bump when the stats below change meaning; older cache entries are ignored
+STATS_VERSION = 2
+# Frames sampled across a clip for brightness / contrast
+VIDEO_SAMPLES = 8
+# Samples at or above this magnitude count as clipped
+CLIP_LEVEL = 0.999
+# Clipping is counted per window of this length (the feature index's audio
+# window), and only suggested when enough windows clip: a stray full-scale
+# sample isn't worth a gain change
+CLIP_WINDOW_S = 0.1
+CLIP_MIN_WINDOWS = 3
+CLIP_WINDOW_RATIO = 0.01
+# In-memory stats kept for this many files (least recently used dropped);
+# the disk cache still holds the rest
+STATS_MEMO_ENTRIES = 256
+
+_stats_memo = OrderedDict()  # cache path -> stats, oldest first
+_stats_lock = threading.Lock()
+
+
+# -----------------------------
+# STREAMING STATISTICS
+# -----------------------------
+def audio_stats(file_path, block_s=10.0):
+    # One streamed pass over the whole file at its real sample rate:
+    # loudness, peak, clipping and silence intervals together
+    import soundfile as sf
+
+    from backend.audio.processor import SilenceDetector
+
+    info = sf.info(file_path)
+    sr = info.samplerate
+    window = max(1, int(round(sr * CLIP_WINDOW_S)))
+    # Whole windows per block, so clip windows never straddle two blocks
+    blocksize = window * max(1, int(round(block_s / CLIP_WINDOW_S)))
+    detector = SilenceDetector(sr, min_silence_len=0.5)
+    pauses = []
+    sum_sq = 0.0
+    peak = 0.0
+    clipped = 0
+    clipped_windows = 0
+    samples = 0
+    for block in sf.blocks(file_path, blocksize=blocksize, always_2d=True):
+        # Clipping and peak per channel; loudness on the mono mix
+        flags = np.any(np.abs(block) >= CLIP_LEVEL, axis=1)
+        clipped += int(np.count_nonzero(flags))
+        if len(flags):
+            per_window = np.add.reduceat(flags, np.arange(0, len(flags), window))
+            clipped_windows += int(np.count_nonzero(per_window))
+        peak = max(peak, float(np.max(np.abs(block))) if len(block) else 0.0)
+        mono = block.mean(axis=1)
+        sum_sq += float(np.dot(mono, mono))
+        samples += len(mono)
+        pauses += detector.feed(mono)
+    pauses += detector.finish()
+
+    rms = np.sqrt(sum_sq / samples) if samples else 0.0
+    return {
+        "samplerate": sr,
+        "duration": samples / sr if sr else 0.0,
+        "rms_db": float(20 * np.log10(rms + 1e-9)),
+        "peak_db": float(20 * np.log10(peak + 1e-9)),
+        "clipped": clipped,
+        "clip_ratio": clipped / samples if samples else 0.0,
+        "clipped_windows": clipped_windows,
+        "pauses": [[a, b] for a, b in pauses],
+    }
+
+
+def video_stats(file_path, samples=VIDEO_SAMPLES):
+    # Brightness / contrast from frames spread over the clip, read through
+    # the shared frame server (pooled decoders, cached frames). With keyframe
+    # times available each sample lands on a keyframe, so reading it costs
+    # one decode instead of decoding forward from the previous one.
+    import cv2
+
+    from backend.video.frames import frame_server
+    from backend.video.segments import probe_keyframes
+
+    try:
+        info = frame_server.info(file_path)
+    except RuntimeError as e:
+        print(f"Error opening video for analysis: {e}")
+        return None
+    width, height = info["width"], info["height"]
+    fps, total = info["fps"], info["frames"]
+
+    # Evenly spaced targets, skipping the very first / last frames
+    if total > samples:
+        targets = [int(total * (i + 0.5) / samples) for i in range(samples)]
+    else:
+        targets = list(range(max(total, 1)))
+    keyframes = sorted(set(int(round(t * fps)) for t in probe_keyframes(file_path)))
+    if keyframes:
+        # Snap to a keyframe within two seconds, otherwise seek exactly
+        snapped = []
+        for t in targets:
+            k = min(keyframes, key=lambda k: abs(k - t))
+            snapped.append(k if abs(k - t) <= 2 * fps else t)
+        targets = sorted(set(snapped))
+
+    luma = []
+    contrast = []
+    for target in targets:
+        frame = frame_server.get(file_path, frame=target)
+        if frame is None:
+            continue
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        luma.append(float(gray.mean()))
+        contrast.append(float(gray.std()))
+
+    return {
+        "width": width,
+        "height": height,
+        "fps": fps,
+        "frames": total,
+        "brightness": float(np.mean(luma)) if luma else None,
+        "contrast": float(np.mean(contrast)) if contrast else None,
+        "samples": len(luma),
+    }
+
+
+def indexed_stats(summary):
+    # The same stats from the feature index's SQL aggregates (every frame,
+    # no decode, no per-row transfer)
+    stats = {
+        "video": {
+            "width": summary["width"],
+            "height": summary["height"],
+            "fps": summary["fps"],
+            "frames": summary["frames"],
+            "brightness": summary["luma"],
+            "contrast": summary["contrast"],
+            "samples": summary["frames"],
+        }
+        if summary["frames"]
+        else None,
+        "audio": None,
+    }
+    if summary["audio_windows"]:
+        stats["audio"] = {
+            "rms_db": float(20 * np.log10(np.sqrt(summary["audio_mean_sq"]) + 1e-9)),
+            "peak_db": float(20 * np.log10(summary["audio_peak"] + 1e-9)),
+            "clipped_windows": summary["audio_clipped_windows"],
+            "duration": summary["audio_windows"] * summary["audio_window_s"],
+        }
+    return stats
+
+
+def is_clipping(audio):
+    # Enough clipped windows, and a large enough share of the file, to
+    # suggest reducing the gain
+    windows = audio["duration"] / CLIP_WINDOW_S
+    clipped = audio.get("clipped_windows", 0)
+    return clipped >= CLIP_MIN_WINDOWS and clipped >= CLIP_WINDOW_RATIO * windows
+
+
+def _stats_path(file_path):
+    from backend.cache import cache_dir, file_identity
+
+    raw = json.dumps([list(file_identity(file_path)), STATS_VERSION])
+    key = hashlib.sha1(raw.encode()).hexdigest()
+    return os.path.join(cache_dir("analysis"), key + ".json")
+
+
+def _remember(path, stats):
+    with _stats_lock:
+        _stats_memo[path] = stats
+        _stats_memo.move_to_end(path)
+        while len(_stats_memo) > STATS_MEMO_ENTRIES:
+            _stats_memo.popitem(last=False)
+
+
+def media_stats(file_path, is_audio, is_video):
+    # Indexed videos read the feature index; everything else is streamed once
+    # and cached by file identity (path, size, mtime), in memory and on disk,
+    # so reopening a project doesn't re-analyse unchanged clips
+    from backend.features import get_summary
+
+    if is_video:
+        summary = get_summary(file_path, CLIP_LEVEL)
+        if summary is not None:
+            return indexed_stats(summary)
+
+    path = _stats_path(file_path)
+    with _stats_lock:
+        if path in _stats_memo:
+            _stats_memo.move_to_end(path)
+            return _stats_memo[path]
+    try:
+        with open(path) as f:
+            stats = json.load(f)
+        _remember(path, stats)
+        return stats
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Analysis cache read failed: {e}")
+
+    stats = {"audio": None, "video": None}
+    failed = False
+    if is_audio:
+        try:
+            stats["audio"] = audio_stats(file_path)
+        except Exception as e:
+            print(f"Audio analysis failed: {e}")
+            failed = True
+    if is_video:
+        try:
+            stats["video"] = video_stats(file_path)
+        except Exception as e:
+            print(f"Video analysis failed: {e}")
+            failed = True
+    if failed:
+        # Don't pin a transient failure (file still being written, decoder
+        # hiccup) to this identity: the next call retries
+        return stats
+
+    _remember(path, stats)
+    try:
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(stats, f)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"Analysis cache write failed: {e}")
+    return stats
 
 
 def analyze_media(file_path):
     suggestions = []
 
     try:
-        import cv2
-        import soundfile as sf
+        import cv2  # noqa: F401
+        import soundfile as sf  # noqa: F401
     except ImportError:
         # If libs missing, just return empty list or basic info
         return []
@@ -20,111 +253,101 @@ def analyze_media(file_path):
     is_video = ext in ["mp4", "mov", "avi", "mkv"]
     is_audio = ext in ["mp3", "wav", "aac", "m4a"]
 
-    # 1. Audio Analysis (for audio files only - soundfile can't read video containers)
-    if is_audio:
-        try:
-            # soundfile is faster than librosa for just metadata/reading
-            # But we want stats. Read first 30 seconds to be fast.
-            data, sr = sf.read(file_path, stop=30 * 48000)
-            if len(data.shape) > 1:
-                data = np.mean(data, axis=1)  # Convert to mono for analysis
+    stats = {"audio": None, "video": None}
+    if is_audio or is_video:
+        stats = media_stats(file_path, is_audio, is_video)
 
-            rms = np.sqrt(np.mean(data**2))
-            db = 20 * np.log10(rms + 1e-9)
+    # 1. Audio Analysis (whole-file levels; video files once indexed)
+    audio = stats["audio"]
+    if audio is not None:
+        db = audio["rms_db"]
+        if db < -40:
+            suggestions.append(
+                {
+                    "id": "low_audio",
+                    "title": "Fix Low Volume",
+                    "description": f"Audio levels constitute silence ({db:.1f}dB)",
+                    "action": "normalize_audio",
+                }
+            )
+        elif db > -5 or is_clipping(audio):
+            suggestions.append(
+                {
+                    "id": "clip_audio",
+                    "title": "Fix Clipping",
+                    "description": (
+                        f"Clipping in {audio['clipped_windows']} places "
+                        f"(peak {audio['peak_db']:.1f}dB)"
+                        if is_clipping(audio)
+                        else "Audio is peaking too high"
+                    ),
+                    "action": "reduce_gain",
+                }
+            )
+        else:
+            # Basic spectral centroid checks could go here for "muffled" audio if we used librosa
+            pass
+
+    # 2. Video Analysis
+    video = stats["video"]
+    if video is not None:
+        width = video["width"]
+        height = video["height"]
 
-            if db < -40:
+        # Check Resolution
+        if width < 1280:
+            suggestions.append(
+                {
+                    "id": "upscale",
+                    "title": "Upscale Video",
+                    "description": f"Low resolution ({int(width)}x{int(height)}) detected",
+                    "action": "upscale_ai",
+                }
+            )
+
+        # Brightness / contrast averaged over frames across the clip
+        brightness = video["brightness"]
+        if brightness is not None:
+            if brightness < 60:  # Increased threshold from 30 to 60 for more sensitivity
                 suggestions.append(
                     {
-                        "id": "low_audio",
-                        "title": "Fix Low Volume",
-                        "description": f"Audio levels constitute silence ({db:.1f}dB)",
-                        "action": "normalize_audio",
+                        "id": "brighten",
+                        "title": "Auto-Exposure",  # Renamed for clarity
+                        "description": "Optimize scene brightness",
+                        "action": "color_boost",
                     }
                 )
-            elif db > -5:
+
+            # Add Color Grade suggestion if not dark
+            elif brightness > 60:
                 suggestions.append(
                     {
-                        "id": "clip_audio",
-                        "title": "Fix Clipping",
-                        "description": "Audio is peaking too high",
-                        "action": "reduce_gain",
+                        "id": "color_grade",
+                        "title": "Auto Grade",
+                        "description": "Apply cinematic look",
+                        "action": "cinematic_grade",
                     }
                 )
-            else:
-                # Basic spectral centroid checks could go here for "muffled" audio if we used librosa
-                pass
-
-        except Exception as e:
-            print(f"Audio analysis failed: {e}")
-
-    # 2. Video Analysis
-    if is_video:
-        try:
-            # OpenCV file check
-            if not os.path.exists(file_path):
-                return suggestions  # Early exit
-
-            cap = cv2.VideoCapture(file_path)
-            if not cap.isOpened():
-                print(f"Error opening video for analysis: {file_path}")
-                # Don't crash, just proceed to default suggestions
-            else:
-                width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-                height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
-                fps = cap.get(cv2.CAP_PROP_FPS)
-
-                # Check Resolution
-                if width < 1280:
-                    suggestions.append(
-                        {
-                            "id": "upscale",
-                            "title": "Upscale Video",
-                            "description": f"Low resolution ({int(width)}x{int(height)}) detected",
-                            "action": "upscale_ai",
-                        }
-                    )
-
-                # Check Shaky Footage / Brightness (sample a few frames)
-                # Read 10th frame
-                cap.set(cv2.CAP_PROP_POS_FRAMES, 10)
-                ret, frame = cap.read()
-                if ret:
-                    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    brightness = np.mean(gray)
-
-                    if (
-                        brightness < 60
-                    ):  # Increased threshold from 30 to 60 for more sensitivity
-                        suggestions.append(
-                            {
-                                "id": "brighten",
-                                "title": "Auto-Exposure",  # Renamed for clarity
-                                "description": "Optimize scene brightness",
-                                "action": "color_boost",
-                            }
-                        )
-
-                    # Add Color Grade suggestion if not dark
-                    elif brightness > 60:
-                        suggestions.append(
-                            {
-                                "id": "color_grade",
-                                "title": "Auto Grade",
-                                "description": "Apply cinematic look",
-                                "action": "cinematic_grade",
-                            }
-                        )
-
-                cap.release()
-
-        except Exception as e:
-            print(f"Video analysis failed: {e}")
 
     # --- ENSURE MINIMUM 5-7 SUGGESTIONS ---
     # Add contextual suggestions if count is low
 
     # Check 3: Silence Removal (Always useful for speech)
-    if is_audio or is_video:
+    # For audio we know the actual pauses; video containers aren't readable
+    # by soundfile, so those keep the generic suggestion
+    pauses = audio.get("pauses") if audio is not None else None
+
+    if pauses:
+        total = sum(end - start for start, end in pauses)
+        suggestions.append(
+            {
+                "id": "silence_removal",
+                "title": "Remove Silence",
+                "description": f"Trim {len(pauses)} pauses > 500ms ({total:.1f}s)",
+                "action": "remove_silence",
+            }
+        )
+    elif pauses is None and (is_audio or is_video):
         suggestions.append(
             {
                 "id": "silence_removal",
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 import numpy as np
 import tkinter as tk
@@ -8,12 +8,20 @@ import shutil
 import time
 
 from backend.voice.whisper_engine import transcribe, transcribe_file
+from backend.voice import whisper_engine
 from backend.voice.intent import parse_intent, confidence_score
 from backend.voice.effects import apply_effect
 from backend.vision.screen_capture import capture_screen
 from backend.vision.ocr import extract_text
 from backend.audio.system_audio import record_system_audio
 from backend.analysis import analyze_media
+from backend.video.pipeline import (
+    VIDEO_ACTIONS,
+    RenderCancelled,
+    output_path_for,
+    render_actions,
+)
+from backend.jobs import jobs
 
 # ✅ CREATE APP FIRST
 app = FastAPI(title="AIVA Backend")
@@ -46,11 +54,49 @@ async def global_exception_handler(request: Request, exc: Exception):
 # -----------------------------
 # CORE ENDPOINTS
 # -----------------------------
+@app.on_event("startup")
+def preload_models():
+    # Load and warm up Whisper in the background so the first voice command
+    # after a restart doesn't wait for it; /health/voice reports when ready.
+    # AIVA_WHISPER_PRELOAD=0 restores lazy loading.
+    if os.environ.get("AIVA_WHISPER_PRELOAD", "1") == "0":
+        return
+    import threading
+
+    threading.Thread(target=whisper_engine.preload, daemon=True).start()
+
+
 @app.get("/")
 def root():
     return {"status": "AIVA backend running", "docs": "/docs"}
 
 
+@app.get("/health/voice")
+def voice_health():
+    return {"status": "success", **whisper_engine.model_status()}
+
+
+@app.post("/settings/voice_model")
+def set_voice_model(payload: dict):
+    # {"kind": "command"|"file", "size": "tiny"|"base"|"small"|"medium"|"large"}
+    kind = payload.get("kind", "command")
+    size = payload.get("size")
+    if kind not in ("command", "file"):
+        return {"status": "error", "message": f"Unknown model kind: {kind}"}
+    try:
+        whisper_engine.set_model_size(kind, size)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    if payload.get("preload", True):
+        import threading
+
+        threading.Thread(
+            target=whisper_engine.preload, args=([size],), daemon=True
+        ).start()
+    return {"status": "success", **whisper_engine.model_status()}
+
+
 # -----------------------------
 # VOICE & CONTEXT ENDPOINTS
 # -----------------------------
@@ -83,17 +129,48 @@ def safe_resample(audio, orig_sr, target_sr):
 
 
 @app.post("/voice")
-def voice(payload: dict):
+async def voice(request: Request):
+    # Accepts raw PCM (application/octet-stream, ?sr=&format=f32|s16&channels=)
+    # or a WAV/FLAC upload; a JSON {"audio": [...], "sr": ...} body still works
+    from starlette.concurrency import run_in_threadpool
+
     try:
-        audio_list = payload.get("audio")
-        if not audio_list:
-            return {"text": "", "intent": "UNKNOWN", "reason": "No audio data"}
+        content_type = request.headers.get("content-type", "")
+        params = request.query_params
+
+        if content_type.startswith("application/json"):
+            payload = await request.json()
+            audio_list = payload.get("audio")
+            if not audio_list:
+                return {"text": "", "intent": "UNKNOWN", "reason": "No audio data"}
+            # None entries become NaN here and are zeroed below
+            audio = np.array(audio_list, dtype=np.float32)
+            audio = np.nan_to_num(audio)
+            sr = payload.get("sr", 16000)
+        else:
+            from backend.audio.processor import decode_audio_bytes
+
+            body = await request.body()
+            if not body:
+                return {"text": "", "intent": "UNKNOWN", "reason": "No audio data"}
+            payload = dict(params)
+            audio, sr = decode_audio_bytes(
+                body,
+                content_type,
+                sr=int(params.get("sr", 16000)),
+                fmt=params.get("format", "f32"),
+                channels=int(params.get("channels", 1)),
+            )
+
+        # Transcription blocks, keep it off the event loop
+        return await run_in_threadpool(_voice_command, audio, sr, payload)
+    except Exception as e:
+        print(f"Voice handling error: {e}")
+        return {"text": "", "intent": "UNKNOWN", "reason": str(e), "error": True}
 
-        # Handle None/NaN in input list just in case
-        clean_list = [x if x is not None else 0.0 for x in audio_list]
-        audio = np.array(clean_list, dtype=np.float32)
 
-        sr = payload.get("sr", 16000)
+def _voice_command(audio, sr, payload):
+    try:
         wake_word = payload.get("wake_word", "").lower()
 
         # Resample safely and ensure float32
@@ -117,9 +194,12 @@ def voice(payload: dict):
 
         intent = parse_intent(text)
 
-        confidence = confidence_score(
-            intent, {"silence_ratio": payload.get("silence_ratio", 0.4)}
-        )
+        silence = payload.get("silence_ratio")
+        if silence is None:
+            from backend.audio.processor import detect_silence
+
+            silence = detect_silence(audio, 16000)
+        confidence = confidence_score(intent, {"silence_ratio": float(silence)})
 
         return {
             "text": text,
@@ -132,6 +212,118 @@ def voice(payload: dict):
         return {"text": "", "intent": "UNKNOWN", "reason": str(e), "error": True}
 
 
+@app.websocket("/voice/stream")
+async def voice_stream(ws: WebSocket):
+    # Streaming voice commands. The client may send a JSON config first
+    # ({"sr": 48000, "format": "f32"|"s16", "wake_word": ...}) and then raw
+    # PCM chunks as binary messages. A VAD cuts the stream into utterances;
+    # each one is transcribed as soon as it ends, and the utterance still in
+    # progress gets periodic partial transcripts.
+    import asyncio
+    import json
+
+    from starlette.concurrency import run_in_threadpool
+
+    from backend.voice.vad import StreamingVAD
+
+    await ws.accept()
+    config = {"sr": 16000, "format": "f32", "wake_word": ""}
+    vad = StreamingVAD(sr=config["sr"])
+    partial_interval = 1.0
+    last_partial = [0.0]
+    busy = asyncio.Lock()
+    # Set once the client is gone: nothing more may be sent
+    closed = [False]
+
+    async def send(message):
+        if not closed[0]:
+            await ws.send_json(message)
+
+    def transcribe_partial(audio, sr):
+        audio = safe_resample(audio, sr, 16000).astype(np.float32)
+        return transcribe(audio, 16000)
+
+    async def run_final(audio, sr):
+        async with busy:
+            result = await run_in_threadpool(_voice_command, audio, sr, config)
+        result["type"] = "final"
+        result["duration"] = round(len(audio) / sr, 2)
+        await send(result)
+
+    async def run_partial(audio, sr):
+        # Skip rather than queue: a stale partial is worthless
+        if busy.locked():
+            return
+        async with busy:
+            # Resampling runs in the pool too, off the event loop
+            text = await run_in_threadpool(transcribe_partial, audio, sr)
+        if text:
+            await send({"type": "partial", "text": text, "intent": parse_intent(text)})
+
+    tasks = set()
+
+    def spawn(coro):
+        task = asyncio.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    try:
+        while True:
+            message = await ws.receive()
+            if message["type"] == "websocket.disconnect":
+                closed[0] = True
+                break
+
+            if message.get("text") is not None:
+                try:
+                    update = json.loads(message["text"])
+                    if not isinstance(update, dict):
+                        raise ValueError("config must be a JSON object")
+                    sr = int(update.get("sr", config["sr"]))
+                    if sr <= 0:
+                        raise ValueError("sr must be positive")
+                except (ValueError, TypeError) as e:
+                    await send({"type": "error", "message": f"Invalid config: {e}"})
+                    continue
+                config.update(update)
+                config["sr"] = sr
+                vad = StreamingVAD(sr=sr)
+                await send({"type": "ready", "sr": sr})
+                continue
+
+            body = message.get("bytes") or b""
+            if config.get("format") == "s16":
+                chunk = np.frombuffer(body, dtype="<i2").astype(np.float32) / 32768.0
+            else:
+                chunk = np.frombuffer(body, dtype="<f4")
+
+            for kind, audio in vad.feed(chunk):
+                if kind == "start":
+                    last_partial[0] = time.time()
+                    await send({"type": "speech_start"})
+                else:
+                    spawn(run_final(audio, vad.sr))
+
+            current = vad.current()
+            if current is not None and time.time() - last_partial[0] > partial_interval:
+                last_partial[0] = time.time()
+                spawn(run_partial(current, vad.sr))
+    except WebSocketDisconnect:
+        closed[0] = True
+    finally:
+        # An utterance cut off by the end of the stream is still answered,
+        # unless the client has already gone
+        if not closed[0]:
+            for kind, audio in vad.flush():
+                if kind == "segment":
+                    try:
+                        await run_final(audio, vad.sr)
+                    except Exception:
+                        pass
+        for task in list(tasks):
+            task.cancel()
+
+
 @app.get("/context")
 def context():
     frame = capture_screen()
@@ -244,9 +436,204 @@ def analyze(payload: dict):
         return {"suggestions": []}
 
     suggestions = analyze_media(path)
+
+    # First look at a media file: ingest its features in the background so
+    # later analysis and scene detection read the index instead of decoding
+    if payload.get("index", True) and path.lower().endswith(MEDIA_EXTENSIONS):
+        from backend import features
+
+        if not features.is_indexed(path):
+            jobs.submit(
+                index_media, {"file_path": path, "action": "index"}, background=True
+            )
+
+    # ...and a scrubbing proxy for anything taller than the proxy height
+    if payload.get("proxy", AUTO_PROXY) and path.lower().endswith(VIDEO_EXTENSIONS):
+        from backend.video import proxy
+
+        if proxy.find_proxy(path) is None and proxy.needs_proxy(path):
+            jobs.submit(
+                proxy_media, {"file_path": path, "action": "proxy"}, background=True
+            )
+
     return {"suggestions": suggestions}
 
 
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv")
+MEDIA_EXTENSIONS = VIDEO_EXTENSIONS + (".mp3", ".wav", ".aac", ".m4a")
+AUTO_PROXY = os.environ.get("AIVA_PROXY_AUTO", "1") != "0"
+
+
+def index_media(payload, progress=None, cancel=None):
+    from backend import features
+
+    return features.ingest(
+        payload["file_path"],
+        progress=progress,
+        cancel=cancel,
+        force=payload.get("force", False),
+    )
+
+
+@app.post("/index")
+def submit_index(payload: dict):
+    # Explicit (re-)ingest into the feature index, run as a job
+    input_path = payload.get("file_path")
+    if not input_path or not os.path.exists(input_path):
+        return {"status": "error", "message": "File not found"}
+
+    job = jobs.submit(index_media, {**payload, "action": "index"}, background=True)
+    return {"status": "success", "job_id": job.id, "job": job.to_dict()}
+
+
+def proxy_media(payload, progress=None, cancel=None):
+    from backend.video import proxy
+
+    path = proxy.generate_proxy(
+        payload["file_path"],
+        height=payload.get("height"),
+        progress=progress,
+        cancel=cancel,
+    )
+    return {"status": "success", "output_file": path, "proxy_file": path}
+
+
+@app.post("/proxy")
+def submit_proxy(payload: dict):
+    # Build (or reuse) a low-resolution proxy in the background
+    input_path = payload.get("file_path")
+    if not input_path or not os.path.exists(input_path):
+        return {"status": "error", "message": "File not found"}
+
+    job = jobs.submit(proxy_media, {**payload, "action": "proxy"}, background=True)
+    return {"status": "success", "job_id": job.id, "job": job.to_dict()}
+
+
+@app.get("/proxy")
+def get_proxy(file_path: str, height: int = None):
+    from backend.video import proxy
+
+    if not os.path.exists(file_path):
+        return {"status": "error", "message": "File not found"}
+    path = proxy.find_proxy(file_path, height)
+    return {"status": "success", "ready": path is not None, "proxy_file": path}
+
+
+@app.get("/frame")
+def frame(
+    file_path: str,
+    t: float = None,
+    index: int = None,
+    width: int = None,
+    height: int = None,
+    format: str = "jpeg",
+    quality: int = 85,
+):
+    # One frame at a time (seconds) or index, scaled to fit width/height.
+    # format=raw returns BGR bytes with the shape in X- headers.
+    from fastapi.responses import Response
+
+    from backend.video.frames import encode, frame_server, resize
+
+    if not os.path.exists(file_path):
+        return JSONResponse(status_code=404, content={"status": "error", "message": "File not found"})
+    try:
+        image = frame_server.get(file_path, time=t, frame=index)
+        if image is None:
+            return JSONResponse(status_code=404, content={"status": "error", "message": "Frame not available"})
+        image = resize(image, width, height)
+        data, media_type = encode(image, format, quality)
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+
+    return Response(
+        content=data,
+        media_type=media_type,
+        headers={
+            "X-Width": str(image.shape[1]),
+            "X-Height": str(image.shape[0]),
+            "X-Channels": str(image.shape[2] if image.ndim > 2 else 1),
+            "X-Frame-Index": str(frame_server.frame_index(file_path, t, index)),
+        },
+    )
+
+
+@app.get("/frames/strip")
+def frame_strip(
+    file_path: str,
+    count: int = 10,
+    height: int = 90,
+    start: float = None,
+    end: float = None,
+    format: str = "jpeg",
+    quality: int = 80,
+):
+    # Timeline thumbnails: `count` frames side by side in one image
+    from fastapi.responses import Response
+
+    from backend.video.frames import encode, frame_server, resize
+
+    if not os.path.exists(file_path):
+        return JSONResponse(status_code=404, content={"status": "error", "message": "File not found"})
+    try:
+        count = max(1, min(count, 200))
+        times, images = frame_server.strip(file_path, count, start, end)
+        tiles = [resize(img, height=height) if img is not None else None for img in images]
+        decoded = [tile for tile in tiles if tile is not None]
+        if not decoded:
+            return JSONResponse(status_code=404, content={"status": "error", "message": "No frames decoded"})
+        # Undecodable positions are filled with black tiles of the same size
+        tiles = [tile if tile is not None else np.zeros_like(decoded[0]) for tile in tiles]
+        data, media_type = encode(np.hstack(tiles), format, quality)
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+
+    return Response(
+        content=data,
+        media_type=media_type,
+        headers={
+            "X-Count": str(len(tiles)),
+            "X-Tile-Width": str(tiles[0].shape[1]),
+            "X-Tile-Height": str(tiles[0].shape[0]),
+            "X-Times": ",".join(f"{t:.3f}" for t in times),
+        },
+    )
+
+
+@app.get("/waveform")
+def waveform(file_path: str, level: int = 1024, start: int = 0, count: int = None):
+    # Min/max peaks as raw little-endian int16 (min, max) pairs, one pair per
+    # `level` samples. The pyramid is built on first request and cached.
+    from fastapi.responses import Response
+
+    from backend.audio import waveform as peaks
+
+    if not os.path.exists(file_path):
+        return JSONResponse(status_code=404, content={"status": "error", "message": "File not found"})
+
+    try:
+        path = peaks.build_peaks(file_path)
+        header, start, count, data = peaks.read_level(path, level, start, count)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={
+            "X-Sample-Rate": str(header["samplerate"]),
+            "X-Total-Samples": str(header["samples"]),
+            "X-Samples-Per-Bin": str(level),
+            "X-Bin-Start": str(start),
+            "X-Bin-Count": str(count),
+            "X-Total-Bins": str(header["levels"][level][0]),
+            "X-Levels": ",".join(str(spb) for spb in sorted(header["levels"])),
+        },
+    )
+
+
 @app.post("/project/save")
 def save_project(payload: dict):
     path = payload.get("path")
@@ -313,6 +700,10 @@ def export(payload: dict):
 
 @app.post("/apply")
 def apply(payload: dict):
+    return run_action(payload)
+
+
+def run_action(payload, progress=None, cancel=None):
     action = payload.get("action")
     input_path = payload.get("file_path")
 
@@ -320,6 +711,7 @@ def apply(payload: dict):
         return {"status": "error", "message": "File not found"}
 
     output_path = input_path  # Default to overwrite or same if no change
+    used_proxy = False
 
     try:
         if action == "voice_changer":
@@ -330,43 +722,27 @@ def apply(payload: dict):
             apply_effect(input_path, output_path, effect_type)
 
         elif action == "remove_silence":
-            import soundfile as sf
-
-            data, sr = sf.read(input_path)
-            # Simple energy-based silence removal
-            # Frame size: 25ms, Hop: 10ms
-            frame_len = int(sr * 0.025)
-            hop_len = int(sr * 0.010)
-
-            # Calculate energy
-            energy = np.array(
-                [
-                    np.sum(np.abs(data[i : i + frame_len]) ** 2)
-                    for i in range(0, len(data), hop_len)
-                ]
-            )
-            # Threshold: 10% of mean energy (heuristic)
-            thresh = np.mean(energy) * 0.1
-
-            # Mask chunks
-            keep_mask = np.repeat(energy > thresh, hop_len)
-            # Handle length mismatch due to repeat
-            if len(keep_mask) > len(data):
-                keep_mask = keep_mask[: len(data)]
-            else:
-                keep_mask = np.pad(
-                    keep_mask, (0, len(data) - len(keep_mask)), "constant"
-                )
-
-            clean_data = data[keep_mask]
-
-            clean_data = data[keep_mask]
+            # Energy-based silence removal (25 ms frames, 10 ms hops),
+            # streamed in blocks so long recordings never load fully.
+            # context.mode == "intervals" cuts whole pauses instead, with
+            # minimum length and padding around speech
+            from backend.audio.processor import remove_silence, remove_silence_energy
 
             name, ext = os.path.splitext(input_path)
             output_path = f"{name}_nosilence_{int(time.time())}{ext}"
             # Ensure folder exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            sf.write(output_path, clean_data, sr)
+            context = payload.get("context", {})
+            if context.get("mode") == "intervals":
+                remove_silence(
+                    input_path,
+                    output_path,
+                    threshold=context.get("threshold", 0.01),
+                    min_silence_len=context.get("min_silence_len", 0.5),
+                    keep_padding=context.get("keep_padding", 0.1),
+                )
+            else:
+                remove_silence_energy(input_path, output_path)
 
         elif action == "enhance_audio":
             # Call the enhance logic internally or reimplement
@@ -392,72 +768,36 @@ def apply(payload: dict):
             output_path = f"{name}_enhanced_{int(time.time())}{ext}"
             sf.write(output_path, clean_data, sr)
 
-        elif action == "stabilize_video":
-            # Simulation: We can't easily do robust stabilization without heavy calc time
-            # But we can verify it "ran".
-            import cv2
-
-            cap = cv2.VideoCapture(input_path)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            # Use mp4v for better OpenCV compatibility
-            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-            name, ext = os.path.splitext(input_path)
-            # Use .mp4 extension
-            output_path = f"{name}_stable_{int(time.time())}.mp4"
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-            # Pass-through with 5% crop to simulate "stabilization zoom"
-            margin_w = int(width * 0.05)
-            margin_h = int(height * 0.05)
-
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                # Crop center
-                crop = frame[margin_h : height - margin_h, margin_w : width - margin_w]
-                # Resize back
-                stable = cv2.resize(crop, (width, height))
-                out.write(stable)
-
-            cap.release()
-            out.release()
-
-        elif action == "smart_crop":
-            # Center crop 9:16 for social
-            import cv2
-
-            cap = cv2.VideoCapture(input_path)
-            h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            # Target 9:16 width
-            target_w = int(h * 9 / 16)
-            center_x = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) / 2)
-
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-            name, ext = os.path.splitext(input_path)
-            output_path = f"{name}_9x16_{int(time.time())}.mp4"
-            # Output is strictly vertical
-            out = cv2.VideoWriter(output_path, fourcc, fps, (target_w, h))
-
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                # Center slice
-                x1 = max(0, center_x - target_w // 2)
-                x2 = x1 + target_w
-                crop = frame[:, x1:x2]
-                if crop.shape[1] != target_w:
-                    crop = cv2.resize(crop, (target_w, h))
-
-                out.write(crop)
-
-            cap.release()
-            out.release()
+        elif action == "chain" or action in VIDEO_ACTIONS:
+            # Fused video pipeline: a chain of actions shares one decode/encode
+            actions = payload.get("actions", []) if action == "chain" else [action]
+            source = input_path
+            if payload.get("preview"):
+                # Preview renders run on the proxy when one is ready; final
+                # renders (no "preview" flag) always use the original
+                from backend.video import proxy
+
+                source = proxy.find_proxy(input_path) or input_path
+                used_proxy = source != input_path
+                if not used_proxy and proxy.needs_proxy(input_path):
+                    jobs.submit(
+                        proxy_media,
+                        {"file_path": input_path, "action": "proxy"},
+                        background=True,
+                    )
+            # Named after the original even when rendering from the proxy:
+            # outputs must not land in the proxy cache, where eviction
+            # counts (and deletes) them
+            output_path = render_actions(
+                source,
+                actions,
+                parallel=payload.get("parallel", False),
+                workers=payload.get("workers"),
+                progress=progress,
+                cancel=cancel,
+                options=payload.get("context", {}),
+                output_path=output_path_for(input_path, actions),
+            )
 
         elif action in ["normalize_audio", "reduce_gain", "audio_normalize"]:
             # Real implementation: Simple gain adjustment
@@ -475,134 +815,6 @@ def apply(payload: dict):
                 output_path = f"{name}_norm_{int(time.time())}{ext}"
                 sf.write(output_path, data, sr)
 
-        elif action == "color_boost":
-            # Real implementation: Gamma correction
-            import cv2
-
-            cap = cv2.VideoCapture(input_path)
-            if cap.isOpened():
-                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-                name, ext = os.path.splitext(input_path)
-                output_path = f"{name}_bright_{int(time.time())}.mp4"
-                out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-                while True:
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-                    # Simple brightness increase
-                    frame = cv2.convertScaleAbs(frame, alpha=1.2, beta=30)
-                    out.write(frame)
-
-                cap.release()
-                out.release()
-
-        elif action == "smart_enhance":
-            # Real implementation: Detail enhancement (Sharpening) + Contrast
-            import cv2
-
-            cap = cv2.VideoCapture(input_path)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-            name, ext = os.path.splitext(input_path)
-            output_path = f"{name}_enhanced_{int(time.time())}.mp4"
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                # Sharpen
-                gaussian = cv2.GaussianBlur(frame, (9, 9), 10.0)
-                frame = cv2.addWeighted(frame, 1.5, gaussian, -0.5, 0, frame)
-
-                # Contrast
-                frame = cv2.convertScaleAbs(frame, alpha=1.1, beta=5)
-
-                out.write(frame)
-            cap.release()
-            out.release()
-
-        elif action == "cinematic_grade":
-            # Real implementation: Teal & Orange Look
-            # We can't do full LUT easily without file, but we can push channel values
-            import cv2
-
-            cap = cv2.VideoCapture(input_path)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-            name, ext = os.path.splitext(input_path)
-            output_path = f"{name}_cine_{int(time.time())}.mp4"
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                # Split channels (B, G, R)
-                b, g, r = cv2.split(frame)
-
-                # Push Shadows to Teal (Blue/Green), Highlights to Orange (Red/Green)
-                # Very rough approximation
-
-                # Boost Blue in shadows
-                b = cv2.add(b, 30)
-                # Boost Red in highlights?
-                # Let's just do a global shift for 'look'
-                # Reduce Green slightly
-                g = cv2.subtract(g, 10)
-                # Boost Red
-                r = cv2.add(r, 20)
-
-                frame = cv2.merge((b, g, r))
-
-                out.write(frame)
-            cap.release()
-            out.release()
-
-        elif action == "upscale_ai":
-            # Real implementation: Cubic Interpolation 2x
-            import cv2
-
-            cap = cv2.VideoCapture(input_path)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-            name, ext = os.path.splitext(input_path)
-            output_path = f"{name}_2x_{int(time.time())}.mp4"
-
-            # Target 2x
-            target_w = width * 2
-            target_h = height * 2
-
-            out = cv2.VideoWriter(output_path, fourcc, fps, (target_w, target_h))
-
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                upscaled = cv2.resize(
-                    frame, (target_w, target_h), interpolation=cv2.INTER_CUBIC
-                )
-                # Slight sharpen to fake 'AI'
-                gaussian = cv2.GaussianBlur(upscaled, (9, 9), 10.0)
-                upscaled = cv2.addWeighted(upscaled, 1.5, gaussian, -0.5, 0, upscaled)
-
-                out.write(upscaled)
-            cap.release()
-            out.release()
-
         elif action == "generate_captions":
             # Transcription via apply endpoint
             text = transcribe_file(input_path)
@@ -616,46 +828,8 @@ def apply(payload: dict):
                 # No output file change for captions typically
             }
 
-        elif action == "extend_scene":
-            # Simulate "Generative Extension"
-            # We will just duplicate the last 1 second of video to make it longer
-            import cv2
-
-            cap = cv2.VideoCapture(input_path)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-
-            name, ext = os.path.splitext(input_path)
-            output_path = f"{name}_extended_{int(time.time())}.mp4"
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-            if not out.isOpened():
-                cap.release()
-                return {
-                    "status": "error",
-                    "message": "Could not open video writer for output. Check codec compatibility.",
-                }
-
-            frames = []
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                out.write(frame)
-                frames.append(frame)
-
-            # Append last 1 second (approx 30 frames or fps)
-            if frames:
-                last_frame = frames[-1]
-                count = int(fps)  # 1 second
-                for _ in range(count):
-                    out.write(last_frame)
-
-            cap.release()
-            out.release()
-
+    except RenderCancelled:
+        raise
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -663,9 +837,92 @@ def apply(payload: dict):
         "status": "success",
         "output_file": output_path,
         "action_taken": action,
+        "preview": used_proxy,
     }
 
 
+# -----------------------------
+# JOB ENDPOINTS
+# -----------------------------
+@app.post("/jobs")
+def submit_job(payload: dict):
+    # Same payload as /apply, but returns immediately with a job ID
+    input_path = payload.get("file_path")
+    if not input_path or not os.path.exists(input_path):
+        return {"status": "error", "message": "File not found"}
+
+    job = jobs.submit(run_action, payload)
+    return {"status": "success", "job_id": job.id, "job": job.to_dict()}
+
+
+@app.get("/jobs")
+def list_jobs():
+    return {"status": "success", "jobs": [j.to_dict() for j in jobs.list()]}
+
+
+@app.get("/jobs/events")
+async def job_events():
+    # One Server-Sent Events stream multiplexing progress for every job
+    import asyncio
+    import json
+
+    from fastapi.responses import StreamingResponse
+
+    q = jobs.subscribe()
+
+    async def stream():
+        try:
+            # Snapshot first so a fresh subscriber knows what is in flight
+            for job in jobs.list():
+                yield f"event: job\ndata: {json.dumps(job.event('snapshot'))}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(q.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keep-alive comment for proxies and idle connections
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: job\ndata: {json.dumps(event)}\n\n"
+        finally:
+            jobs.unsubscribe(q)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return {"status": "error", "message": "Job not found"}
+    return {"status": "success", "job": job.to_dict()}
+
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    job = jobs.cancel(job_id)
+    if job is None:
+        return {"status": "error", "message": "Job not found"}
+    return {"status": "success", "job": job.to_dict()}
+
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return {"status": "error", "message": "Job not found"}
+    if job.state in ("queued", "running"):
+        return {"status": "pending", "job": job.to_dict()}
+    if job.state == "cancelled":
+        return {"status": "error", "message": "Job was cancelled", "job": job.to_dict()}
+    if job.result is None:
+        return {"status": "error", "message": job.error, "job": job.to_dict()}
+    return job.result
+
+
 @app.post("/ai/transcribe")
 def ai_transcribe(payload: dict):
     path = payload.get("file_path")
@@ -679,6 +936,35 @@ def ai_transcribe(payload: dict):
         return {"status": "error", "message": str(e)}
 
 
+@app.post("/ai/transcribe_long")
+def ai_transcribe_long(payload: dict):
+    # Long-form transcription streamed as NDJSON: one {"type": "segment"}
+    # line per segment as its window finishes, then {"type": "done"}
+    import json
+
+    from fastapi.responses import StreamingResponse
+
+    from backend.voice.long_form import WORKERS, transcribe_long
+
+    path = payload.get("file_path")
+    if not path or not os.path.exists(path):
+        return {"status": "error", "message": "File not found"}
+
+    def stream():
+        items = transcribe_long(path, workers=payload.get("workers", WORKERS))
+        try:
+            for item in items:
+                yield json.dumps(item) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "message": str(e)}) + "\n"
+        finally:
+            # Client disconnects close this generator; pass that on so the
+            # workers and the ffmpeg decoder stop as well
+            items.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 # -----------------------------
 # AI FEATURES
 # -----------------------------
@@ -722,51 +1008,39 @@ def enhance_audio(payload: dict):
 
 @app.post("/ai/scene_detect")
 def scene_detect(payload: dict):
-    # Real implementation: Detect significant changes in luminance variance
-    import cv2
+    # Real implementation: Detect significant changes in hue histograms.
+    # mode "fast" (default) scores every `stride`-th frame on a thumbnail
+    # and decodes densely only around candidate cuts; "full" scores every
+    # frame at full resolution. Whole files are scanned in both modes;
+    # long ones are split into time ranges across `workers` processes.
+    from urllib.parse import quote
+
+    from backend.vision.scenes import detect_scenes
 
     input_path = payload.get("file_path")
     if not input_path or not os.path.exists(input_path):
         return {"status": "error", "message": "File not found"}
 
     try:
-        cap = cv2.VideoCapture(input_path)
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        prev_hist = None
-        scenes = []
-        frame_idx = 0
-        last_cut = 0
-
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            # Use HSV histogram comparison for speed/accuracy
-            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-            hist = cv2.calcHist([hsv], [0], None, [180], [0, 180])
-            cv2.normalize(hist, hist, 0, 1, cv2.NORM_MINMAX)
-
-            if prev_hist is not None:
-                # Correlation check
-                score = cv2.compareHist(prev_hist, hist, cv2.HISTCMP_CORREL)
-                # If correlation drops below threshold, it's a scene change
-                if score < 0.6 and (frame_idx - last_cut) > fps:  # Min 1 sec duration
-                    scenes.append({"time": frame_idx / fps, "frame": frame_idx})
-                    last_cut = frame_idx
-
-            prev_hist = hist
-            frame_idx += 1
-            if frame_idx > 5000:
-                break  # Safety limit for now
+        scenes, frames = detect_scenes(
+            input_path,
+            mode=payload.get("mode", "fast"),
+            stride=payload.get("stride", 5),
+            width=payload.get("width", 160),
+            workers=payload.get("workers"),
+        )
 
-        cap.release()
+        # Preview thumbnails come from the frame server on demand
+        for scene in scenes:
+            scene["thumbnail"] = (
+                f"/frame?file_path={quote(input_path)}&index={scene['frame']}&width=320"
+            )
 
         return {
             "status": "success",
             "scenes": scenes if scenes else "No scene changes detected",
             "count": len(scenes),
+            "frames_scanned": frames,
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
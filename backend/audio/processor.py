@@ -1,6 +1,7 @@
 import numpy as np
 import soundfile as sf
 import os
+import io
 
 
 def normalize_audio(input_path: str, output_path: str):
@@ -13,26 +14,268 @@ def normalize_audio(input_path: str, output_path: str):
     return output_path
 
 
+class SilenceDetector:
+    # Streaming silence detector. Feed blocks of samples in order and get
+    # back closed (start, end) silence intervals in seconds.
+    #  - 10 ms frames are scored by RMS, vectorised per block
+    #  - hysteresis: silence starts below `threshold` and only ends once a
+    #    frame rises above threshold * release, so a level hovering around
+    #    the threshold doesn't flicker
+    #  - pauses shorter than min_silence_len are ignored
+    #  - keep_padding seconds next to sound are left in place so cuts don't
+    #    clip word onsets and tails
+    def __init__(
+        self,
+        samplerate,
+        threshold=0.01,
+        release=2.0,
+        min_silence_len=0.5,
+        keep_padding=0.1,
+        frame_s=0.01,
+    ):
+        self.sr = samplerate
+        self.frame_len = max(1, int(samplerate * frame_s))
+        self.low = threshold
+        self.high = threshold * release
+        self.min_frames = int(round(min_silence_len / frame_s))
+        self.pad = int(round(keep_padding * samplerate))
+
+        self.pending = np.zeros(0)
+        self.frames = 0  # frames scored so far
+        self.silent = False
+        self.open_start = None  # frame index where current silence began
+        self.samples = 0
+
+    def feed(self, data):
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim > 1:
+            data = data.mean(axis=1)
+        self.samples += len(data)
+        buf = np.concatenate([self.pending, data])
+        n = len(buf) // self.frame_len
+        self.pending = buf[n * self.frame_len :]
+        if n == 0:
+            return []
+        frames = buf[: n * self.frame_len].reshape(n, self.frame_len)
+        return self._score(np.sqrt(np.mean(frames**2, axis=1)))
+
+    def finish(self):
+        intervals = []
+        if len(self.pending):
+            level = np.sqrt(np.mean(self.pending**2))
+            self.pending = np.zeros(0)
+            intervals += self._score(np.array([level]))
+        if self.silent and self.open_start is not None:
+            intervals += self._close(self.open_start, self.frames, at_end=True)
+            self.open_start = None
+        return intervals
+
+    def _score(self, levels):
+        n = len(levels)
+        # Hysteresis without a Python loop: each frame takes the state of
+        # the most recent frame that crossed a threshold (or the carried
+        # state when none has yet)
+        event = np.full(n, -1, dtype=np.int8)
+        event[levels > self.high] = 0
+        event[levels < self.low] = 1
+        last = np.where(event >= 0, np.arange(n), -1)
+        np.maximum.accumulate(last, out=last)
+        silent = np.where(last >= 0, event[np.maximum(last, 0)], int(self.silent))
+
+        # Run boundaries, including the state carried over from the last block
+        prev = np.concatenate([[int(self.silent)], silent[:-1]])
+        starts = np.nonzero((silent == 1) & (prev == 0))[0]
+        ends = np.nonzero((silent == 0) & (prev == 1))[0]
+
+        intervals = []
+        open_start = self.open_start
+        events = sorted([(i, 1) for i in starts] + [(i, 0) for i in ends])
+        for i, kind in events:
+            if kind == 1:
+                open_start = self.frames + i
+            elif open_start is not None:
+                intervals += self._close(open_start, self.frames + i)
+                open_start = None
+
+        self.open_start = open_start
+        self.silent = bool(silent[-1])
+        self.frames += n
+        return intervals
+
+    def _close(self, start_frame, end_frame, at_end=False):
+        if end_frame - start_frame < self.min_frames:
+            return []
+        start = start_frame * self.frame_len
+        end = self.samples if at_end else end_frame * self.frame_len
+        # No padding against the file edges, only next to sound
+        if start > 0:
+            start += self.pad
+        if not at_end:
+            end -= self.pad
+        if end <= start:
+            return []
+        return [(float(start / self.sr), float(end / self.sr))]
+
+
+def _blocks(source, samplerate=None, block_s=10.0):
+    # Blocks from a file path (streamed) or an in-memory array
+    if isinstance(source, (str, os.PathLike)):
+        info = sf.info(source)
+        block = int(info.samplerate * block_s)
+        return info.samplerate, sf.blocks(source, blocksize=block)
+    block = int(samplerate * block_s)
+    return samplerate, (source[i : i + block] for i in range(0, len(source), block))
+
+
+def detect_silence_intervals(source, samplerate=None, block_s=10.0, **options):
+    # One O(n) pass over a file or array -> [(start_s, end_s), ...]
+    sr, blocks = _blocks(source, samplerate, block_s)
+    detector = SilenceDetector(sr, **options)
+    intervals = []
+    for block in blocks:
+        intervals += detector.feed(block)
+    intervals += detector.finish()
+    return intervals
+
+
+def silence_ratio(intervals, duration):
+    if duration <= 0:
+        return 0.0
+    return min(1.0, sum(end - start for start, end in intervals) / duration)
+
+
 def detect_silence(data, samplerate, threshold=0.01, min_silence_len=0.5):
-    # Basic silence detection logic
-    abs_data = np.abs(data)
-    if len(abs_data.shape) > 1:
-        abs_data = np.mean(abs_data, axis=1)
+    # Fraction of the clip inside silence intervals
+    intervals = detect_silence_intervals(
+        data, samplerate, threshold=threshold, min_silence_len=min_silence_len
+    )
+    return silence_ratio(intervals, len(data) / samplerate)
 
-    is_silent = abs_data < threshold
-    # Simplified: return ratio
-    return np.mean(is_silent)
 
+def remove_silence(
+    input_path: str,
+    output_path: str,
+    threshold=0.01,
+    min_silence_len=0.5,
+    keep_padding=0.1,
+    block_s=10.0,
+):
+    # Cut whole silence intervals (not individual quiet samples), streaming
+    # the file twice: once to find the intervals, once to copy the rest
+    intervals = detect_silence_intervals(
+        input_path,
+        threshold=threshold,
+        min_silence_len=min_silence_len,
+        keep_padding=keep_padding,
+        block_s=block_s,
+    )
 
-def remove_silence(input_path: str, output_path: str, threshold=0.01):
-    data, samplerate = sf.read(input_path)
-    abs_data = np.abs(data)
-    if len(abs_data.shape) > 1:
-        abs_data_mono = np.mean(abs_data, axis=1)
-    else:
-        abs_data_mono = abs_data
+    with sf.SoundFile(input_path) as src:
+        sr = src.samplerate
+        cuts = [(int(round(a * sr)), int(round(b * sr))) for a, b in intervals]
+        step = int(sr * block_s)
+        with sf.SoundFile(output_path, "w", samplerate=sr, channels=src.channels) as dst:
+            start = 0
+            k = 0
+            while True:
+                data = src.read(step)
+                if len(data) == 0:
+                    break
+                end = start + len(data)
+                keep = np.ones(len(data), dtype=bool)
+                # Intervals are sorted, so advance a cursor instead of rescanning
+                while k < len(cuts) and cuts[k][1] <= start:
+                    k += 1
+                j = k
+                while j < len(cuts) and cuts[j][0] < end:
+                    a, b = cuts[j]
+                    keep[max(a, start) - start : min(b, end) - start] = False
+                    j += 1
+                dst.write(data[keep])
+                start = end
+    return output_path
+
+
+def frame_energies(input_path, frame_s=0.025, hop_s=0.010, block_s=10.0):
+    # Energy of every frame_s window at hop_s steps, read in blocks so only
+    # one block is in memory. Channels are averaged into per-sample power
+    # first; sums run over strided windows instead of a Python loop.
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    with sf.SoundFile(input_path) as f:
+        sr = f.samplerate
+        frame_len = int(sr * frame_s)
+        hop_len = int(sr * hop_s)
+        step = max(hop_len, int(sr * block_s) // hop_len * hop_len)
+
+        chunks = []
+        carry = np.zeros(0)
+        while True:
+            data = f.read(step, dtype="float64", always_2d=True)
+            eof = len(data) < step
+            power = np.concatenate([carry, np.mean(data**2, axis=1)])
+
+            if eof:
+                # Trailing frames run past the end; zero padding keeps
+                # their (truncated) sums unchanged
+                n = -(-len(power) // hop_len)
+                need = (n - 1) * hop_len + frame_len if n else 0
+                power = np.pad(power, (0, max(0, need - len(power))))
+            else:
+                n = max(0, (len(power) - frame_len) // hop_len + 1)
+
+            if n:
+                windows = sliding_window_view(power, frame_len)[::hop_len][:n]
+                chunks.append(windows.sum(axis=1))
+            carry = power[n * hop_len :]
+            if eof:
+                break
 
-    mask = abs_data_mono > threshold
-    processed = data[mask]
-    sf.write(output_path, processed, samplerate)
+    energy = np.concatenate(chunks) if chunks else np.zeros(0)
+    return energy, sr, hop_len
+
+
+def remove_silence_energy(input_path, output_path, ratio=0.1, block_s=10.0):
+    # Drop 10 ms hops whose 25 ms frame energy is below ratio * mean energy.
+    # Two streaming passes (energies, then filtered copy) keep memory flat
+    # for multi-hour recordings.
+    energy, sr, hop_len = frame_energies(input_path, block_s=block_s)
+    keep = energy > np.mean(energy) * ratio if len(energy) else energy > 0
+
+    step = max(hop_len, int(sr * block_s) // hop_len * hop_len)
+    with sf.SoundFile(input_path) as src:
+        with sf.SoundFile(
+            output_path, "w", samplerate=sr, channels=src.channels
+        ) as dst:
+            start = 0
+            while True:
+                data = src.read(step, dtype="float64")
+                if len(data) == 0:
+                    break
+                hops = (start + np.arange(len(data))) // hop_len
+                dst.write(data[keep[hops]])
+                start += len(data)
     return output_path
+
+
+def decode_audio_bytes(body, content_type, sr=16000, fmt="f32", channels=1):
+    # Turn an uploaded request body into a mono float32 array without going
+    # through Python floats: WAV/FLAC via soundfile, raw PCM via frombuffer
+    content_type = (content_type or "").split(";")[0].strip().lower()
+
+    if content_type in ("audio/wav", "audio/x-wav", "audio/wave", "audio/flac"):
+        audio, sr = sf.read(io.BytesIO(body), dtype="float32")
+    else:
+        if fmt == "s16":
+            pcm = np.frombuffer(body, dtype="<i2")
+            audio = pcm.astype(np.float32) / 32768.0
+        else:
+            audio = np.frombuffer(body, dtype="<f4")
+        if channels > 1:
+            audio = audio[: len(audio) - len(audio) % channels].reshape(-1, channels)
+
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1, dtype=np.float32)
+    if not np.all(np.isfinite(audio)):
+        audio = np.nan_to_num(audio)
+    return audio, sr
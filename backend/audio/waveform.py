@@ -0,0 +1,130 @@
+import os
+import struct
+
+import numpy as np
+
+from backend.cache import build_once, cache_dir, entry_key, file_identity
+
+# Min/max peak pyramid for drawing waveforms at any zoom. Each level holds
+# one (min, max) int16 pair per `samples_per_bin` mono samples; the coarser
+# levels are reduced from the finest one, so the file is decoded once.
+LEVELS = (256, 1024, 4096)
+# Sample rate used for containers soundfile can't open (decoded via ffmpeg)
+DECODE_SR = 48000
+MAX_BYTES = int(os.environ.get("AIVA_WAVEFORM_CACHE_MB", "256")) * 1024 * 1024
+SUFFIX = ".peaks"
+
+# File layout (little endian):
+#   b"AIVAPK01", u32 samplerate, u64 samples, u32 level count,
+#   per level: u32 samples_per_bin, u64 bins, u64 byte offset,
+#   then each level's bins as interleaved int16 (min, max) pairs
+MAGIC = b"AIVAPK01"
+HEADER = struct.Struct("<8sIQI")
+LEVEL = struct.Struct("<IQQ")
+
+
+def peaks_path(file_path):
+    key = entry_key(file_identity(file_path), LEVELS)
+    return os.path.join(cache_dir("waveforms"), key + SUFFIX)
+
+
+def _blocks(file_path, block_s=10.0):
+    # Native rate for files soundfile reads; ffmpeg at DECODE_SR otherwise
+    import soundfile as sf
+
+    try:
+        info = sf.info(file_path)
+    except Exception:
+        from backend.voice.long_form import stream_audio
+
+        return DECODE_SR, stream_audio(file_path, block_s=block_s, sr=DECODE_SR)
+
+    def mono():
+        for data in sf.blocks(
+            file_path, blocksize=int(info.samplerate * block_s), dtype="float32"
+        ):
+            yield data.mean(axis=1) if data.ndim > 1 else data
+
+    return info.samplerate, mono()
+
+
+def compute_peaks(file_path):
+    # One streaming pass -> (samplerate, samples, {samples_per_bin: int16 (bins, 2)})
+    base = LEVELS[0]
+    sr, blocks = _blocks(file_path)
+    carry = np.zeros(0, dtype=np.float32)
+    chunks = []
+    samples = 0
+    for data in blocks:
+        samples += len(data)
+        buf = np.concatenate([carry, data])
+        n = len(buf) // base
+        carry = buf[n * base :]
+        if n:
+            frames = buf[: n * base].reshape(n, base)
+            chunks.append(np.stack([frames.min(axis=1), frames.max(axis=1)], axis=1))
+    if len(carry):
+        chunks.append(np.array([[carry.min(), carry.max()]], dtype=np.float32))
+
+    finest = np.concatenate(chunks) if chunks else np.zeros((0, 2), dtype=np.float32)
+    finest = np.round(np.clip(finest, -1.0, 1.0) * 32767).astype("<i2")
+
+    levels = {base: finest}
+    for spb in LEVELS[1:]:
+        # Group whole base bins; a partial group at the end still counts
+        k = spb // base
+        n = -(-len(finest) // k)
+        pad = n * k - len(finest)
+        mins = np.pad(finest[:, 0], (0, pad), constant_values=32767)
+        maxs = np.pad(finest[:, 1], (0, pad), constant_values=-32768)
+        levels[spb] = np.stack(
+            [mins.reshape(n, k).min(axis=1), maxs.reshape(n, k).max(axis=1)], axis=1
+        ).astype("<i2")
+    return sr, samples, levels
+
+
+def build_peaks(file_path):
+    # Cached pyramid file for the current version of file_path
+    path = peaks_path(file_path)
+
+    def write(tmp):
+        sr, samples, levels = compute_peaks(file_path)
+        offset = HEADER.size + LEVEL.size * len(levels)
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, sr, samples, len(levels)))
+            for spb, data in levels.items():
+                f.write(LEVEL.pack(spb, len(data), offset))
+                offset += data.nbytes
+            for data in levels.values():
+                f.write(data.tobytes())
+
+    return build_once(path, write, MAX_BYTES, suffix=SUFFIX)
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        magic, sr, samples, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("Not a waveform peak file")
+        levels = {}
+        for _ in range(count):
+            spb, bins, offset = LEVEL.unpack(f.read(LEVEL.size))
+            levels[spb] = (bins, offset)
+    return {"samplerate": sr, "samples": samples, "levels": levels}
+
+
+def read_level(path, samples_per_bin, start=0, count=None):
+    # Raw int16 (min, max) pairs for bins [start, start + count): a seek and
+    # one read, so cost depends on the visible range, not the file length
+    header = read_header(path)
+    if samples_per_bin not in header["levels"]:
+        raise ValueError(
+            f"Unknown level {samples_per_bin}; available: {sorted(header['levels'])}"
+        )
+    bins, offset = header["levels"][samples_per_bin]
+    start = max(0, min(int(start), bins))
+    end = bins if count is None else min(bins, start + max(0, int(count)))
+    with open(path, "rb") as f:
+        f.seek(offset + start * 4)
+        data = f.read((end - start) * 4)
+    return header, start, end - start, data
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+
+# Root for everything AIVA derives from media (transcripts, indexes, proxies)
+CACHE_ROOT = os.environ.get(
+    "AIVA_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".aiva", "cache")
+)
+
+_hash_memo = {}
+_hash_lock = threading.Lock()
+
+# Entries being built right now; concurrent callers wait for the first one
+_building = {}
+_building_lock = threading.Lock()
+
+
+def cache_dir(name):
+    path = os.path.join(CACHE_ROOT, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_identity(path):
+    # Cheap identity: changes whenever the file is replaced or edited
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+
+def content_hash(path, chunk_size=4 * 1024 * 1024):
+    # BLAKE2 of the file contents, memoised per (path, size, mtime) so a
+    # file is only read once per process while it stays unchanged
+    identity = file_identity(path)
+    with _hash_lock:
+        if identity in _hash_memo:
+            return _hash_memo[identity]
+
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    with _hash_lock:
+        _hash_memo[identity] = digest
+    return digest
+
+
+def entry_key(*parts):
+    # Stable name for a cache entry derived from JSON-able parts (file
+    # identities, options, format versions)
+    return hashlib.sha1(json.dumps(parts).encode()).hexdigest()
+
+
+def touch(path):
+    # Mark an entry as recently used for evict_lru; False if it is gone
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def build_once(path, write, max_bytes, suffix=""):
+    # Make sure the entry at path exists and return path. write(tmp) fills a
+    # temp file that is moved into place; callers in this process wait for
+    # a build already running, and other processes use their own temp name
+    while True:
+        with _building_lock:
+            busy = _building.get(path)
+            if busy is None:
+                _building[path] = threading.Event()
+        if busy is None:
+            break
+        busy.wait()
+        if os.path.exists(path):
+            return path
+        # The other build failed or was cancelled: try again ourselves
+
+    tmp = f"{path}.{os.getpid()}.tmp{suffix}"
+    try:
+        if touch(path):
+            return path
+        write(tmp)
+        os.replace(tmp, path)
+        evict_lru(os.path.dirname(path), max_bytes, suffix=suffix)
+        return path
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        with _building_lock:
+            _building.pop(path).set()
+
+
+def evict_lru(directory, max_bytes, suffix=""):
+    # Drop least recently used entries (by mtime; readers touch entries on
+    # hit) until the directory fits in max_bytes
+    entries = []
+    total = 0
+    for name in os.listdir(directory):
+        if suffix and not name.endswith(suffix):
+            continue
+        # Temp files are still being written (maybe by another process)
+        if ".tmp" in name:
+            continue
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+    return total
@@ -0,0 +1,445 @@
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from backend.cache import CACHE_ROOT, content_hash, file_identity
+from backend.video.pipeline import RenderCancelled
+
+# Per-file media features, computed once by ingest() and read back by the
+# analysis, scene detection and suggestion code instead of re-decoding.
+#  - paths maps a (path, size, mtime) identity to a content hash, so a
+#    copied or renamed file reuses the features of identical bytes. Only
+#    the background ingest job hashes; readers look up the identity and
+#    treat an unknown one as "not indexed".
+#  - media / frames / audio hold the features themselves, keyed by hash
+#  - the stored features are capped at MAX_BYTES, dropping the media whose
+#    paths were used least recently
+DB_PATH = os.environ.get("AIVA_FEATURE_DB", os.path.join(CACHE_ROOT, "features.sqlite"))
+# Bump when feature definitions change; older rows are re-ingested
+VERSION = 2
+# Frame features are computed on a thumbnail this wide (matches the scene
+# detector's fast mode, so indexed cuts equal decoded ones)
+THUMB_WIDTH = 160
+# Audio RMS / peak window
+AUDIO_WINDOW_S = 0.1
+# Rows buffered before each insert
+BATCH = 500
+MAX_BYTES = int(os.environ.get("AIVA_FEATURE_DB_MB", "1024")) * 1024 * 1024
+# Approximate stored size of one row (key, values, 180 float32 hue bins).
+# float32 keeps indexed histogram correlations equal to decoded ones; with
+# float16 a cut scored right at the threshold could flip.
+FRAME_ROW_BYTES = 810
+AUDIO_ROW_BYTES = 70
+# A path's last-use time is only rewritten when older than this, so reads
+# don't turn into a write on every lookup
+USED_RESOLUTION_S = 3600
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+# One ingest per content hash at a time
+_ingesting = {}
+_ingest_lock = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS paths (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    used REAL
+);
+CREATE TABLE IF NOT EXISTS media (
+    hash TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    fps REAL,
+    width INTEGER,
+    height INTEGER,
+    frames INTEGER,
+    audio_windows INTEGER,
+    audio_window_s REAL,
+    ingested REAL
+);
+CREATE TABLE IF NOT EXISTS frames (
+    hash TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    luma REAL,
+    contrast REAL,
+    motion REAL,
+    hue BLOB,
+    PRIMARY KEY (hash, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS audio (
+    hash TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    rms REAL,
+    peak REAL,
+    PRIMARY KEY (hash, idx)
+) WITHOUT ROWID;
+"""
+
+
+def _connect():
+    global _schema_ready
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    with _schema_lock:
+        if not _schema_ready:
+            # Only takes effect on a new database; lets prune() hand freed
+            # pages back to the filesystem
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = [r[1] for r in conn.execute("PRAGMA table_info(paths)")]
+            if "used" not in columns:
+                conn.execute("ALTER TABLE paths ADD COLUMN used REAL")
+            _schema_ready = True
+    return conn
+
+
+def file_key(file_path, conn=None):
+    # Content hash for a file, hashing only when (path, size, mtime) is new.
+    # Reads the whole file for a new identity: background jobs only.
+    path, size, mtime_ns = file_identity(file_path)
+    own = conn is None
+    conn = conn or _connect()
+    try:
+        digest = lookup_key(file_path, conn)
+        if digest is not None:
+            return digest
+        digest = content_hash(file_path)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO paths VALUES (?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, digest, time.time()),
+            )
+        return digest
+    finally:
+        if own:
+            conn.close()
+
+
+def lookup_key(file_path, conn):
+    # Hash already recorded for this exact (path, size, mtime), or None.
+    # Never reads the file, so it is cheap enough for request handlers.
+    path, size, mtime_ns = file_identity(file_path)
+    row = conn.execute(
+        "SELECT hash, used FROM paths WHERE path=? AND size=? AND mtime_ns=?",
+        (path, size, mtime_ns),
+    ).fetchone()
+    if row is None:
+        return None
+    now = time.time()
+    if row[1] is None or now - row[1] >= USED_RESOLUTION_S:
+        with conn:
+            conn.execute("UPDATE paths SET used=? WHERE path=?", (now, path))
+    return row[0]
+
+
+def _indexed(conn, file_path):
+    # (hash, media row) for an indexed file, else None
+    digest = lookup_key(file_path, conn)
+    if digest is None:
+        return None
+    row = conn.execute(
+        "SELECT version, fps, width, height, frames, audio_windows, audio_window_s "
+        "FROM media WHERE hash=?",
+        (digest,),
+    ).fetchone()
+    if not row or row[0] != VERSION:
+        return None
+    return digest, row
+
+
+def is_indexed(file_path):
+    try:
+        conn = _connect()
+        try:
+            return _indexed(conn, file_path) is not None
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"Feature index lookup failed: {e}")
+        return False
+
+
+def get_summary(file_path, clip_level=1.0):
+    # Whole-file aggregates (SQL side, no per-row transfer), or None when
+    # the file isn't indexed
+    try:
+        conn = _connect()
+    except Exception as e:
+        print(f"Feature index unavailable: {e}")
+        return None
+    try:
+        found = _indexed(conn, file_path)
+        if found is None:
+            return None
+        digest, (_, fps, width, height, frames, _, audio_window_s) = found
+        luma, contrast = conn.execute(
+            "SELECT AVG(luma), AVG(contrast) FROM frames WHERE hash=?", (digest,)
+        ).fetchone()
+        windows, sum_sq, peak, clipped = conn.execute(
+            "SELECT COUNT(*), SUM(rms * rms), MAX(peak), SUM(peak >= ?) "
+            "FROM audio WHERE hash=?",
+            (clip_level, digest),
+        ).fetchone()
+        return {
+            "hash": digest,
+            "fps": fps,
+            "width": width,
+            "height": height,
+            "frames": frames,
+            "luma": luma,
+            "contrast": contrast,
+            "audio_windows": windows,
+            "audio_window_s": audio_window_s,
+            "audio_mean_sq": (sum_sq or 0.0) / windows if windows else 0.0,
+            "audio_peak": peak or 0.0,
+            "audio_clipped_windows": clipped or 0,
+        }
+    except Exception as e:
+        print(f"Feature index read failed: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def get_hues(file_path, stride=1, start=0, end=None):
+    # Hue histograms of frames start, start + stride, ... before end, for
+    # scene detection, or None when the file isn't indexed
+    # -> {"fps", "frames", "index": int array, "hue": float32 (n, 180)}
+    stride = max(1, int(stride))
+    try:
+        conn = _connect()
+    except Exception as e:
+        print(f"Feature index unavailable: {e}")
+        return None
+    try:
+        found = _indexed(conn, file_path)
+        if found is None:
+            return None
+        digest, (_, fps, _, _, frames, _, _) = found
+        rows = conn.execute(
+            "SELECT idx, hue FROM frames WHERE hash=? AND idx >= ? AND idx < ? "
+            "AND (idx - ?) % ? = 0 ORDER BY idx",
+            (digest, start, frames if end is None else end, start, stride),
+        ).fetchall()
+        hue = np.frombuffer(b"".join(r[1] for r in rows), dtype="<f4").reshape(-1, 180)
+        return {
+            "fps": fps,
+            "frames": frames,
+            "index": np.array([r[0] for r in rows], dtype=np.int64),
+            "hue": hue.astype(np.float32),
+        }
+    except Exception as e:
+        print(f"Feature index read failed: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def prune(conn, max_bytes=MAX_BYTES):
+    # Drop least recently used media (by their paths' last use) until the
+    # estimated stored size fits in max_bytes
+    rows = conn.execute(
+        "SELECT m.hash, m.frames, m.audio_windows, "
+        "COALESCE(MAX(p.used), m.ingested) AS used "
+        "FROM media m LEFT JOIN paths p ON p.hash = m.hash "
+        "GROUP BY m.hash ORDER BY used ASC"
+    ).fetchall()
+    sizes = [
+        (digest, (frames or 0) * FRAME_ROW_BYTES + (windows or 0) * AUDIO_ROW_BYTES)
+        for digest, frames, windows, _ in rows
+    ]
+    total = sum(size for _, size in sizes)
+    dropped = 0
+    for digest, size in sizes:
+        if total <= max_bytes:
+            break
+        with conn:
+            for table in ("media", "frames", "audio", "paths"):
+                conn.execute(f"DELETE FROM {table} WHERE hash=?", (digest,))
+        total -= size
+        dropped += 1
+    if dropped:
+        conn.execute("PRAGMA incremental_vacuum")
+    return dropped
+
+
+def ingest(file_path, progress=None, cancel=None, force=False):
+    # One decode pass over the video and one over the audio, streaming rows
+    # into the index in batches so memory stays flat for long recordings
+    import cv2
+
+    from backend.vision.scenes import hue_hist
+
+    conn = _connect()
+    try:
+        digest = file_key(file_path, conn)
+        with _ingest_lock:
+            if digest in _ingesting:
+                busy = _ingesting[digest]
+            else:
+                busy = None
+                _ingesting[digest] = threading.Event()
+        if busy is not None:
+            # Someone else is ingesting the same bytes; wait for them
+            busy.wait()
+            return {"status": "success", "hash": digest, "cached": True}
+
+        try:
+            if not force:
+                row = conn.execute(
+                    "SELECT version FROM media WHERE hash=?", (digest,)
+                ).fetchone()
+                if row and row[0] == VERSION:
+                    return {"status": "success", "hash": digest, "cached": True}
+
+            with conn:
+                for table in ("media", "frames", "audio"):
+                    conn.execute(f"DELETE FROM {table} WHERE hash=?", (digest,))
+
+            start = time.time()
+            cap = cv2.VideoCapture(file_path)
+            fps = width = height = None
+            frames = 0
+            if cap.isOpened():
+                fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                prev_gray = None
+                batch = []
+                try:
+                    while True:
+                        ret, frame = cap.read()
+                        if not ret:
+                            break
+                        if frame.shape[1] > THUMB_WIDTH:
+                            h = max(1, int(frame.shape[0] * THUMB_WIDTH / frame.shape[1]))
+                            frame = cv2.resize(
+                                frame, (THUMB_WIDTH, h), interpolation=cv2.INTER_AREA
+                            )
+                        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                        motion = (
+                            float(cv2.absdiff(gray, prev_gray).mean())
+                            if prev_gray is not None
+                            else 0.0
+                        )
+                        prev_gray = gray
+                        hist = hue_hist(frame).ravel().astype("<f4")
+                        batch.append(
+                            (
+                                digest,
+                                frames,
+                                float(gray.mean()),
+                                float(gray.std()),
+                                motion,
+                                hist.tobytes(),
+                            )
+                        )
+                        frames += 1
+                        if len(batch) >= BATCH:
+                            _insert_frames(conn, batch)
+                            batch = []
+                            if progress is not None:
+                                progress(frames, max(total, frames))
+                            if cancel is not None and cancel.is_set():
+                                raise RenderCancelled()
+                    _insert_frames(conn, batch)
+                finally:
+                    cap.release()
+
+            audio_windows = _ingest_audio(conn, digest, file_path)
+
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        digest,
+                        VERSION,
+                        fps,
+                        width,
+                        height,
+                        frames,
+                        audio_windows,
+                        AUDIO_WINDOW_S,
+                        time.time(),
+                    ),
+                )
+            prune(conn)
+            if progress is not None:
+                progress(frames, frames)
+            return {
+                "status": "success",
+                "hash": digest,
+                "frames": frames,
+                "audio_windows": audio_windows,
+                "elapsed": round(time.time() - start, 2),
+            }
+        except BaseException:
+            # Never leave a partial index behind for readers to trust
+            with conn:
+                for table in ("media", "frames", "audio"):
+                    conn.execute(f"DELETE FROM {table} WHERE hash=?", (digest,))
+            raise
+        finally:
+            with _ingest_lock:
+                _ingesting.pop(digest).set()
+    finally:
+        conn.close()
+
+
+def _insert_frames(conn, batch):
+    if batch:
+        with conn:
+            conn.executemany("INSERT INTO frames VALUES (?, ?, ?, ?, ?, ?)", batch)
+
+
+def _ingest_audio(conn, digest, file_path):
+    # RMS and peak per window of the 16 kHz mono stream (any container)
+    from backend.voice.long_form import SR, stream_audio
+
+    window = int(SR * AUDIO_WINDOW_S)
+    carry = np.zeros(0, dtype=np.float32)
+    count = 0
+    try:
+        for data in stream_audio(file_path):
+            buf = np.concatenate([carry, data])
+            n = len(buf) // window
+            carry = buf[n * window :]
+            if n:
+                count = _insert_audio(conn, digest, buf[: n * window].reshape(n, window), count)
+        if len(carry):
+            count = _insert_audio(conn, digest, carry.reshape(1, -1), count)
+    except Exception as e:
+        # Silent or audio-less files are still worth indexing
+        print(f"Audio feature ingest failed: {e}")
+    return count
+
+
+def _insert_audio(conn, digest, windows, start):
+    rms = np.sqrt(np.mean(windows.astype(np.float64) ** 2, axis=1))
+    peak = np.max(np.abs(windows), axis=1)
+    rows = [
+        (digest, start + i, float(r), float(p)) for i, (r, p) in enumerate(zip(rms, peak))
+    ]
+    with conn:
+        conn.executemany("INSERT INTO audio VALUES (?, ?, ?, ?)", rows)
+    return start + len(rows)
+
+
+def hue_correlation(hue):
+    # cv2.HISTCMP_CORREL between each stored histogram and the previous one
+    # (result[i] compares frame i + 1 with frame i)
+    if len(hue) < 2:
+        return np.zeros(0, dtype=np.float64)
+    h = hue.astype(np.float64)
+    h -= h.mean(axis=1, keepdims=True)
+    a, b = h[:-1], h[1:]
+    num = np.sum(a * b, axis=1)
+    den = np.sqrt(np.sum(a * a, axis=1) * np.sum(b * b, axis=1))
+    return np.where(den > 0, num / np.where(den > 0, den, 1), 1.0)
@@ -0,0 +1,238 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.video.pipeline import RenderCancelled
+
+# Long renders run here instead of on the FastAPI request threadpool, so
+# /voice and /analyze keep their workers while batch jobs are in flight
+MAX_WORKERS = int(os.environ.get("AIVA_JOB_WORKERS", "2"))
+# Ingest work (feature index, proxies) started on its own by /analyze gets a
+# separate, smaller pool at a lower OS priority, so it never queues ahead of
+# or competes evenly with renders the user asked for
+BACKGROUND_WORKERS = int(os.environ.get("AIVA_BACKGROUND_WORKERS", "1"))
+# Added to the nice value of background job threads (Linux)
+BACKGROUND_NICE = 10
+# Finished jobs kept around for status/result lookups
+MAX_FINISHED = 100
+# Minimum gap between progress events for one job on the event stream
+PROGRESS_INTERVAL = 0.5
+# Events buffered per subscriber before the slowest ones get dropped
+SUBSCRIBER_QUEUE = 256
+
+
+class Job:
+    def __init__(self, payload, publish=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.payload = payload
+        self.action = payload.get("action")
+        self.state = "queued"  # queued | running | done | error | cancelled
+        self.frames_done = 0
+        self.frames_total = 0
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.timings = None
+        self.fps = 0.0
+        self._publish = publish
+        self._last_emit = (0.0, 0)
+
+    def progress(self, done, total, timings=None):
+        self.frames_done = done
+        self.frames_total = total
+        if timings is not None:
+            self.timings = timings
+
+        # Throttle: a per-frame callback must not flood the event stream
+        now = time.time()
+        last_time, last_frames = self._last_emit
+        if now - last_time < PROGRESS_INTERVAL:
+            return
+        if last_time:
+            self.fps = (done - last_frames) / (now - last_time)
+        self._last_emit = (now, done)
+        self.emit("progress")
+
+    def emit(self, event_type):
+        if self._publish is not None:
+            self._publish(self.event(event_type))
+
+    def event(self, event_type):
+        data = self.to_dict()
+        data["type"] = event_type
+        data["fps"] = round(self.fps, 2)
+        data["timings"] = (
+            {k: round(v, 3) for k, v in self.timings.items()} if self.timings else None
+        )
+        data["output_file"] = (
+            self.result.get("output_file") if isinstance(self.result, dict) else None
+        )
+        return data
+
+    def eta(self):
+        if self.state != "running" or not self.started or not self.frames_done:
+            return None
+        remaining = max(0, self.frames_total - self.frames_done)
+        rate = self.frames_done / max(1e-6, time.time() - self.started)
+        return remaining / rate
+
+    def to_dict(self):
+        eta = self.eta()
+        return {
+            "job_id": self.id,
+            "action": self.action,
+            "file_path": self.payload.get("file_path"),
+            "state": self.state,
+            "frames_done": self.frames_done,
+            "frames_total": self.frames_total,
+            "progress": (
+                round(min(1.0, self.frames_done / self.frames_total), 4)
+                if self.frames_total
+                else (1.0 if self.state == "done" else 0.0)
+            ),
+            "eta": round(eta, 1) if eta is not None else None,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "error": self.error,
+        }
+
+
+def _lower_priority():
+    # Linux schedules threads individually, so this only affects the
+    # background pool's own thread
+    try:
+        tid = threading.get_native_id()
+        os.setpriority(
+            os.PRIO_PROCESS, tid, os.getpriority(os.PRIO_PROCESS, tid) + BACKGROUND_NICE
+        )
+    except (AttributeError, OSError) as e:
+        print(f"Could not lower background job priority: {e}")
+
+
+class JobManager:
+    def __init__(self, max_workers=MAX_WORKERS, background_workers=BACKGROUND_WORKERS):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="aiva-job"
+        )
+        self.background = ThreadPoolExecutor(
+            max_workers=background_workers,
+            thread_name_prefix="aiva-ingest",
+            initializer=_lower_priority,
+        )
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.subscribers = []
+
+    def submit(self, fn, payload, background=False):
+        # fn(payload, progress=..., cancel=...) -> result dict
+        job = Job(payload, publish=self.publish)
+        with self.lock:
+            self.jobs[job.id] = job
+            self._prune()
+        job.emit("queued")
+        executor = self.background if background else self.executor
+        executor.submit(self._run, job, fn)
+        return job
+
+    # -----------------------------
+    # EVENT STREAM
+    # -----------------------------
+    # Every subscriber gets every job's events on one asyncio queue, so the
+    # UI needs a single connection however many renders are in flight.
+    def subscribe(self):
+        q = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+        with self.lock:
+            self.subscribers.append((asyncio.get_running_loop(), q))
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            self.subscribers = [(l, s) for l, s in self.subscribers if s is not q]
+
+    def publish(self, event):
+        # Called from worker threads; hand the event to each subscriber loop
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for loop, q in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, q, event)
+            except RuntimeError:
+                # Subscriber's loop already closed
+                self.unsubscribe(q)
+
+    def _run(self, job, fn):
+        if job.cancel_event.is_set():
+            job.state = "cancelled"
+            job.finished = time.time()
+            return
+
+        job.state = "running"
+        job.started = time.time()
+        job.emit("started")
+        try:
+            result = fn(job.payload, progress=job.progress, cancel=job.cancel_event)
+            job.result = result
+            if isinstance(result, dict) and result.get("status") == "error":
+                job.state = "error"
+                job.error = result.get("message")
+            else:
+                job.state = "done"
+        except RenderCancelled:
+            job.state = "cancelled"
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            job.state = "error"
+            job.error = str(e)
+        finally:
+            job.finished = time.time()
+            job.emit(job.state)
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if job.state in ("queued", "running"):
+            job.cancel_event.set()
+            if job.state == "queued":
+                job.state = "cancelled"
+                job.finished = time.time()
+                job.emit("cancelled")
+        return job
+
+    def _prune(self):
+        finished = [
+            j for j in self.jobs.values() if j.state in ("done", "error", "cancelled")
+        ]
+        finished.sort(key=lambda j: j.finished or 0)
+        for job in finished[: max(0, len(finished) - MAX_FINISHED)]:
+            del self.jobs[job.id]
+
+
+def _offer(q, event):
+    try:
+        q.put_nowait(event)
+    except asyncio.QueueFull:
+        # A stalled client only loses intermediate events, never blocks jobs.
+        # State changes (started, done, error, cancelled) push the oldest
+        # queued event out instead, so the client still learns how jobs end.
+        if event.get("type") == "progress":
+            return
+        q.get_nowait()
+        q.put_nowait(event)
+
+
+jobs = JobManager()
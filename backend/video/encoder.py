@@ -0,0 +1,154 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+import numpy as np
+
+# Frame sinks for render(). The default streams raw BGR frames into an
+# ffmpeg subprocess over stdin, so encoding runs in its own (multithreaded)
+# process with a real codec and speed preset, and the source's audio is
+# muxed back in by stream copy. OpenCV's mp4v writer is the fallback when
+# ffmpeg is missing or AIVA_ENCODER=opencv.
+ENCODER = os.environ.get("AIVA_ENCODER", "ffmpeg")
+CODEC = os.environ.get("AIVA_VIDEO_CODEC", "libx264")
+PRESET = os.environ.get("AIVA_VIDEO_PRESET", "veryfast")
+CRF = int(os.environ.get("AIVA_VIDEO_CRF", "20"))
+# 0 lets the codec pick (one per core for x264)
+THREADS = int(os.environ.get("AIVA_ENCODE_THREADS", "0"))
+
+# Per-job overrides accepted from request options (payload "context")
+SETTINGS = ("encoder", "codec", "preset", "crf", "threads")
+
+
+def encoder_settings(options=None):
+    options = options or {}
+    return {key: options[key] for key in SETTINGS if options.get(key) is not None}
+
+
+class FFmpegWriter:
+    def __init__(
+        self,
+        output_path,
+        fps,
+        size,
+        audio_from=None,
+        codec=CODEC,
+        preset=PRESET,
+        crf=CRF,
+        threads=THREADS,
+    ):
+        self.output_path = output_path
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-v",
+            "error",
+            "-nostats",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "bgr24",
+            "-s",
+            f"{size[0]}x{size[1]}",
+            "-r",
+            repr(float(fps or 30.0)),
+            "-i",
+            "pipe:0",
+        ]
+        if audio_from:
+            cmd += ["-i", audio_from, "-map", "0:v:0", "-map", "1:a:0?", "-c:a", "copy"]
+        cmd += ["-c:v", codec]
+        if preset:
+            cmd += ["-preset", str(preset)]
+        if crf is not None:
+            cmd += ["-crf", str(crf)]
+        cmd += ["-threads", str(threads)]
+        if size[0] % 2 or size[1] % 2:
+            # 4:2:0 needs even dimensions
+            cmd += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+        cmd += [
+            "-pix_fmt",
+            "yuv420p",
+            "-movflags",
+            "+faststart",
+            output_path,
+        ]
+        # stderr goes to a file: an unread pipe could fill up and stall ffmpeg
+        self.log = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self.log
+        )
+
+    def _error(self):
+        self.log.seek(0)
+        message = self.log.read().decode(errors="replace").strip()
+        return RuntimeError(f"FFmpeg encode failed: {message or 'no output'}")
+
+    def write(self, frame):
+        try:
+            self.proc.stdin.write(np.ascontiguousarray(frame).data)
+        except BrokenPipeError:
+            self.proc.wait()
+            raise self._error() from None
+
+    def close(self):
+        if self.proc.stdin.closed:
+            return
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        code = self.proc.wait()
+        try:
+            if code != 0:
+                raise self._error()
+        finally:
+            self.log.close()
+
+    def abort(self):
+        if not self.proc.stdin.closed:
+            try:
+                self.proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        self.proc.kill()
+        self.proc.wait()
+        self.log.close()
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+
+class OpenCVWriter:
+    def __init__(self, output_path, fps, size):
+        import cv2
+
+        self.output_path = output_path
+        # Use mp4v for better OpenCV compatibility
+        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        self.out = cv2.VideoWriter(output_path, fourcc, fps, size)
+        if not self.out.isOpened():
+            raise RuntimeError(
+                "Could not open video writer for output. Check codec compatibility."
+            )
+
+    def write(self, frame):
+        self.out.write(frame)
+
+    def close(self):
+        self.out.release()
+
+    def abort(self):
+        self.out.release()
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+
+def open_writer(output_path, fps, size, audio_from=None, settings=None):
+    settings = dict(settings or {})
+    kind = settings.pop("encoder", ENCODER)
+    if kind == "ffmpeg" and shutil.which("ffmpeg"):
+        return FFmpegWriter(output_path, fps, size, audio_from=audio_from, **settings)
+    if kind == "ffmpeg":
+        print("FFmpeg not found, encoding with OpenCV (mp4v, no audio)")
+    return OpenCVWriter(output_path, fps, size)
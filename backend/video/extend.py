@@ -0,0 +1,274 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+from backend.video.pipeline import HoldLastFrame, RenderCancelled, render
+from backend.video.segments import concat_copy
+
+# extend_scene without re-encoding the clip: the source is stream-copied,
+# only the freeze-frame tail is encoded (with a codec matching the source so
+# the concat demuxer can join them) and the original audio is copied in.
+# The last frame is pulled out by ffmpeg in its native YUV, so the tail
+# doesn't pick up an RGB round-trip shift at the seam. Memory is one frame
+# regardless of clip length.
+# Only 8-bit 4:2:0 sources are stream-copied, with the tail encoded at the
+# source's profile and level: a second, different sequence header in one
+# stream breaks Chromium and QuickTime. Anything ffprobe can't vouch for,
+# and any joined file that doesn't check out, is re-encoded instead.
+
+# Source codec (ffprobe codec_name) -> encoder producing a compatible stream
+TAIL_CODECS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+    "mpeg4": "mpeg4",
+}
+# ffprobe profile names -> encoder -profile:v values; profiles missing here
+# (High 10, 4:2:2, ...) are re-encoded
+TAIL_PROFILES = {
+    "libx264": {
+        "Constrained Baseline": "baseline",
+        "Baseline": "baseline",
+        "Main": "main",
+        "High": "high",
+    },
+    "libx265": {"Main": "main"},
+}
+# The only layout the tail encoders are asked to produce
+TAIL_PIX_FMT = "yuv420p"
+# Containers the joined output can be written as without remuxing issues
+COPY_EXTENSIONS = {".mp4", ".m4v", ".mov"}
+# Decode only this much from the end of the file to find the last frame
+LAST_FRAME_WINDOW_S = 1.0
+# A joined file running longer than source + tail by more than this means
+# the concat misread the source's timestamps
+DURATION_SLACK_S = 1.0
+# Seconds before the seam to decode when checking the joined file
+SEAM_CHECK_S = 2.0
+
+
+def _probe(input_path):
+    # -> (fps, width, height)
+    import cv2
+
+    cap = cv2.VideoCapture(input_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {input_path}")
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+    return fps, width, height
+
+
+def _ffmpeg(cmd):
+    subprocess.run(
+        ["ffmpeg", "-y", "-v", "error"] + cmd,
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+def stream_info(path):
+    # First video stream's codec_name / profile / pix_fmt / level and the
+    # container duration, from ffprobe's JSON output; None without ffprobe
+    # or when the file has no video stream
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "stream=codec_name,profile,pix_fmt,level:format=duration",
+        "-of",
+        "json",
+        path,
+    ]
+    try:
+        result = subprocess.run(
+            cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        data = json.loads(result.stdout)
+        stream = data["streams"][0]
+    except Exception as e:
+        print(f"Stream probe failed: {e}")
+        return None
+    duration = data.get("format", {}).get("duration")
+    return {
+        "codec": stream.get("codec_name"),
+        "profile": stream.get("profile"),
+        "pix_fmt": stream.get("pix_fmt"),
+        "level": stream.get("level"),
+        "duration": float(duration) if duration else None,
+    }
+
+
+def tail_options(codec, info):
+    # Encoder flags that reproduce the source's profile and level, or None
+    # when the tail can't be made to match
+    if info["pix_fmt"] != TAIL_PIX_FMT or TAIL_CODECS.get(info["codec"]) != codec:
+        return None
+    if codec not in TAIL_PROFILES:
+        return []
+    profile = TAIL_PROFILES[codec].get(info["profile"])
+    if profile is None:
+        return None
+    options = ["-profile:v", profile]
+    level = info.get("level")
+    if level and level > 0:
+        # ffprobe reports H.264 levels x10 and HEVC levels x30
+        if codec == "libx264":
+            options += ["-level:v", f"{level / 10:.1f}"]
+        else:
+            options += ["-x265-params", f"level-idc={level / 30:.1f}"]
+    return options
+
+
+def _same_stream(a, b):
+    keys = ("codec", "profile", "pix_fmt", "level")
+    return b is not None and all(a[k] == b[k] for k in keys)
+
+
+def _seam_decodes(path, seconds):
+    # Decode the end of the joined file (the seam and the tail): any decoder
+    # error means the tail doesn't fit the source's stream
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-v",
+            "error",
+            "-sseof",
+            f"-{seconds}",
+            "-i",
+            path,
+            "-map",
+            "0:v:0",
+            "-f",
+            "null",
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    return result.returncode == 0 and not result.stderr.strip()
+
+
+def encode_tail(input_path, tail_path, codec, fps, size, count, tmp_dir, options=()):
+    # Last frame as raw yuv420p (image2 -update keeps overwriting one file,
+    # so only the final decoded frame survives), then looped `count` times
+    last = os.path.join(tmp_dir, "last.yuv")
+    _ffmpeg(
+        [
+            "-sseof",
+            f"-{LAST_FRAME_WINDOW_S}",
+            "-i",
+            input_path,
+            "-an",
+            "-pix_fmt",
+            TAIL_PIX_FMT,
+            "-f",
+            "image2",
+            "-update",
+            "1",
+            "-c:v",
+            "rawvideo",
+            last,
+        ]
+    )
+    if not os.path.exists(last):
+        raise RuntimeError(f"Could not decode the last frame of {input_path}")
+    _ffmpeg(
+        [
+            "-stream_loop",
+            "-1",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            TAIL_PIX_FMT,
+            "-s",
+            f"{size[0]}x{size[1]}",
+            "-framerate",
+            repr(float(fps)),
+            "-i",
+            last,
+            "-frames:v",
+            str(count),
+            "-c:v",
+            codec,
+            "-crf",
+            "18",
+            "-preset",
+            "fast",
+            *options,
+            "-pix_fmt",
+            TAIL_PIX_FMT,
+            tail_path,
+        ]
+    )
+
+
+def extend_video(input_path, output_path, seconds=1.0, progress=None, cancel=None):
+    ext = os.path.splitext(input_path)[1].lower()
+    info = None
+    if ext in COPY_EXTENSIONS and shutil.which("ffmpeg"):
+        info = stream_info(input_path)
+    codec = TAIL_CODECS.get(info["codec"]) if info else None
+    options = tail_options(codec, info) if codec else None
+    if options is None:
+        return _reencode(input_path, output_path, seconds, progress, cancel)
+
+    fps, width, height = _probe(input_path)
+    count = int(fps * seconds)
+    tmp_dir = tempfile.mkdtemp(prefix="aiva_extend_")
+    try:
+        tail_path = os.path.join(tmp_dir, "tail" + ext)
+        encode_tail(
+            input_path, tail_path, codec, fps, (width, height), count, tmp_dir, options
+        )
+        if cancel is not None and cancel.is_set():
+            raise RenderCancelled()
+        concat_copy([input_path, tail_path], output_path, audio_from=input_path)
+    except RenderCancelled:
+        raise
+    except Exception as e:
+        print(f"Stream-copy extension failed: {e}, re-encoding")
+        return _reencode(input_path, output_path, seconds, progress, cancel)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    joined = stream_info(output_path)
+    problem = None
+    if not _same_stream(info, joined):
+        problem = "changed stream parameters"
+    elif info["duration"] is not None and (
+        joined["duration"] is None
+        or joined["duration"] > info["duration"] + seconds + DURATION_SLACK_S
+    ):
+        problem = "bad timing"
+    elif not _seam_decodes(output_path, seconds + SEAM_CHECK_S):
+        problem = "decode errors at the seam"
+    if problem is not None:
+        print(f"Stream-copy extension of {input_path} has {problem}, re-encoding")
+        os.remove(output_path)
+        return _reencode(input_path, output_path, seconds, progress, cancel)
+    if progress is not None:
+        progress(count, count)
+    return count
+
+
+def _reencode(input_path, output_path, seconds, progress=None, cancel=None):
+    # Unknown stream layout: one streaming decode/encode pass
+    return render(
+        input_path,
+        output_path,
+        [HoldLastFrame(seconds)],
+        progress=progress,
+        cancel=cancel,
+        audio_from=input_path,
+    )["frames"]
@@ -0,0 +1,224 @@
+import os
+import threading
+from collections import OrderedDict
+
+from backend.cache import file_identity
+
+# Random access to decoded frames for thumbnails, scene-cut previews and
+# the analysis sampler.
+#  - open decoders are pooled per file (and closed least recently used
+#    first), so repeated requests skip container / codec setup
+#  - a decoder that is already positioned just before the requested frame
+#    reads forward instead of seeking
+#  - decoded frames sit in an LRU cache bounded by a byte budget
+CACHE_BYTES = int(os.environ.get("AIVA_FRAME_CACHE_MB", "256")) * 1024 * 1024
+DECODERS_PER_FILE = 2
+MAX_DECODERS = int(os.environ.get("AIVA_FRAME_DECODERS", "8"))
+# Reading forward beats a seek (which decodes from the previous keyframe)
+# for gaps up to about one GOP
+READ_AHEAD = 30
+
+
+class _Decoder:
+    def __init__(self, key, path):
+        import cv2
+
+        self.key = key
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Could not open video: {path}")
+        self.pos = 0  # index of the frame the next read() returns
+
+    def read(self, index):
+        import cv2
+
+        if not (0 <= index - self.pos <= READ_AHEAD):
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            self.pos = index
+        while self.pos < index:
+            if not self.cap.grab():
+                return None
+            self.pos += 1
+        ret, frame = self.cap.read()
+        if not ret:
+            # Position is unknown after a failed read; force a seek next time
+            self.pos = -READ_AHEAD - 1
+            return None
+        self.pos += 1
+        return frame
+
+    def release(self):
+        self.cap.release()
+
+
+class FrameServer:
+    def __init__(self, cache_bytes=CACHE_BYTES, max_decoders=MAX_DECODERS):
+        self.cache_bytes = cache_bytes
+        self.max_decoders = max_decoders
+        self.lock = threading.Lock()
+        self.frames = OrderedDict()  # (key, index) -> frame
+        self.used = 0
+        self.idle = OrderedDict()  # id(decoder) -> decoder, oldest first
+        self.infos = {}  # key -> stream info
+
+    # -----------------------------
+    # DECODER POOL
+    # -----------------------------
+    def _checkout(self, key, path, index):
+        def cost(d):
+            gap = index - d.pos
+            return gap if 0 <= gap <= READ_AHEAD else READ_AHEAD + 1
+
+        with self.lock:
+            # Prefer the idle decoder that can reach `index` without seeking
+            candidates = [d for d in self.idle.values() if d.key == key]
+            if candidates:
+                best = min(candidates, key=cost)
+                del self.idle[id(best)]
+                return best
+        return _Decoder(key, path)
+
+    def _checkin(self, decoder):
+        with self.lock:
+            self.idle[id(decoder)] = decoder
+            closing = []
+            # Per-file and global caps on open decoders
+            same = [d for d in self.idle.values() if d.key == decoder.key]
+            if len(same) > DECODERS_PER_FILE:
+                closing.append(same[0])
+            while len(self.idle) - len(closing) > self.max_decoders:
+                oldest = next(d for d in self.idle.values() if d not in closing)
+                closing.append(oldest)
+            for d in closing:
+                del self.idle[id(d)]
+        for d in closing:
+            d.release()
+
+    def close(self, path=None):
+        # Release decoders (for one file, or all) and drop their frames
+        with self.lock:
+            closing = [
+                d
+                for d in self.idle.values()
+                if path is None or d.key[0] == os.path.abspath(path)
+            ]
+            for d in closing:
+                del self.idle[id(d)]
+            target = os.path.abspath(path) if path is not None else None
+            for k in [k for k in self.frames if target is None or k[0][0] == target]:
+                self.used -= self.frames.pop(k).nbytes
+            for k in [k for k in self.infos if target is None or k[0] == target]:
+                del self.infos[k]
+        for d in closing:
+            d.release()
+
+    # -----------------------------
+    # FRAMES
+    # -----------------------------
+    def info(self, path):
+        import cv2
+
+        key = file_identity(path)
+        with self.lock:
+            if key in self.infos:
+                return self.infos[key]
+        decoder = self._checkout(key, path, 0)
+        try:
+            cap = decoder.cap
+            info = {
+                "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                "fps": cap.get(cv2.CAP_PROP_FPS) or 30.0,
+                "frames": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+            }
+        finally:
+            self._checkin(decoder)
+        with self.lock:
+            self.infos[key] = info
+        return info
+
+    def frame_index(self, path, time=None, frame=None):
+        info = self.info(path)
+        if frame is None:
+            frame = int(round((time or 0.0) * info["fps"]))
+        if info["frames"]:
+            frame = min(frame, info["frames"] - 1)
+        return max(0, int(frame))
+
+    def get(self, path, time=None, frame=None):
+        # Full-resolution BGR frame (shared; copy before modifying), or None
+        key = file_identity(path)
+        index = self.frame_index(path, time, frame)
+        with self.lock:
+            cached = self.frames.get((key, index))
+            if cached is not None:
+                self.frames.move_to_end((key, index))
+                return cached
+
+        decoder = self._checkout(key, path, index)
+        try:
+            image = decoder.read(index)
+        finally:
+            self._checkin(decoder)
+        if image is None:
+            return None
+
+        image.flags.writeable = False
+        with self.lock:
+            if (key, index) not in self.frames:
+                self.frames[(key, index)] = image
+                self.used += image.nbytes
+            while self.used > self.cache_bytes and len(self.frames) > 1:
+                _, old = self.frames.popitem(last=False)
+                self.used -= old.nbytes
+        return image
+
+    def strip(self, path, count=10, start=None, end=None):
+        # `count` frames evenly spread over [start, end) seconds
+        info = self.info(path)
+        duration = info["frames"] / info["fps"] if info["fps"] else 0.0
+        start = start or 0.0
+        end = duration if end is None else min(end, duration)
+        step = (end - start) / max(1, count)
+        times = [start + step * (i + 0.5) for i in range(count)]
+        return times, [self.get(path, time=t) for t in times]
+
+
+def resize(frame, width=None, height=None):
+    # Fit to the requested width and/or height, keeping aspect
+    import cv2
+
+    h, w = frame.shape[:2]
+    if width and height:
+        scale = min(width / w, height / h)
+    elif width:
+        scale = width / w
+    elif height:
+        scale = height / h
+    else:
+        return frame
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    if size == (w, h):
+        return frame
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    return cv2.resize(frame, size, interpolation=interpolation)
+
+
+def encode(frame, fmt="jpeg", quality=85):
+    # -> (bytes, media type)
+    import cv2
+
+    if fmt == "raw":
+        return frame.tobytes(), "application/octet-stream"
+    if fmt == "png":
+        ok, buf = cv2.imencode(".png", frame, [cv2.IMWRITE_PNG_COMPRESSION, 3])
+        media_type = "image/png"
+    else:
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+        media_type = "image/jpeg"
+    if not ok:
+        raise RuntimeError(f"Could not encode frame as {fmt}")
+    return buf.tobytes(), media_type
+
+
+frame_server = FrameServer()
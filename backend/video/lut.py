@@ -0,0 +1,145 @@
+import numpy as np
+
+# Per-pixel colour operations compiled to lookup tables.
+#  - 1D: a (256, 1, 3) uint8 table, one curve per B/G/R channel, applied
+#    with cv2.LUT. Any chain of per-channel tone steps (gain/offset,
+#    channel shifts, gamma, ...) composes into a single table.
+#  - 3D: .cube grading LUTs, resampled once onto a dense grid so applying
+#    one is a single gather per pixel instead of per-pixel interpolation.
+
+# Dense 3D grid resolution in bits per channel (128^3 entries, ~6 MB)
+CUBE_BITS = 7
+
+
+# -----------------------------
+# 1D TONE TABLES
+# -----------------------------
+def identity():
+    ramp = np.arange(256, dtype=np.uint8)
+    return np.repeat(ramp[:, None, None], 3, axis=2)
+
+
+def contrast_table(alpha=1.0, beta=0.0):
+    # Exactly cv2.convertScaleAbs: saturate(|alpha * x + beta|), computed
+    # by running it over the 256 possible inputs
+    import cv2
+
+    ramp = np.arange(256, dtype=np.uint8).reshape(256, 1)
+    curve = cv2.convertScaleAbs(ramp, alpha=alpha, beta=beta).reshape(256)
+    return np.repeat(curve[:, None, None], 3, axis=2)
+
+
+def shift_table(b=0, g=0, r=0):
+    # Saturating per-channel offsets (cv2.add / cv2.subtract)
+    ramp = np.arange(256, dtype=np.int16)
+    curves = [np.clip(ramp + off, 0, 255).astype(np.uint8) for off in (b, g, r)]
+    return np.stack(curves, axis=1)[:, None, :]
+
+
+def gamma_table(gamma=1.0):
+    ramp = np.arange(256, dtype=np.float64) / 255.0
+    curve = np.clip(np.rint(255.0 * ramp ** (1.0 / gamma)), 0, 255).astype(np.uint8)
+    return np.repeat(curve[:, None, None], 3, axis=2)
+
+
+def compose(first, then):
+    # Table equivalent to applying `first` and then `then`
+    out = np.empty_like(first)
+    for c in range(3):
+        out[:, 0, c] = then[first[:, 0, c], 0, c]
+    return out
+
+
+def compile_steps(steps):
+    # [("contrast", alpha, beta), ("shift", b, g, r), ("gamma", g), ...]
+    # -> one (256, 1, 3) table
+    builders = {
+        "contrast": contrast_table,
+        "shift": shift_table,
+        "gamma": gamma_table,
+    }
+    table = identity()
+    for name, *args in steps:
+        if name not in builders:
+            raise ValueError(f"Unknown LUT step: {name}")
+        table = compose(table, builders[name](*args))
+    return table
+
+
+# -----------------------------
+# 3D LUTS (.cube)
+# -----------------------------
+def load_cube(path):
+    # Adobe/Resolve .cube -> (float32 (N, N, N, 3) indexed [b, g, r] with
+    # RGB output, domain_min, domain_max)
+    size = None
+    domain_min = np.zeros(3, dtype=np.float32)
+    domain_max = np.ones(3, dtype=np.float32)
+    values = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split()
+            try:
+                values.append([float(v) for v in parts[:3]])
+                continue
+            except ValueError:
+                pass
+            # Keyword lines (TITLE and unknown keywords are ignored)
+            key = parts[0].upper()
+            if key == "LUT_3D_SIZE":
+                size = int(parts[1])
+            elif key == "LUT_1D_SIZE":
+                raise ValueError("1D .cube files are not supported; use a 3D LUT")
+            elif key == "DOMAIN_MIN":
+                domain_min = np.array(parts[1:4], dtype=np.float32)
+            elif key == "DOMAIN_MAX":
+                domain_max = np.array(parts[1:4], dtype=np.float32)
+    if size is None:
+        raise ValueError(f"No LUT_3D_SIZE in {path}")
+    data = np.array(values, dtype=np.float32)
+    if len(data) != size**3:
+        raise ValueError(f"Expected {size ** 3} entries in {path}, found {len(data)}")
+    # Red varies fastest in the file, so the reshape is indexed [b, g, r]
+    return data.reshape(size, size, size, 3), domain_min, domain_max
+
+
+def dense_cube(cube, domain_min, domain_max, bits=CUBE_BITS, pre=None):
+    # Resample a cube onto a 2^bits grid per channel (trilinear), giving a
+    # flat (2^(3*bits), 3) BGR uint8 table indexed by (b, g, r) >> (8 - bits).
+    # `pre` is an optional 1D table folded in ahead of the cube.
+    size = cube.shape[0]
+    levels = 1 << bits
+    # Input value at the centre of each grid cell
+    step = 256 // levels
+    centres = np.arange(levels) * step + (step - 1) / 2.0
+
+    def coords(channel):
+        x = centres if pre is None else pre[np.rint(centres).astype(int), 0, channel]
+        x = np.asarray(x, dtype=np.float32) / np.float32(255.0)
+        lo, hi = domain_min[2 - channel], domain_max[2 - channel]
+        pos = np.clip((x - lo) / max(hi - lo, 1e-6), 0, 1) * (size - 1)
+        i0 = np.minimum(np.floor(pos).astype(int), size - 2 if size > 1 else 0)
+        return i0, (pos - i0).astype(np.float32)
+
+    (b0, fb), (g0, fg), (r0, fr) = coords(0), coords(1), coords(2)
+    g0, r0 = g0[:, None], r0[None, :]
+    fg, fr = fg[:, None, None], fr[None, :, None]
+    g1 = np.minimum(g0 + 1, size - 1)
+    r1 = np.minimum(r0 + 1, size - 1)
+
+    # One blue slice at a time keeps the float intermediates small
+    table = np.empty((levels, levels, levels, 3), dtype=np.uint8)
+    for i in range(levels):
+        planes = []
+        for b in (b0[i], min(b0[i] + 1, size - 1)):
+            plane = cube[b]
+            c0 = plane[g0, r0] * (1 - fr) + plane[g0, r1] * fr
+            c1 = plane[g1, r0] * (1 - fr) + plane[g1, r1] * fr
+            planes.append(c0 * (1 - fg) + c1 * fg)
+        rgb = planes[0] * (1 - fb[i]) + planes[1] * fb[i]
+        # RGB output -> BGR to match OpenCV frames
+        table[i] = np.clip(np.rint(rgb[..., ::-1] * 255.0), 0, 255)
+    return table.reshape(-1, 3)
@@ -0,0 +1,838 @@
+import os
+import time
+
+
+# Memory budget for each inter-stage frame queue
+QUEUE_BYTES = int(os.environ.get("AIVA_QUEUE_MB", "256")) * 1024 * 1024
+# Share of a render's reported progress taken by the operators' prepare()
+# analysis passes, when any op has one
+PREPARE_SHARE = 0.3
+
+
+# -----------------------------
+# FRAME OPERATORS
+# -----------------------------
+# Each operator sees the stream geometry once in setup() and then transforms
+# frames one by one. Chaining operators lets several /apply actions share a
+# single decode and a single encode of the clip.
+class FrameOp:
+    def setup(self, width, height, fps):
+        # Return the frame size this operator produces
+        return width, height
+
+    def apply(self, frame):
+        return frame
+
+    def finish(self):
+        # Extra frames to append once the source is exhausted
+        return []
+
+    def extra_frames(self):
+        # How many frames finish() will emit, for progress reporting
+        return 0
+
+    def prepare(self, input_path, progress=None, cancel=None):
+        # Optional analysis pass over the source, run once before setup()
+        pass
+
+    def reserve(self, frames):
+        # Up to `frames` of this operator's outputs can be alive downstream
+        # at once (queued or being encoded). Operators that write into
+        # preallocated buffers must rotate through at least that many.
+        pass
+
+
+class Stabilize(FrameOp):
+    # Two-pass stabilization: prepare() loads (or estimates and caches) the
+    # source's frame-to-frame motion, setup() smooths it for this render and
+    # apply() warps each frame onto the smoothed path, zoomed in by `zoom`
+    # so the shifted borders stay out of frame. The corrections are in source
+    # pixels: build_ops puts it ahead of any crop or resize.
+    def __init__(self, smoothing=30, zoom=0.05):
+        self.smoothing = int(smoothing)
+        self.zoom = zoom
+        self.motion = None
+
+    def prepare(self, input_path, progress=None, cancel=None):
+        from backend.video.stabilize import load_trajectory
+
+        self.motion = load_trajectory(input_path, progress, cancel)
+
+    def setup(self, width, height, fps):
+        import numpy as np
+
+        from backend.video.stabilize import corrections
+
+        self.size = (width, height)
+        motion = self.motion if self.motion is not None else np.zeros((0, 3))
+        self.corrections = corrections(motion, self.smoothing)
+        self.index = 0
+        return width, height
+
+    def apply(self, frame):
+        import cv2
+
+        from backend.video.stabilize import warp_matrix
+
+        if len(self.corrections):
+            # Frames past the analysed range keep the last correction
+            i = min(self.index, len(self.corrections) - 1)
+            correction = self.corrections[i]
+        else:
+            correction = (0.0, 0.0, 0.0)
+        self.index += 1
+        m = warp_matrix(correction, self.size[0], self.size[1], 1.0 + self.zoom)
+        return cv2.warpAffine(
+            frame, m, self.size, flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT
+        )
+
+
+class CenterCrop(FrameOp):
+    # Vertical slice at a fixed aspect ratio (9:16 for social)
+    def __init__(self, aspect=9 / 16):
+        self.aspect = aspect
+
+    def setup(self, width, height, fps):
+        self.height = height
+        self.target_w = int(height * self.aspect)
+        center_x = int(width / 2)
+        self.x1 = max(0, center_x - self.target_w // 2)
+        self.x2 = self.x1 + self.target_w
+        return self.target_w, height
+
+    def apply(self, frame):
+        import cv2
+
+        crop = frame[:, self.x1 : self.x2]
+        if crop.shape[1] != self.target_w:
+            crop = cv2.resize(crop, (self.target_w, self.height))
+        return crop
+
+
+class SmartCrop(CenterCrop):
+    # 9:16 slice that follows the subject. The subject is measured on the
+    # frames being rendered (every `every` frames) rather than in a separate
+    # pass over the source; apply() then just moves the slice.
+    def __init__(self, aspect=9 / 16, every=None, smoothing=15):
+        super().__init__(aspect)
+        self.every = every
+        self.smoothing = int(smoothing)
+        self.follower = None
+
+    def setup(self, width, height, fps):
+        from backend.vision.reframe import SAMPLE_EVERY, SubjectFollower
+
+        size = super().setup(width, height, fps)
+        self.width = width
+        self.follower = None
+        if self.target_w < width:
+            every = int(self.every or SAMPLE_EVERY)
+            self.follower = SubjectFollower(every, self.smoothing)
+        return size
+
+    def apply(self, frame):
+        if self.follower is not None:
+            centre = self.follower.update(frame) * self.width
+            x1 = int(round(centre - self.target_w / 2))
+            self.x1 = min(max(0, x1), self.width - self.target_w)
+            self.x2 = self.x1 + self.target_w
+        return super().apply(frame)
+
+
+class ToneLUT(FrameOp):
+    # Per-channel tone curve as a (256, 1, 3) table, applied in place with
+    # one lookup per pixel. Runs of tone operators are fused into one
+    # ToneLUT by build_ops() when that is cheaper than running them apart.
+    def __init__(self, table):
+        self.table = table
+        # Same curve on every channel: a single-channel table is ~2x faster
+        self.uniform = bool(
+            (table[:, 0, 0] == table[:, 0, 1]).all()
+            and (table[:, 0, 0] == table[:, 0, 2]).all()
+        )
+        self.kernel = table[:, 0, 0].copy() if self.uniform else table
+
+    def cost(self):
+        # Per-frame cost relative to one convertScaleAbs pass (measured on
+        # 720p BGR frames with OpenCV 4.x)
+        return 3 if self.uniform else 7
+
+    def apply(self, frame):
+        import cv2
+
+        return cv2.LUT(frame, self.kernel, dst=frame)
+
+
+class Contrast(ToneLUT):
+    # saturate(|alpha * x + beta|). On its own it runs as convertScaleAbs,
+    # which beats a table lookup; the table is used when fused.
+    def __init__(self, alpha=1.0, beta=0.0):
+        from backend.video.lut import contrast_table
+
+        self.alpha = alpha
+        self.beta = beta
+        super().__init__(contrast_table(alpha, beta))
+
+    def cost(self):
+        return 1
+
+    def apply(self, frame):
+        import cv2
+
+        return cv2.convertScaleAbs(frame, dst=frame, alpha=self.alpha, beta=self.beta)
+
+
+class Sharpen(FrameOp):
+    # Unsharp mask, written back into the incoming frame
+    def apply(self, frame):
+        import cv2
+
+        gaussian = cv2.GaussianBlur(frame, (9, 9), 10.0)
+        return cv2.addWeighted(frame, 1.5, gaussian, -0.5, 0, frame)
+
+
+class ChannelShift(ToneLUT):
+    # Teal & Orange look: push B/G/R channels by fixed (saturating) offsets.
+    # On its own it is one in-place saturating add of a per-channel scalar.
+    def __init__(self, b=30, g=-10, r=20):
+        from backend.video.lut import shift_table
+
+        self.offsets = (b, g, r)
+        super().__init__(shift_table(b, g, r))
+
+    def cost(self):
+        return 3
+
+    def apply(self, frame):
+        import cv2
+
+        return cv2.add(frame, (*self.offsets, 0), dst=frame)
+
+
+class CubeLUT(FrameOp):
+    # 3D grading LUT from a .cube file, resampled to a dense table once so
+    # each frame is a single gather. `pre` folds a preceding ToneLUT in.
+    def __init__(self, path, pre=None):
+        from backend.video.lut import CUBE_BITS
+
+        self.path = path
+        self.pre = pre
+        self.bits = CUBE_BITS
+        self.table = None
+
+    def setup(self, width, height, fps):
+        import numpy as np
+
+        from backend.video.lut import dense_cube, load_cube
+
+        cube, domain_min, domain_max = load_cube(self.path)
+        self.table = dense_cube(cube, domain_min, domain_max, self.bits, self.pre)
+        # Index buffers reused for every frame
+        self.index = np.empty((height, width), dtype=np.uint32)
+        self.scratch = np.empty((height, width), dtype=np.uint32)
+        return width, height
+
+    def apply(self, frame):
+        import numpy as np
+
+        shift = 8 - self.bits
+        idx, tmp = self.index, self.scratch
+        np.right_shift(frame[..., 0], shift, out=idx)
+        np.left_shift(idx, 2 * self.bits, out=idx)
+        np.right_shift(frame[..., 1], shift, out=tmp)
+        np.left_shift(tmp, self.bits, out=tmp)
+        np.bitwise_or(idx, tmp, out=idx)
+        np.right_shift(frame[..., 2], shift, out=tmp)
+        np.bitwise_or(idx, tmp, out=idx)
+        if not frame.flags.c_contiguous:
+            frame = np.ascontiguousarray(frame)
+        np.take(self.table, idx.reshape(-1), axis=0, out=frame.reshape(-1, 3), mode="clip")
+        return frame
+
+
+class Resize(FrameOp):
+    # Scale to a fixed height, keeping aspect (even width for encoders)
+    def __init__(self, height=540):
+        self.height = height
+
+    def setup(self, width, height, fps):
+        target_h = min(self.height, height)
+        target_w = max(2, int(round(width * target_h / height / 2)) * 2)
+        self.target = (target_w, target_h)
+        self.noop = self.target == (width, height)
+        return self.target
+
+    def apply(self, frame):
+        import cv2
+
+        if self.noop:
+            return frame
+        return cv2.resize(frame, self.target, interpolation=cv2.INTER_AREA)
+
+
+class UpscaleEngine(FrameOp):
+    # upscale_ai without per-frame allocations:
+    #  - output frames are resized straight into a ring of preallocated
+    #    buffers (see reserve()), then sharpened in place
+    #  - unsharp mask uses a 9x9 box blur (O(1) per pixel via running sums)
+    #    instead of GaussianBlur 9x9 / sigma 10, whose kernel is nearly flat
+    #    anyway; the blur goes into a reused scratch buffer
+    #  - tiled mode processes horizontal stripes with a halo, so the scratch
+    #    buffers are stripe-sized; output is identical to the untiled path
+    # Above this many output pixels (roughly 6K) tiling is switched on
+    AUTO_TILE_PIXELS = 6144 * 3456
+    # Source rows of context around each stripe: 2 for the bicubic kernel
+    # plus 2 (= 4 output rows at 2x) for the blur radius
+    HALO = 4
+
+    def __init__(self, factor=2, sharpen=True, tile_rows=None, blur=9):
+        self.factor = factor
+        self.sharpen = sharpen
+        self.tile_rows = tile_rows  # source rows per stripe; 0 = off, None = auto
+        self.blur = blur
+        self.ring_size = 2
+        self.ring = []
+        self.next = 0
+
+    def setup(self, width, height, fps):
+        self.source = (width, height)
+        self.target = (width * self.factor, height * self.factor)
+        if self.tile_rows is None:
+            big = self.target[0] * self.target[1] > self.AUTO_TILE_PIXELS
+            self.tile_rows = 64 if big else 0
+        self.ring = []
+        self.next = 0
+        self.scratch = None
+        self.tile = None
+        return self.target
+
+    def reserve(self, frames):
+        self.ring_size = max(2, frames)
+
+    def _buffer(self):
+        import numpy as np
+
+        w, h = self.target
+        if len(self.ring) < self.ring_size:
+            self.ring.append(np.empty((h, w, 3), dtype=np.uint8))
+            return self.ring[-1]
+        buf = self.ring[self.next]
+        self.next = (self.next + 1) % len(self.ring)
+        return buf
+
+    def apply(self, frame):
+        out = self._buffer()
+        if self.tile_rows:
+            self._apply_tiled(frame, out)
+        else:
+            self._apply_full(frame, out)
+        return out
+
+    def _apply_full(self, frame, out):
+        import cv2
+        import numpy as np
+
+        cv2.resize(frame, self.target, dst=out, interpolation=cv2.INTER_CUBIC)
+        if self.sharpen:
+            if self.scratch is None:
+                self.scratch = np.empty_like(out)
+            cv2.blur(out, (self.blur, self.blur), dst=self.scratch)
+            cv2.addWeighted(out, 1.5, self.scratch, -0.5, 0, dst=out)
+
+    def _apply_tiled(self, frame, out):
+        import cv2
+        import numpy as np
+
+        f = self.factor
+        w, h = self.source
+        rows = self.tile_rows
+        halo = self.HALO
+        if self.tile is None:
+            tile_h = (rows + 2 * halo) * f
+            self.tile = np.empty((tile_h, w * f, 3), dtype=np.uint8)
+            self.scratch = np.empty_like(self.tile)
+
+        for s0 in range(0, h, rows):
+            s1 = min(h, s0 + rows)
+            a, b = max(0, s0 - halo), min(h, s1 + halo)
+            th = (b - a) * f
+            tile = self.tile[:th]
+            # Stripes start on whole source rows, so the resize samples the
+            # same positions as it does on the full frame
+            cv2.resize(frame[a:b], (w * f, th), dst=tile, interpolation=cv2.INTER_CUBIC)
+            i0, i1 = (s0 - a) * f, (s1 - a) * f
+            if self.sharpen:
+                blurred = self.scratch[:th]
+                cv2.blur(tile, (self.blur, self.blur), dst=blurred)
+                cv2.addWeighted(
+                    tile[i0:i1], 1.5, blurred[i0:i1], -0.5, 0, dst=out[s0 * f : s1 * f]
+                )
+            else:
+                out[s0 * f : s1 * f] = tile[i0:i1]
+
+
+class HoldLastFrame(FrameOp):
+    # Freeze the final frame for a while to lengthen the clip
+    def __init__(self, seconds=1.0):
+        self.seconds = seconds
+        self.last = None
+
+    def setup(self, width, height, fps):
+        self.count = int(fps * self.seconds)
+        return width, height
+
+    def apply(self, frame):
+        # Copy: later operators may write into the frame they are handed
+        self.last = frame.copy()
+        return frame
+
+    def finish(self):
+        if self.last is None:
+            return
+        # A fresh copy per frame: later operators may write into it, and
+        # one shared array would be graded again on every tail frame
+        for _ in range(self.count):
+            yield self.last.copy()
+
+    def extra_frames(self):
+        return self.count
+
+
+def _color_adjust(options):
+    # Brightness / contrast / gamma sliders compiled into one tone curve
+    from backend.video.lut import compile_steps
+
+    steps = [
+        ("contrast", options.get("contrast", 1.0), options.get("brightness", 0.0)),
+        ("gamma", options.get("gamma", 1.0)),
+    ]
+    return ToneLUT(compile_steps(steps))
+
+
+def _cube(options):
+    path = options.get("lut_path")
+    if not path or not os.path.exists(path):
+        raise ValueError("apply_lut needs an existing .cube file in lut_path")
+    return CubeLUT(path)
+
+
+# action -> (operator factory, output filename tag). Factories take the
+# request options (payload "context"); most ignore them.
+VIDEO_ACTIONS = {
+    "stabilize_video": (
+        lambda o: [Stabilize(o.get("smoothing", 30), o.get("zoom", 0.05))],
+        "stable",
+    ),
+    "smart_crop": (
+        lambda o: [SmartCrop(9 / 16, o.get("sample_every"), o.get("smoothing", 15))],
+        "9x16",
+    ),
+    "color_boost": (lambda o: [Contrast(alpha=1.2, beta=30)], "bright"),
+    "smart_enhance": (lambda o: [Sharpen(), Contrast(alpha=1.1, beta=5)], "enhanced"),
+    "cinematic_grade": (lambda o: [ChannelShift(30, -10, 20)], "cine"),
+    "color_adjust": (lambda o: [_color_adjust(o)], "adjusted"),
+    "apply_lut": (lambda o: [_cube(o)], "lut"),
+    "upscale_ai": (lambda o: [UpscaleEngine(2, tile_rows=o.get("tile_rows"))], "2x"),
+    "extend_scene": (lambda o: [HoldLastFrame(1.0)], "extended"),
+}
+
+
+def build_ops(actions, options=None):
+    ops = []
+    for action in actions:
+        if action not in VIDEO_ACTIONS:
+            raise ValueError(f"Unknown video action: {action}")
+        factory, _ = VIDEO_ACTIONS[action]
+        ops.extend(factory(options or {}))
+    # Stabilize's corrections are measured on the source frames, so it runs
+    # before anything that crops or rescales them (colour ops don't care)
+    ops.sort(key=lambda op: not isinstance(op, Stabilize))
+    return fuse_luts(ops)
+
+
+def fuse_luts(ops):
+    # A run of tone curves becomes one table when one lookup is cheaper than
+    # the separate passes, and tone curves right before a 3D LUT are folded
+    # into it (the 3D lookup costs the same either way)
+    from backend.video.lut import compose
+
+    fused = []
+    run = []
+
+    def flush():
+        if len(run) > 1:
+            table = run[0].table
+            for op in run[1:]:
+                table = compose(table, op.table)
+            lut = ToneLUT(table)
+            if lut.cost() < sum(op.cost() for op in run):
+                fused.append(lut)
+                run.clear()
+                return
+        fused.extend(run)
+        run.clear()
+
+    for op in ops:
+        if isinstance(op, ToneLUT):
+            run.append(op)
+            continue
+        if isinstance(op, CubeLUT) and run and op.pre is None:
+            table = run[0].table
+            for prev in run[1:]:
+                table = compose(table, prev.table)
+            run.clear()
+            op = CubeLUT(op.path, pre=table)
+        flush()
+        fused.append(op)
+    flush()
+    return fused
+
+
+def output_path_for(input_path, actions):
+    name, _ = os.path.splitext(input_path)
+    tag = "_".join(VIDEO_ACTIONS[a][1] for a in actions)
+    return f"{name}_{tag}_{int(time.time())}.mp4"
+
+
+def _chain(ops, frame):
+    for op in ops:
+        frame = op.apply(frame)
+    return frame
+
+
+def _tail(ops):
+    # Frames emitted by an operator at the end still pass through the
+    # operators that come after it
+    for i, op in enumerate(ops):
+        for frame in op.finish():
+            yield _chain(ops[i + 1 :], frame)
+
+
+# -----------------------------
+# RENDER
+# -----------------------------
+# Sentinel marking the end of a stage's output
+_DONE = object()
+
+
+class RenderCancelled(Exception):
+    pass
+
+
+def _put(q, item, stop):
+    # Blocking put that gives up once another stage has failed
+    import queue
+
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    import queue
+
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def _frame_reader(cap, count=None):
+    # cap.read() that stops after `count` frames when rendering a range
+    if count is None:
+        return cap.read
+
+    remaining = [count]
+
+    def read():
+        if remaining[0] <= 0:
+            return False, None
+        remaining[0] -= 1
+        return cap.read()
+
+    return read
+
+
+def _run_serial(read, ops, write, timings, tail):
+    frames = 0
+    while True:
+        t0 = time.perf_counter()
+        ret, frame = read()
+        t1 = time.perf_counter()
+        timings["decode"] += t1 - t0
+        if not ret:
+            break
+        frame = _chain(ops, frame)
+        t2 = time.perf_counter()
+        timings["transform"] += t2 - t1
+        write(frame)
+        timings["encode"] += time.perf_counter() - t2
+        frames += 1
+
+    if tail:
+        for frame in _tail(ops):
+            write(frame)
+            frames += 1
+    return frames
+
+
+def _run_threaded(read, ops, write, timings, tail, queue_size):
+    # Decode, transform and encode each get their own thread, joined by
+    # bounded queues. OpenCV releases the GIL inside read/resize/write, so
+    # the stages genuinely overlap; full queues block the producer, which
+    # caps memory at roughly 2 * queue_size frames in flight.
+    import queue
+    import threading
+
+    decoded = queue.Queue(maxsize=queue_size)
+    processed = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+
+    def decode():
+        try:
+            while True:
+                t0 = time.perf_counter()
+                ret, frame = read()
+                timings["decode"] += time.perf_counter() - t0
+                if not ret:
+                    break
+                if not _put(decoded, frame, stop):
+                    return
+            _put(decoded, _DONE, stop)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
+    def transform():
+        try:
+            while True:
+                frame = _get(decoded, stop)
+                if frame is _DONE:
+                    break
+                t0 = time.perf_counter()
+                frame = _chain(ops, frame)
+                timings["transform"] += time.perf_counter() - t0
+                if not _put(processed, frame, stop):
+                    return
+            for frame in _tail(ops) if tail else []:
+                if not _put(processed, frame, stop):
+                    return
+            _put(processed, _DONE, stop)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
+    workers = [
+        threading.Thread(target=decode, daemon=True),
+        threading.Thread(target=transform, daemon=True),
+    ]
+    for w in workers:
+        w.start()
+
+    # Encode on the calling thread
+    frames = 0
+    try:
+        while True:
+            frame = _get(processed, stop)
+            if frame is _DONE:
+                break
+            t0 = time.perf_counter()
+            write(frame)
+            timings["encode"] += time.perf_counter() - t0
+            frames += 1
+    except Exception as e:
+        errors.append(e)
+    finally:
+        stop.set()
+        for w in workers:
+            w.join()
+
+    if errors:
+        raise errors[0]
+    return frames
+
+
+def queue_depth(frame_bytes, queue_size):
+    return max(2, min(queue_size, QUEUE_BYTES // max(1, frame_bytes)))
+
+
+def _prepare(ops, input_path, total, progress=None, cancel=None):
+    # Run each op's prepare(), reporting its passes as the first
+    # PREPARE_SHARE of one range that the render then continues, in units
+    # of one render frame. Returns the units used (the render's offset).
+    preparing = [op for op in ops if type(op).prepare is not FrameOp.prepare]
+    if not preparing or progress is None:
+        for op in preparing:
+            op.prepare(input_path, cancel=cancel)
+        return 0
+
+    units = max(len(preparing), int(total * PREPARE_SHARE / (1 - PREPARE_SHARE)))
+    share = units / len(preparing)
+    for i, op in enumerate(preparing):
+
+        def step(done, count, timings=None, base=i * share):
+            fraction = min(1.0, done / count) if count else 0.0
+            progress(int(base + share * fraction), units + total)
+
+        op.prepare(input_path, progress=step, cancel=cancel)
+    return units
+
+
+def render(
+    input_path,
+    output_path,
+    ops,
+    threaded=True,
+    queue_size=8,
+    start_frame=0,
+    frame_count=None,
+    tail=True,
+    progress=None,
+    cancel=None,
+    encoder=None,
+    audio_from=None,
+):
+    # encoder: settings for encoder.open_writer (encoder, codec, preset,
+    # crf, threads); audio_from: file whose audio is stream-copied into the
+    # output (only meaningful when rendering from the first frame)
+    import cv2
+
+    from backend.video.encoder import open_writer
+
+    cap = cv2.VideoCapture(input_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {input_path}")
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if frame_count is None:
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) - start_frame
+    else:
+        total = frame_count
+    total = max(0, total)
+
+    # Analysis passes (e.g. motion estimation) read the source on their own
+    try:
+        offset = _prepare(ops, input_path, total, progress, cancel)
+    except BaseException:
+        cap.release()
+        raise
+
+    size = (width, height)
+    sizes = []
+    for op in ops:
+        size = op.setup(size[0], size[1], fps)
+        sizes.append(size)
+    # Big frames get shallower queues so frames in flight stay within budget
+    largest = max([(width, height)] + sizes, key=lambda s: s[0] * s[1])
+    queue_size = queue_depth(largest[0] * largest[1] * 3, queue_size)
+    for op in ops:
+        # Frames in flight past an operator: the transform -> encode queue,
+        # one blocked on put, one being encoded and one being produced
+        op.reserve(queue_size + 3 if threaded else 2)
+
+    try:
+        out = open_writer(output_path, fps, size, audio_from=audio_from, settings=encoder)
+    except Exception:
+        cap.release()
+        raise
+
+    if tail:
+        total += sum(op.extra_frames() for op in ops)
+
+    written = [0]
+
+    def write(frame):
+        out.write(frame)
+        written[0] += 1
+        if progress is not None:
+            progress(offset + written[0], offset + total, timings)
+        if cancel is not None and cancel.is_set():
+            raise RenderCancelled()
+
+    read = _frame_reader(cap, frame_count)
+    timings = {"decode": 0.0, "transform": 0.0, "encode": 0.0}
+    start = time.perf_counter()
+    try:
+        if threaded:
+            frames = _run_threaded(read, ops, write, timings, tail, queue_size)
+        else:
+            frames = _run_serial(read, ops, write, timings, tail)
+        # Waits for the encoder to drain, so it counts towards elapsed
+        out.close()
+    except BaseException:
+        # Cancelled or failed: stop the encoder and drop the partial output
+        out.abort()
+        raise
+    finally:
+        cap.release()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "frames": frames,
+        "fps": fps,
+        "size": size,
+        "elapsed": elapsed,
+        "render_fps": frames / elapsed if elapsed > 0 else 0.0,
+        "timings": timings,
+    }
+
+
+def render_actions(
+    input_path,
+    actions,
+    threaded=True,
+    parallel=False,
+    workers=None,
+    progress=None,
+    cancel=None,
+    options=None,
+    output_path=None,
+):
+    # Run one or more video actions as a single fused decode/encode pass.
+    # output_path defaults to a new file next to input_path.
+    from backend.video.encoder import encoder_settings
+
+    if not actions:
+        raise ValueError("No video actions to apply")
+    output_path = output_path or output_path_for(input_path, actions)
+    if list(actions) == ["extend_scene"]:
+        # On its own, extending only needs the tail encoded; the clip itself
+        # is stream-copied (in a chain it's the HoldLastFrame operator)
+        from backend.video.extend import extend_video
+
+        extend_video(input_path, output_path, progress=progress, cancel=cancel)
+    elif parallel:
+        from backend.video.segments import render_parallel
+
+        render_parallel(
+            input_path,
+            output_path,
+            actions,
+            workers=workers,
+            progress=progress,
+            cancel=cancel,
+            options=options,
+        )
+    else:
+        render(
+            input_path,
+            output_path,
+            build_ops(actions, options),
+            threaded=threaded,
+            progress=progress,
+            cancel=cancel,
+            encoder=encoder_settings(options),
+            audio_from=input_path,
+        )
+    return output_path
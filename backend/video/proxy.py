@@ -0,0 +1,141 @@
+import os
+import subprocess
+import tempfile
+
+from backend.cache import build_once, cache_dir, entry_key, file_identity, touch
+from backend.video.pipeline import RenderCancelled, Resize, render
+
+# Low-resolution stand-ins for scrubbing and preview renders. Proxies are
+# keyed by the source's (path, size, mtime) and target height, live in a
+# size-bounded cache directory and are evicted least recently used first.
+PROXY_HEIGHT = int(os.environ.get("AIVA_PROXY_HEIGHT", "540"))
+MAX_BYTES = int(os.environ.get("AIVA_PROXY_CACHE_MB", "4096")) * 1024 * 1024
+# Short GOP with no B-frames: any frame is at most GOP - 1 decodes away
+# from a keyframe, so scrubbing stays cheap without all-intra file sizes
+GOP = int(os.environ.get("AIVA_PROXY_GOP", "10"))
+SUFFIX = ".mp4"
+
+
+def proxy_path(file_path, height=None):
+    height = height or PROXY_HEIGHT
+    key = entry_key(file_identity(file_path), height)
+    return os.path.join(cache_dir("proxies"), f"{key}_{height}p{SUFFIX}")
+
+
+def find_proxy(file_path, height=None):
+    # Existing proxy for the current version of the file, or None
+    try:
+        path = proxy_path(file_path, height)
+    except OSError:
+        return None
+    return path if touch(path) else None
+
+
+def needs_proxy(file_path, height=None):
+    # Only worth it when the source is taller than the proxy
+    import cv2
+
+    cap = cv2.VideoCapture(file_path)
+    try:
+        return cap.isOpened() and cap.get(cv2.CAP_PROP_FRAME_HEIGHT) > (
+            height or PROXY_HEIGHT
+        )
+    finally:
+        cap.release()
+
+
+def generate_proxy(file_path, height=None, progress=None, cancel=None):
+    height = height or PROXY_HEIGHT
+    path = proxy_path(file_path, height)
+
+    def write(tmp):
+        try:
+            _encode_ffmpeg(file_path, tmp, height, progress, cancel)
+        except RenderCancelled:
+            raise
+        except Exception as e:
+            print(f"FFmpeg proxy failed: {e}, rendering with OpenCV")
+            render(
+                file_path,
+                tmp,
+                [Resize(height)],
+                progress=progress,
+                cancel=cancel,
+            )
+
+    return build_once(path, write, MAX_BYTES, suffix=SUFFIX)
+
+
+def _encode_ffmpeg(file_path, output_path, height, progress=None, cancel=None):
+    import cv2
+
+    cap = cv2.VideoCapture(file_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-v",
+        "error",
+        "-i",
+        file_path,
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a:0?",
+        "-vf",
+        f"scale=-2:'min({height},ih)'",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-tune",
+        "fastdecode",
+        "-crf",
+        "23",
+        "-g",
+        str(GOP),
+        "-bf",
+        "0",
+        "-pix_fmt",
+        "yuv420p",
+        "-c:a",
+        "aac",
+        "-b:a",
+        "128k",
+        "-movflags",
+        "+faststart",
+        "-progress",
+        "pipe:1",
+        "-nostats",
+        output_path,
+    ]
+    # stderr goes to a file: only stdout is read, and an unread stderr pipe
+    # could fill up and stall ffmpeg
+    log = tempfile.TemporaryFile()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=log, text=True)
+    try:
+        for line in proc.stdout:
+            if cancel is not None and cancel.is_set():
+                proc.terminate()
+                proc.wait()
+                raise RenderCancelled()
+            if progress is not None and line.startswith("frame="):
+                try:
+                    done = int(line.split("=", 1)[1])
+                except ValueError:
+                    continue
+                progress(done, max(total, done))
+        proc.wait()
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        try:
+            log.seek(0)
+            message = log.read().decode(errors="replace").strip()
+        finally:
+            log.close()
+    if proc.returncode != 0:
+        raise RuntimeError(message or "ffmpeg exited with an error")
@@ -0,0 +1,290 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+from backend.video.encoder import encoder_settings, open_writer
+from backend.video.pipeline import RenderCancelled, build_ops, render
+
+# Actions whose operators only look at the current frame, so any frame range
+# can be rendered independently of the others
+SEGMENTABLE_ACTIONS = {
+    "color_boost",
+    "smart_enhance",
+    "cinematic_grade",
+    "color_adjust",
+    "apply_lut",
+    "upscale_ai",
+}
+
+# Don't bother splitting below this many frames per worker
+MIN_SEGMENT_FRAMES = 300
+# Workers look at the shared cancel flag once per this many frames; each
+# look is a round trip to the manager process
+CANCEL_POLL_FRAMES = 30
+
+
+def probe_keyframes(input_path):
+    # Presentation times (seconds) of video keyframes, or [] without ffprobe.
+    # Reads packet flags from the demuxer only; nothing is decoded.
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,flags",
+        "-of",
+        "csv=p=0",
+        input_path,
+    ]
+    try:
+        result = subprocess.run(
+            cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except Exception as e:
+        print(f"Keyframe probe failed: {e}")
+        return []
+
+    times = []
+    for line in result.stdout.decode().splitlines():
+        pts, _, flags = line.strip().partition(",")
+        if "K" not in flags:
+            continue
+        try:
+            times.append(float(pts))
+        except ValueError:
+            continue
+    # Packets come in decode order
+    return sorted(times)
+
+
+def plan_segments(total_frames, keyframes, workers, min_frames=MIN_SEGMENT_FRAMES):
+    # Split [0, total_frames) into at most `workers` contiguous ranges,
+    # moving each cut to the nearest keyframe so workers seek cleanly
+    count = max(1, min(workers, total_frames // max(1, min_frames)))
+    if count == 1:
+        return [(0, total_frames)]
+
+    candidates = sorted(set(k for k in keyframes if 0 < k < total_frames))
+    cuts = []
+    for i in range(1, count):
+        ideal = total_frames * i // count
+        if candidates:
+            ideal = min(candidates, key=lambda k: abs(k - ideal))
+        if ideal not in cuts and (not cuts or ideal > cuts[-1]):
+            cuts.append(ideal)
+
+    bounds = [0] + cuts + [total_frames]
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+def init_worker():
+    # Pool initializer: one OpenCV thread per process, the pool supplies
+    # the parallelism
+    import cv2
+
+    cv2.setNumThreads(1)
+
+
+class _PolledEvent:
+    # is_set() that only asks the wrapped event every `every` calls
+    def __init__(self, event, every=CANCEL_POLL_FRAMES):
+        self.event = event
+        self.every = max(1, int(every))
+        self.calls = 0
+        self.set_seen = False
+
+    def is_set(self):
+        if not self.set_seen and self.calls % self.every == 0:
+            self.set_seen = self.event.is_set()
+        self.calls += 1
+        return self.set_seen
+
+
+def _render_segment(job):
+    input_path, output_path, actions, options, start, count, last, stop = job
+    # The final range reads to EOF (frame counts from containers are only
+    # estimates) and is the only one allowed to emit tail frames. Audio is
+    # added once, when the segments are joined.
+    stats = render(
+        input_path,
+        output_path,
+        build_ops(actions, options),
+        start_frame=start,
+        frame_count=None if last else count,
+        tail=last,
+        cancel=_PolledEvent(stop),
+        encoder=encoder_settings(options),
+    )
+    return stats["frames"]
+
+
+def concat_copy(segment_paths, output_path, audio_from=None):
+    # Join segments without re-encoding via the ffmpeg concat demuxer,
+    # stream-copying the audio of `audio_from` alongside. Raises on failure.
+    list_path = output_path + ".concat.txt"
+    with open(list_path, "w") as f:
+        for path in segment_paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    try:
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+        ]
+        if audio_from:
+            cmd += ["-i", audio_from, "-map", "0:v:0", "-map", "1:a:0?"]
+        cmd += ["-c", "copy", "-movflags", "+faststart", output_path]
+        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finally:
+        if os.path.exists(list_path):
+            os.remove(list_path)
+
+
+def concat_segments(segment_paths, output_path, audio_from=None, encoder=None):
+    try:
+        concat_copy(segment_paths, output_path, audio_from)
+    except Exception as e:
+        print(f"FFmpeg concat failed: {e}, re-encoding segments")
+        # Fallback: decode the segments back to back into one writer
+        render_concat(segment_paths, output_path, encoder)
+
+
+def render_concat(segment_paths, output_path, encoder=None):
+    import cv2
+
+    out = None
+    try:
+        for path in segment_paths:
+            cap = cv2.VideoCapture(path)
+            if out is None:
+                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                fps = cap.get(cv2.CAP_PROP_FPS)
+                out = open_writer(output_path, fps, (width, height), settings=encoder)
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                out.write(frame)
+            cap.release()
+    except BaseException:
+        if out is not None:
+            out.abort()
+        raise
+    if out is not None:
+        out.close()
+
+
+def render_parallel(
+    input_path,
+    output_path,
+    actions,
+    workers=None,
+    progress=None,
+    cancel=None,
+    options=None,
+):
+    import cv2
+    import multiprocessing
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    workers = workers or os.cpu_count() or 1
+    unsupported = [a for a in actions if a not in SEGMENTABLE_ACTIONS]
+
+    cap = cv2.VideoCapture(input_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {input_path}")
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+
+    keyframes = [int(round(t * fps)) for t in probe_keyframes(input_path)] if fps else []
+    segments = plan_segments(total, keyframes, workers)
+
+    if unsupported or not keyframes or len(segments) == 1:
+        # Stateful actions, short clips and sources whose keyframes are
+        # unknown (no ffprobe) render in a single pass: segments cut between
+        # keyframes would start with an inexact seek
+        stats = render(
+            input_path,
+            output_path,
+            build_ops(actions, options),
+            progress=progress,
+            cancel=cancel,
+            encoder=encoder_settings(options),
+            audio_from=input_path,
+        )
+        return stats["frames"]
+
+    tmp_dir = tempfile.mkdtemp(prefix="aiva_segments_")
+    # Workers poll a manager-backed copy of the cancel flag every
+    # CANCEL_POLL_FRAMES frames, so a cancel stops the running segments
+    # instead of waiting them out
+    manager = multiprocessing.Manager()
+    try:
+        stop = manager.Event()
+        jobs = []
+        for i, (start, end) in enumerate(segments):
+            segment_path = os.path.join(tmp_dir, f"segment_{i:04d}.mp4")
+            last = i == len(segments) - 1
+            jobs.append(
+                (
+                    input_path,
+                    segment_path,
+                    actions,
+                    options,
+                    start,
+                    end - start,
+                    last,
+                    stop,
+                )
+            )
+
+        # Progress is reported per finished segment; workers can't share
+        # the caller's callback across the process boundary
+        counts = [0] * len(jobs)
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)), initializer=init_worker
+        ) as pool:
+            futures = {
+                pool.submit(_render_segment, job): i for i, job in enumerate(jobs)
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                if cancel is not None and cancel.is_set():
+                    stop.set()
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    raise RenderCancelled()
+                for future in done:
+                    counts[futures[future]] = future.result()
+                if done and progress is not None:
+                    progress(sum(counts), total)
+
+        # Every range except the last must come back complete, otherwise
+        # the joined output would silently drop frames at a seam
+        for (start, end), count in zip(segments[:-1], counts[:-1]):
+            if count != end - start:
+                raise RuntimeError(
+                    f"Segment {start}-{end} rendered {count} frames, expected {end - start}"
+                )
+
+        concat_segments(
+            [job[1] for job in jobs],
+            output_path,
+            audio_from=input_path,
+            encoder=encoder_settings(options),
+        )
+        return sum(counts)
+    finally:
+        manager.shutdown()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
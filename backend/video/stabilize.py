@@ -0,0 +1,125 @@
+import math
+import os
+
+import numpy as np
+
+from backend.cache import build_once, cache_dir, entry_key, file_identity
+from backend.video.pipeline import RenderCancelled
+
+# Two-pass stabilization.
+#  - pass 1 tracks sparse corners between consecutive downscaled grayscale
+#    frames and fits a similarity transform (translation + rotation) to
+#    them; the per-frame motion is cached as a small .npy next to other
+#    derived media, keyed by the source's (path, size, mtime)
+#  - pass 2 smooths the accumulated trajectory and warps full-resolution
+#    frames by the difference (Stabilize operator in the pipeline), so a
+#    different smoothing strength re-renders without re-estimating motion
+VERSION = 1
+ANALYSIS_WIDTH = 320
+MAX_CORNERS = 200
+# Fewer surviving tracks than this and the frame is treated as static
+MIN_TRACKS = 8
+MAX_BYTES = int(os.environ.get("AIVA_TRAJECTORY_CACHE_MB", "64")) * 1024 * 1024
+SUFFIX = ".npy"
+
+def trajectory_path(file_path):
+    key = entry_key(file_identity(file_path), ANALYSIS_WIDTH, VERSION)
+    return os.path.join(cache_dir("stabilize"), key + SUFFIX)
+
+
+def estimate_motion(file_path, progress=None, cancel=None):
+    # float32 (frames, 3): (dx, dy, angle) from the previous frame to this
+    # one, in full-resolution pixels and radians; row 0 is zero
+    import cv2
+
+    cap = cv2.VideoCapture(file_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {file_path}")
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    scale = width / ANALYSIS_WIDTH if width > ANALYSIS_WIDTH else 1.0
+    size = (int(round(width / scale)), int(round(height / scale)))
+    min_distance = max(4, size[0] // 40)
+
+    motion = []
+    prev = None
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if scale != 1.0:
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+            step = (0.0, 0.0, 0.0)
+            if prev is not None:
+                points = cv2.goodFeaturesToTrack(
+                    prev, MAX_CORNERS, 0.01, min_distance, blockSize=3
+                )
+                if points is not None and len(points) >= MIN_TRACKS:
+                    moved, status, _ = cv2.calcOpticalFlowPyrLK(prev, gray, points, None)
+                    ok = status.reshape(-1) == 1
+                    if ok.sum() >= MIN_TRACKS:
+                        m, _ = cv2.estimateAffinePartial2D(
+                            points[ok], moved[ok], method=cv2.RANSAC
+                        )
+                        if m is not None:
+                            step = (
+                                m[0, 2] * scale,
+                                m[1, 2] * scale,
+                                math.atan2(m[1, 0], m[0, 0]),
+                            )
+            motion.append(step)
+            prev = gray
+
+            if progress is not None:
+                progress(len(motion), total)
+            if cancel is not None and cancel.is_set():
+                raise RenderCancelled()
+    finally:
+        cap.release()
+    return np.array(motion, dtype=np.float32).reshape(-1, 3)
+
+
+def load_trajectory(file_path, progress=None, cancel=None):
+    # Cached per-frame motion for the current version of file_path
+    path = trajectory_path(file_path)
+
+    def write(tmp):
+        np.save(tmp, estimate_motion(file_path, progress, cancel))
+
+    return np.load(build_once(path, write, MAX_BYTES, suffix=SUFFIX))
+
+
+def corrections(motion, radius=30):
+    # Per-frame (dx, dy, angle) that moves each frame from its measured
+    # position onto a moving average of the trajectory (window 2r + 1)
+    trajectory = np.cumsum(motion.astype(np.float64), axis=0)
+    if radius <= 0 or len(trajectory) == 0:
+        return np.zeros_like(trajectory)
+    window = 2 * int(radius) + 1
+    padded = np.pad(trajectory, ((radius, radius), (0, 0)), mode="edge")
+    kernel = np.ones(window) / window
+    smoothed = np.stack(
+        [np.convolve(padded[:, i], kernel, mode="valid") for i in range(3)], axis=1
+    )
+    return smoothed - trajectory
+
+
+def warp_matrix(correction, width, height, zoom=1.0):
+    # Rotate by the correction angle about the frame centre, shift, then
+    # scale up about the centre so the moved edges stay out of view
+    dx, dy, angle = correction
+    cx, cy = width / 2.0, height / 2.0
+    a = zoom * math.cos(angle)
+    b = zoom * math.sin(angle)
+    return np.array(
+        [
+            [a, -b, cx - a * cx + b * cy + zoom * dx],
+            [b, a, cy - b * cx - a * cy + zoom * dy],
+        ],
+        dtype=np.float64,
+    )
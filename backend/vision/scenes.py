@@ -0,0 +1,252 @@
+import os
+
+# Hue-histogram correlation below this marks a cut
+THRESHOLD = 0.6
+# Files shorter than this (about a minute at 30 fps) are scanned in-process
+MIN_RANGE_FRAMES = 1800
+
+
+def hue_hist(frame, width=None):
+    # Normalised 180-bin hue histogram, optionally on a downscaled copy.
+    # A 160 px wide thumbnail gives practically the same histogram as the
+    # full frame for a fraction of the colour-conversion cost.
+    import cv2
+
+    if width and frame.shape[1] > width:
+        height = max(1, int(frame.shape[0] * width / frame.shape[1]))
+        frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0], None, [180], [0, 180])
+    cv2.normalize(hist, hist, 0, 1, cv2.NORM_MINMAX)
+    return hist
+
+
+def _correl(a, b):
+    import cv2
+
+    return cv2.compareHist(a, b, cv2.HISTCMP_CORREL)
+
+
+def enforce_spacing(cuts, min_gap):
+    # Keep cuts at least min_gap frames after the previous kept cut
+    # (the original "min 1 sec" rule; frame 0 acts as the first cut)
+    kept = []
+    last = 0
+    for frame in sorted(cuts):
+        if frame - last > min_gap:
+            kept.append(frame)
+            last = frame
+    return kept
+
+
+def detect_full(input_path, threshold=THRESHOLD, width=None, start_frame=0, end_frame=None):
+    # Decode and score every frame. Returns the raw cut frames (before the
+    # spacing rule), the fps and the index one past the last frame read
+    import cv2
+
+    cap = cv2.VideoCapture(input_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    prev_hist = None
+    cuts = []
+    frame_idx = start_frame
+    try:
+        while end_frame is None or frame_idx < end_frame:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            hist = hue_hist(frame, width)
+            if prev_hist is not None and _correl(prev_hist, hist) < threshold:
+                cuts.append(frame_idx)
+            prev_hist = hist
+            frame_idx += 1
+    finally:
+        cap.release()
+    return cuts, fps, frame_idx
+
+
+def detect_fast(
+    input_path,
+    stride=5,
+    width=160,
+    threshold=THRESHOLD,
+    start_frame=0,
+    end_frame=None,
+):
+    # Coarse pass: grab() every frame (no colour conversion or copy) but
+    # only retrieve and score every `stride`-th one on a thumbnail.
+    # Fine pass: for each coarse window whose ends differ, decode that
+    # window densely and locate the exact cut frame.
+    import cv2
+
+    cap = cv2.VideoCapture(input_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    stride = max(1, int(stride))
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    candidates = []  # (first, last) frame of a coarse window containing a cut
+    prev = None  # (frame index, hist)
+    frame_idx = start_frame
+    try:
+        while end_frame is None or frame_idx < end_frame:
+            if (frame_idx - start_frame) % stride:
+                if not cap.grab():
+                    break
+                frame_idx += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            hist = hue_hist(frame, width)
+            if prev is not None and _correl(prev[1], hist) < threshold:
+                candidates.append((prev[0], frame_idx))
+            prev = (frame_idx, hist)
+            frame_idx += 1
+
+        cuts = []
+        for first, last in candidates:
+            cut = _refine(cap, first, last, width, threshold)
+            if cut is not None:
+                cuts.append(cut)
+    finally:
+        cap.release()
+    return cuts, fps, frame_idx
+
+
+def _refine(cap, first, last, width, threshold):
+    # Decode frames first..last densely; the cut is the frame that differs
+    # most from its predecessor, if that difference crosses the threshold
+    import cv2
+
+    if last - first <= 1:
+        return last
+    cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+    prev_hist = None
+    best = None
+    for idx in range(first, last + 1):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        hist = hue_hist(frame, width)
+        if prev_hist is not None:
+            score = _correl(prev_hist, hist)
+            if score < threshold and (best is None or score < best[1]):
+                best = (idx, score)
+        prev_hist = hist
+    return best[0] if best else None
+
+
+def _scan_range(job):
+    # Worker: scan [scan_start, scan_end) but only report cuts in the owned
+    # range [start, end), so a cut seen by two overlapping scans is kept once
+    input_path, mode, stride, width, threshold, start, end, overlap = job
+    scan_start = max(0, start - overlap)
+    scan_end = None if end is None else end + overlap
+    if mode == "full":
+        cuts, fps, reached = detect_full(
+            input_path, threshold, None, scan_start, scan_end
+        )
+    else:
+        cuts, fps, reached = detect_fast(
+            input_path, stride, width, threshold, scan_start, scan_end
+        )
+    owned = [c for c in cuts if c >= start and (end is None or c < end)]
+    return owned, fps, min(reached, end) if end is not None else reached
+
+
+def detect_scenes(
+    input_path,
+    mode="fast",
+    stride=5,
+    width=160,
+    threshold=THRESHOLD,
+    workers=None,
+    use_index=True,
+):
+    # Long files are split into contiguous ranges scored in a process pool.
+    # Each worker overlaps its neighbours by one coarse step (one frame in
+    # full mode) so cuts at a seam are still detected; owned ranges don't
+    # overlap, so merging is a plain union. The min 1 sec spacing rule is
+    # applied once to the merged list, which gives the same result as a
+    # single sequential scan.
+    import cv2
+    from concurrent.futures import ProcessPoolExecutor
+
+    from backend.video.segments import init_worker, plan_segments, probe_keyframes
+
+    from backend.features import THUMB_WIDTH
+
+    if use_index and mode != "full" and width == THUMB_WIDTH:
+        # Ingested files: score the stored thumbnail histograms, no decode.
+        # They are THUMB_WIDTH wide, so other widths still decode.
+        found = _detect_indexed(input_path, stride, threshold)
+        if found is not None:
+            return found
+
+    workers = workers or os.cpu_count() or 1
+    stride = max(1, int(stride))
+    overlap = 1 if mode == "full" else stride
+
+    cap = cv2.VideoCapture(input_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {input_path}")
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+
+    ranges = [(0, None)]
+    if workers > 1 and total > MIN_RANGE_FRAMES:
+        keyframes = [int(round(t * fps)) for t in probe_keyframes(input_path)]
+        ranges = plan_segments(total, keyframes, workers, min_frames=MIN_RANGE_FRAMES)
+        # Container frame counts are estimates: the last range reads to EOF
+        ranges[-1] = (ranges[-1][0], None)
+
+    jobs = [
+        (input_path, mode, stride, width, threshold, start, end, overlap)
+        for start, end in ranges
+    ]
+    if len(jobs) == 1:
+        results = [_scan_range(jobs[0])]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)), initializer=init_worker
+        ) as pool:
+            results = list(pool.map(_scan_range, jobs))
+
+    cuts = sorted(set(c for owned, _, _ in results for c in owned))
+    cuts = enforce_spacing(cuts, fps)
+    frames = results[-1][2]
+    return [{"time": f / fps, "frame": int(f)} for f in cuts], frames
+
+
+def _detect_indexed(input_path, stride, threshold):
+    # detect_fast over the stored thumbnail histograms: every stride-th row
+    # is compared to the previous one, and only windows that differ are read
+    # densely to place the cut, so the result matches a decoding scan
+    import numpy as np
+
+    from backend.features import get_hues, hue_correlation
+
+    coarse = get_hues(input_path, stride)
+    if coarse is None or not coarse["frames"]:
+        return None
+    fps = coarse["fps"] or 30.0
+    index = coarse["index"]
+    scores = hue_correlation(coarse["hue"])
+
+    cuts = []
+    for i in np.nonzero(scores < threshold)[0]:
+        first, last = int(index[i]), int(index[i + 1])
+        if last - first <= 1:
+            cuts.append(last)
+            continue
+        dense = get_hues(input_path, 1, first, last + 1)
+        if dense is None:
+            return None
+        window = hue_correlation(dense["hue"])
+        if len(window) and window.min() < threshold:
+            cuts.append(int(dense["index"][int(np.argmin(window)) + 1]))
+    cuts = enforce_spacing(cuts, fps)
+    return [{"time": f / fps, "frame": int(f)} for f in cuts], coarse["frames"]
@@ -0,0 +1,216 @@
+import os
+import subprocess
+import threading
+
+import numpy as np
+
+from backend.voice import whisper_engine
+
+SR = 16000
+# Windows aim for WINDOW_S seconds and are cut at the quietest 30 ms frame
+# within the last SEARCH_S seconds, so words are not split across windows
+WINDOW_S = 30.0
+SEARCH_S = 6.0
+FRAME = int(SR * 0.03)
+WORKERS = int(os.environ.get("AIVA_TRANSCRIBE_WORKERS", "2"))
+
+
+def stream_audio(file_path, block_s=5.0, sr=SR):
+    # Yield mono float32 blocks at `sr` (16 kHz for Whisper) without holding
+    # the whole file. ffmpeg handles any container; soundfile is the
+    # fallback for plain audio
+    block = int(sr * block_s)
+    cmd = [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-i",
+        file_path,
+        "-f",
+        "f32le",
+        "-ac",
+        "1",
+        "-ar",
+        str(sr),
+        "-",
+    ]
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        yield from _stream_soundfile(file_path, block, sr)
+        return
+
+    got_audio = False
+    try:
+        while True:
+            raw = proc.stdout.read(block * 4)
+            if not raw:
+                break
+            got_audio = True
+            yield np.frombuffer(raw[: len(raw) - len(raw) % 4], dtype="<f4")
+    finally:
+        # Closed early (e.g. the client went away): stop ffmpeg too
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+
+    if not got_audio and proc.returncode != 0:
+        yield from _stream_soundfile(file_path, block, sr)
+
+
+def _stream_soundfile(file_path, block, sr=SR):
+    import soundfile as sf
+
+    info = sf.info(file_path)
+    native_block = int(block * info.samplerate / sr)
+    for data in sf.blocks(file_path, blocksize=native_block, dtype="float32"):
+        if data.ndim > 1:
+            data = data.mean(axis=1)
+        if info.samplerate != sr:
+            import scipy.signal
+
+            data = scipy.signal.resample_poly(data, sr, info.samplerate)
+        yield data.astype(np.float32)
+
+
+def split_windows(blocks, window_s=WINDOW_S, search_s=SEARCH_S):
+    # Regroup a block stream into (offset_seconds, audio) windows cut at
+    # low-energy points. Only the current window is ever held in memory.
+    target = int(window_s * SR)
+    search = int(search_s * SR)
+    buf = np.zeros(0, dtype=np.float32)
+    offset = 0
+
+    for data in blocks:
+        buf = np.concatenate([buf, data])
+        while len(buf) >= target:
+            region = buf[target - search : target]
+            n = len(region) // FRAME
+            energy = np.mean(region[: n * FRAME].reshape(n, FRAME) ** 2, axis=1)
+            cut = target - search + int(np.argmin(energy)) * FRAME + FRAME // 2
+            yield offset / SR, buf[:cut]
+            offset += cut
+            buf = buf[cut:]
+
+    if len(buf) > 0:
+        yield offset / SR, buf
+
+
+class _ModelPool:
+    # Whisper installs per-call hooks on its modules, so concurrent
+    # transcribe() calls need their own model instance per worker thread.
+    # Every worker borrows a replica from whisper_engine (never the shared
+    # model, which /voice and transcribe_file may be using right now) and
+    # hands it back in close()
+    def __init__(self, size):
+        self.size = size
+        self.local = threading.local()
+        self.borrowed = []
+        self.borrowed_lock = threading.Lock()
+
+    def get(self):
+        m = getattr(self.local, "model", None)
+        if m is None:
+            m = whisper_engine.acquire_replica(self.size)
+            with self.borrowed_lock:
+                self.borrowed.append(m)
+            self.local.model = m
+        return m
+
+    def close(self):
+        with self.borrowed_lock:
+            borrowed, self.borrowed = self.borrowed, []
+        for m in borrowed:
+            whisper_engine.release_replica(self.size, m)
+
+
+def transcribe_long(file_path, workers=WORKERS, window_s=WINDOW_S, use_cache=True):
+    # Yields segments (timestamps on the original timeline) in order as
+    # windows finish, then a final {"type": "done"} summary
+    from concurrent.futures import ThreadPoolExecutor
+
+    from backend.voice import transcript_cache
+
+    size = whisper_engine.settings["file_model"]
+    key = None
+    if use_cache:
+        key = transcript_cache.cache_key(
+            file_path, size, {"fp16": False, "long_form": True, "window_s": window_s}
+        )
+        cached = transcript_cache.get(key)
+        if cached is not None:
+            for seg in cached["segments"]:
+                yield {"type": "segment", **seg}
+            yield {
+                "type": "done",
+                "text": cached["text"],
+                "language": cached.get("language"),
+                "segments": len(cached["segments"]),
+                "cached": True,
+            }
+            return
+
+    pool = _ModelPool(size)
+
+    def run(window):
+        offset, audio = window
+        result = pool.get().transcribe(audio, fp16=False)
+        segments = []
+        for seg in result.get("segments", []):
+            segments.append(
+                {
+                    "type": "segment",
+                    "start": round(float(seg["start"]) + offset, 3),
+                    "end": round(float(seg["end"]) + offset, 3),
+                    "text": seg["text"],
+                }
+            )
+        return segments, result.get("language")
+
+    blocks = stream_audio(file_path)
+    windows = split_windows(blocks, window_s=window_s)
+    all_segments = []
+    language = None
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        # At most 2 * workers windows are decoded ahead of inference, which
+        # bounds memory no matter how long the file is
+        pending = []
+        while True:
+            for window in windows:
+                pending.append(executor.submit(run, window))
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                break
+            # Emit in timeline order: wait on the oldest window
+            segments, lang = pending.pop(0).result()
+            language = language or lang
+            for seg in segments:
+                seg["id"] = len(all_segments)
+                all_segments.append(seg)
+                yield seg
+    finally:
+        # Also runs when the consumer closes this generator early: queued
+        # windows are dropped, running ones finish before their models are
+        # handed back, and the decoder subprocess is stopped
+        executor.shutdown(wait=True, cancel_futures=True)
+        pool.close()
+        blocks.close()
+
+    text = "".join(seg["text"] for seg in all_segments).strip()
+    if key is not None and text:
+        segments = [
+            {k: v for k, v in seg.items() if k != "type"} for seg in all_segments
+        ]
+        transcript_cache.put(
+            key, {"text": text, "language": language, "segments": segments}
+        )
+
+    yield {
+        "type": "done",
+        "text": text,
+        "language": language,
+        "segments": len(all_segments),
+    }
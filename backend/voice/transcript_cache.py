@@ -0,0 +1,65 @@
+import gzip
+import hashlib
+import json
+import os
+
+from backend.cache import cache_dir, content_hash, evict_lru, touch
+
+MAX_BYTES = int(os.environ.get("AIVA_TRANSCRIPT_CACHE_MB", "256")) * 1024 * 1024
+SUFFIX = ".json.gz"
+
+
+def cache_key(file_path, model, options):
+    # Same bytes + same model + same decode options -> same transcript,
+    # wherever the file lives and whatever it is called
+    raw = json.dumps(
+        {"content": content_hash(file_path), "model": model, "options": options},
+        sort_keys=True,
+    )
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(cache_dir("transcripts"), key + SUFFIX)
+
+
+def get(key):
+    path = _entry_path(key)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            result = json.load(f)
+        touch(path)
+        return result
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Transcript cache read failed: {e}")
+        return None
+
+
+def put(key, result):
+    path = _entry_path(key)
+    # Per-process temp name: another server process may write the same key
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        # Token ids are only useful to the decoder; text and timings stay
+        segments = [
+            {k: v for k, v in seg.items() if k != "tokens"}
+            for seg in result.get("segments", [])
+        ]
+        compact = {**result, "segments": segments}
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(compact, f, separators=(",", ":"), default=_to_json)
+        os.replace(tmp, path)
+        evict_lru(os.path.dirname(path), MAX_BYTES, suffix=SUFFIX)
+    except Exception as e:
+        print(f"Transcript cache write failed: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _to_json(value):
+    # NumPy scalars/arrays that Whisper leaves in its result
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
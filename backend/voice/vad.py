@@ -0,0 +1,105 @@
+import numpy as np
+
+
+class StreamingVAD:
+    # Energy-based voice activity detector for audio that arrives in chunks
+    # of any size. Frames louder than the adaptive noise floor open a speech
+    # segment; a run of quiet frames (the hangover) closes it again. Closed
+    # segments come back with a little pre-roll so word onsets aren't clipped.
+    def __init__(
+        self,
+        sr=16000,
+        frame_ms=30,
+        start_ratio=3.0,
+        stop_ratio=1.8,
+        min_level=0.005,
+        hangover_ms=300,
+        min_speech_ms=120,
+        pre_roll_ms=200,
+        max_segment_s=15.0,
+    ):
+        self.sr = sr
+        self.frame_len = max(1, int(sr * frame_ms / 1000))
+        self.start_ratio = start_ratio
+        self.stop_ratio = stop_ratio
+        self.min_level = min_level
+        self.hangover = max(1, int(hangover_ms / frame_ms))
+        self.min_speech = max(1, int(min_speech_ms / frame_ms))
+        self.pre_roll = max(0, int(pre_roll_ms / frame_ms))
+        self.max_frames = int(max_segment_s * 1000 / frame_ms)
+
+        self.noise = None
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.history = []  # recent quiet frames, used as pre-roll
+        self.speech = []
+        self.in_speech = False
+        self.quiet_run = 0
+
+    def feed(self, samples):
+        # Returns a list of ("start", None) / ("segment", audio) events
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+        buf = np.concatenate([self.pending, samples])
+        n = len(buf) // self.frame_len
+        self.pending = buf[n * self.frame_len :]
+        if n == 0:
+            return []
+
+        frames = buf[: n * self.frame_len].reshape(n, self.frame_len)
+        levels = np.sqrt(np.mean(frames**2, axis=1))
+
+        events = []
+        for frame, level in zip(frames, levels):
+            events.extend(self._step(frame, float(level)))
+        return events
+
+    def _step(self, frame, level):
+        if self.noise is None:
+            self.noise = max(level, 1e-4)
+
+        if not self.in_speech:
+            if level > max(self.min_level, self.noise * self.start_ratio):
+                self.in_speech = True
+                self.quiet_run = 0
+                self.speech = self.history + [frame]
+                self.history = []
+                return [("start", None)]
+            # Track the noise floor only while nobody is talking
+            self.noise = 0.95 * self.noise + 0.05 * max(level, 1e-4)
+            self.history.append(frame)
+            if len(self.history) > self.pre_roll:
+                self.history.pop(0)
+            return []
+
+        self.speech.append(frame)
+        if level < max(self.min_level, self.noise * self.stop_ratio):
+            self.quiet_run += 1
+        else:
+            self.quiet_run = 0
+
+        if self.quiet_run >= self.hangover or len(self.speech) >= self.max_frames:
+            return self._close()
+        return []
+
+    def _close(self):
+        voiced = len(self.speech) - self.quiet_run
+        audio = np.concatenate(self.speech) if self.speech else None
+        self.in_speech = False
+        self.quiet_run = 0
+        self.speech = []
+        if audio is None or voiced < self.min_speech:
+            # Too short to be a word: a click or a bump on the mic
+            return []
+        return [("segment", audio)]
+
+    def current(self):
+        # Audio of the segment still in progress, for partial transcripts
+        if not self.in_speech or not self.speech:
+            return None
+        return np.concatenate(self.speech)
+
+    def flush(self):
+        if not self.in_speech:
+            return []
+        return self._close()
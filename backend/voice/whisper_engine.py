@@ -1,25 +1,114 @@
-model = None
+import os
+import threading
+import time
 
+MODEL_SIZES = ("tiny", "base", "small", "medium", "large")
 
-def get_model():
-    global model
-    if model is None:
+# Short voice commands trade accuracy for latency with a smaller model;
+# file transcription (captions) keeps the more accurate one
+settings = {
+    "command_model": os.environ.get("AIVA_WHISPER_COMMAND_MODEL", "base"),
+    "file_model": os.environ.get("AIVA_WHISPER_MODEL", "small"),
+}
+
+models = {}
+# size -> idle extra instances for parallel long-form workers, kept loaded
+# between requests so each request doesn't pay for load_model again
+replicas = {}
+status = {}  # size -> {"state": "loading"|"ready"|"error", ...}
+_lock = threading.Lock()
+
+
+def get_model(size=None):
+    size = size or settings["file_model"]
+    if size in models:
+        return models[size]
+
+    # One loader at a time; others wait here instead of loading twice
+    with _lock:
+        if size in models:
+            return models[size]
         try:
             import whisper
 
-            print("Loading Whisper model...")
-            model = whisper.load_model("small")
+            print(f"Loading Whisper model ({size})...")
+            status[size] = {"state": "loading", "since": time.time()}
+            t0 = time.time()
+            models[size] = whisper.load_model(size)
+            status[size] = {
+                "state": "ready",
+                "load_seconds": round(time.time() - t0, 2),
+            }
         except Exception as e:
             print(f"Failed to load Whisper model: {e}")
+            status[size] = {"state": "error", "error": str(e)}
             raise e
-    return model
+    return models[size]
+
+
+def acquire_replica(size):
+    # An extra model instance for exclusive use by one worker thread
+    with _lock:
+        idle = replicas.setdefault(size, [])
+        if idle:
+            return idle.pop()
+    import whisper
+
+    print(f"Loading extra Whisper model instance ({size})...")
+    return whisper.load_model(size)
+
+
+def release_replica(size, model):
+    with _lock:
+        replicas.setdefault(size, []).append(model)
+
+
+def set_model_size(kind, size):
+    # kind is "command" or "file"
+    if size not in MODEL_SIZES:
+        raise ValueError(f"Unknown Whisper model size: {size}")
+    settings[f"{kind}_model"] = size
+
+
+def warm_up(size=None):
+    # Load the model and run one dummy inference, so the first real request
+    # doesn't pay for lazy CUDA/kernel initialisation either
+    import numpy as np
+
+    size = size or settings["file_model"]
+    m = get_model(size)
+    t0 = time.time()
+    m.transcribe(np.zeros(16000, dtype=np.float32), fp16=False)
+    status[size]["warmup_seconds"] = round(time.time() - t0, 2)
+    return m
+
+
+def preload(sizes=None):
+    for size in sizes or sorted(set(settings.values())):
+        try:
+            warm_up(size)
+        except Exception as e:
+            print(f"Whisper preload failed ({size}): {e}")
+
+
+def model_status():
+    return {
+        "settings": dict(settings),
+        "models": {
+            size: dict(status.get(size, {"state": "unloaded"})) for size in MODEL_SIZES
+        },
+        "ready": all(
+            status.get(size, {}).get("state") == "ready"
+            for size in set(settings.values())
+        ),
+    }
 
 
 def transcribe(audio, sr):
     # Whisper expects 16k float32
     # If using API with array, no temp file needed
     try:
-        m = get_model()
+        m = get_model(settings["command_model"])
         # Assuming audio is already float32 valid array
         result = m.transcribe(audio, fp16=False)
         text = result["text"].strip()
@@ -30,7 +119,28 @@ def transcribe(audio, sr):
         return ""
 
 
-def transcribe_file(file_path):
+def transcribe_file(file_path, use_cache=True):
+    from backend.voice import transcript_cache
+
+    size = settings["file_model"]
+    key = None
+    if use_cache:
+        try:
+            key = transcript_cache.cache_key(file_path, size, {"fp16": False})
+            cached = transcript_cache.get(key)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            print(f"Transcript cache unavailable: {e}")
+
+    result = _transcribe_file(file_path, size)
+    # Empty results usually mean a load/decode failure; don't pin those
+    if key is not None and result.get("text"):
+        transcript_cache.put(key, result)
+    return result
+
+
+def _transcribe_file(file_path, size):
     try:
         import librosa
 
@@ -38,14 +148,14 @@ def transcribe_file(file_path):
         # This bypasses ffmpeg requirement for opening the file if librosa/soundfile can handle it
         audio, _ = librosa.load(file_path, sr=16000)
 
-        m = get_model()
+        m = get_model(size)
         result = m.transcribe(audio, fp16=False)
         return result
     except Exception as e:
         print(f"Transcribe error: {e}, attempting direct file load")
         # Fallback
         try:
-            m = get_model()
+            m = get_model(size)
             return m.transcribe(file_path, fp16=False)
         except Exception as e2:
             print(f"Fallback transcribe failed: {e2}")
@@ -1,10 +1,26 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { 
   Sliders, Wand2, FileText, Plus, Shield, Sparkles, 
   Palette, Music, Video, Target, Volume2, Scissors, Loader2, ArrowRight
 } from 'lucide-react';
 
 import { Clip } from '../types';
+import useJobEvents, { submitJob } from '../hooks/useJobEvents';
+
+// Long video renders go through the background job API and report progress
+// over the shared event stream instead of holding an /apply request open
+const VIDEO_JOB_ACTIONS = new Set([
+  'smart_enhance', 'upscale_ai', 'color_boost',
+  'stabilize_video', 'smart_crop', 'cinematic_grade'
+]);
+
+interface ActiveJob {
+  id: string;
+  action: string;
+  clipId: string;
+  clipName: string;
+  friendlyName: string;
+}
 
 interface InspectorProps {
   selectedClip: Clip | null;
@@ -16,6 +32,37 @@ interface InspectorProps {
 export const Inspector: React.FC<InspectorProps> = ({ selectedClip, onUpdateClip, onAddMarkers, showToast }) => {
   const [activeTab, setActiveTab] = useState<'properties' | 'ai' | 'color' | 'audio'>('properties');
   const [isProcessing, setIsProcessing] = useState<string | null>(null);
+  const [activeJob, setActiveJob] = useState<ActiveJob | null>(null);
+  const jobEvents = useJobEvents();
+  const activeEvent = activeJob ? jobEvents[activeJob.id] : undefined;
+
+  useEffect(() => {
+    if (!activeJob || !activeEvent) return;
+    if (activeEvent.state === 'done') {
+      if (activeEvent.output_file) {
+        onUpdateClip(activeJob.clipId, {
+          path: activeEvent.output_file,
+          name: `AI_${activeJob.clipName}`
+        });
+      }
+      showToast?.(`✅ ${activeJob.friendlyName} Complete!`, 'success');
+    } else if (activeEvent.state === 'error') {
+      showToast?.(`❌ ${activeJob.friendlyName} failed: ${activeEvent.error || 'Unknown error'}`, 'error');
+    } else if (activeEvent.state === 'cancelled') {
+      showToast?.(`${activeJob.friendlyName} cancelled`, 'error');
+    } else {
+      return;
+    }
+    setActiveJob(null);
+    setIsProcessing(null);
+  }, [activeEvent, activeJob, onUpdateClip, showToast]);
+
+  const processingLabel = (fallback: string) => {
+    if (!activeEvent || activeEvent.state !== 'running') return fallback;
+    const pct = Math.round(activeEvent.progress * 100);
+    const eta = activeEvent.eta !== null ? ` · ${Math.ceil(activeEvent.eta)}s left` : '';
+    return `${pct}% · ${activeEvent.fps.toFixed(0)} fps${eta}`;
+  };
 
   const runAI = async (action: string) => {
     if (!selectedClip) {
@@ -40,7 +87,22 @@ export const Inspector: React.FC<InspectorProps> = ({ selectedClip, onUpdateClip
     showToast?.(`🚀 Processing: ${friendlyName}...`, 'success');
     
     setIsProcessing(action);
+    let handedOff = false;
     try {
+      if (VIDEO_JOB_ACTIONS.has(action)) {
+          const jobId = await submitJob({ action, file_path: selectedClip.path });
+          setActiveJob({
+              id: jobId,
+              action,
+              clipId: selectedClip.id,
+              clipName: selectedClip.name,
+              friendlyName
+          });
+          // Completion is handled by the job event effect
+          handedOff = true;
+          return;
+      }
+
       let endpoint = 'http://localhost:8000/apply';
       // eslint-disable-next-line @typescript-eslint/no-explicit-any
       const body: any = { action, file_path: selectedClip.path };
@@ -82,7 +144,7 @@ export const Inspector: React.FC<InspectorProps> = ({ selectedClip, onUpdateClip
       const errorMsg = error instanceof Error ? error.message : 'Unknown error';
       showToast?.(`❌ ${friendlyName} error: ${errorMsg}. Is the backend running?`, "error");
     } finally {
-      setIsProcessing(null);
+      if (!handedOff) setIsProcessing(null);
     }
   };
 
@@ -273,7 +335,7 @@ export const Inspector: React.FC<InspectorProps> = ({ selectedClip, onUpdateClip
                                 </div>
                                 <div className="flex-1 text-left">
                                     <h4 className="text-xs font-bold text-zinc-200 group-hover:text-white transition-colors">{tool.label}</h4>
-                                    <p className="text-[9px] font-medium text-zinc-500 group-hover:text-zinc-400">{isProcessing === tool.id ? 'Processing...' : tool.sub}</p>
+                                    <p className="text-[9px] font-medium text-zinc-500 group-hover:text-zinc-400">{isProcessing === tool.id ? processingLabel('Processing...') : tool.sub}</p>
                                 </div>
                                 <div className="opacity-0 group-hover:opacity-100 transition-opacity -mr-2">
                                     <ArrowRight size={14} className="text-zinc-500" />
@@ -5,6 +5,7 @@ import {
 } from 'lucide-react';
 
 import { Clip } from '../types';
+import useJobEvents from '../hooks/useJobEvents';
 
 interface PreviewMonitorProps {
   selectedClip: Clip | null;
@@ -26,6 +27,29 @@ export const PreviewMonitor = React.forwardRef<HTMLVideoElement, PreviewMonitorP
   const [currentTime, setCurrentTime] = useState(0); // For source mode updates
   
   const internalVideoRef = useRef<HTMLVideoElement>(null);
+  const [proxySrc, setProxySrc] = useState<string | null>(null);
+  const jobs = useJobEvents();
+
+  // Scrub the low-res proxy once the backend has built one; the original
+  // is still what /apply renders and exports read
+  const proxyJobsDone = Object.values(jobs).filter(
+    (j) => j.action === 'proxy' && j.state === 'done' && j.file_path === selectedClip?.path
+  ).length;
+
+  useEffect(() => {
+    setProxySrc(null);
+    if (!selectedClip?.path || selectedClip.type !== 'video') return;
+    let cancelled = false;
+    fetch(`http://localhost:8000/proxy?file_path=${encodeURIComponent(selectedClip.path)}`)
+      .then((res) => res.json())
+      .then((data) => {
+        if (!cancelled && data.ready) setProxySrc(data.proxy_file);
+      })
+      .catch(() => {});
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedClip?.path, selectedClip?.type, proxyJobsDone]);
   
   React.useImperativeHandle(ref, () => internalVideoRef.current!);
 
@@ -138,7 +162,7 @@ export const PreviewMonitor = React.forwardRef<HTMLVideoElement, PreviewMonitorP
                     canPlayAsVideo(selectedClip.path) ? (
                         <video 
                             ref={internalVideoRef}
-                            src={selectedClip.path} 
+                            src={proxySrc || selectedClip.path} 
                             className={`max-w-full max-h-full shadow-2xl ${
                             selectedClip?.type === 'video' && selectedClip.name.toLowerCase().includes('wipe') 
                             ? (selectedClip.name.toLowerCase().includes('right') ? 'transition-active-wipe-right' : 'transition-active-wipe-left')
@@ -19,6 +19,7 @@ const DEFAULT_SETTINGS = {
   
   // AI
   aiModel: 'Whisper Small (Recommended)',
+  voiceCommandModel: 'Whisper Base (Balanced)',
   aiStrength: 50,
   detectSilenceThreshold: -40,
   autoGenerateProxies: false,
@@ -54,7 +55,20 @@ export const SettingsModal: React.FC<SettingsModalProps> = ({ onClose, showToast
 
   const handleSave = () => {
     localStorage.setItem('aiva_settings', JSON.stringify(settings));
-    // In a real app, this would also trigger a context update or IPC call
+    // Push model choices to the backend, which loads and warms them up
+    // "Whisper Small (Recommended)" -> "small"
+    const modelSize = (label: string) => label.split(' ')[1].toLowerCase();
+    const models = [
+      { kind: 'file', size: modelSize(settings.aiModel) },
+      { kind: 'command', size: modelSize(settings.voiceCommandModel) },
+    ];
+    models.forEach(body => {
+      fetch('http://localhost:8000/settings/voice_model', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(body)
+      }).catch(() => showToast?.("Backend unavailable: model setting not applied", 'error'));
+    });
     showToast?.("Configuration Saved Successfully", 'success');
     onClose();
   };
@@ -341,6 +355,21 @@ export const SettingsModal: React.FC<SettingsModalProps> = ({ onClose, showToast
                       </select>
                       <p className="text-[10px] text-[#52525b]">Larger models require more RAM and VRAM.</p>
                     </div>
+
+                    <div className="space-y-2">
+                      <label className="text-sm font-medium text-[#e4e4e7]">Voice Command Model</label>
+                       <select 
+                          value={settings.voiceCommandModel}
+                          onChange={(e) => updateSetting('voiceCommandModel', e.target.value)}
+                          className="w-full bg-[#18181b] border border-[#2c2c30] rounded p-2.5 text-sm text-[#e4e4e7]"
+                       >
+                        <option>Whisper Tiny (Fastest, Lower Accuracy)</option>
+                        <option>Whisper Base (Balanced)</option>
+                        <option>Whisper Small (Recommended)</option>
+                        <option>Whisper Medium (High Accuracy, Slower)</option>
+                      </select>
+                      <p className="text-[10px] text-[#52525b]">Short commands like "cut" respond faster on a smaller model.</p>
+                    </div>
                  </section>
 
                  <section className="space-y-4">
@@ -11,11 +11,16 @@ import {
   Plus,
   Monitor,
   Layout,
-  ExternalLink
+  ExternalLink,
+  Loader2
 } from 'lucide-react';
 
 import { VoiceControl } from './VoiceControl';
 import { Clip, Track } from '../types';
+import useJobEvents from '../hooks/useJobEvents';
+
+// Job actions that run as background ingest rather than user renders
+const BACKGROUND_ACTIONS = ['index', 'proxy'];
 
 interface TimelineData {
   videoTracks: Track[];
@@ -45,6 +50,14 @@ export const TopBar: React.FC<TopBarProps> = ({ onSettingsClick, onImportClick,
   const [openMenu, setOpenMenu] = useState<string | null>(null);
   const [wakeWord, setWakeWord] = useState(localStorage.getItem('aiva_wake_word') || "AIVA");
   const menuRef = useRef<HTMLDivElement>(null);
+  const jobEvents = useJobEvents();
+  // Ingest jobs (feature index, proxies) start on their own on import; only renders count here
+  const runningJobs = Object.values(jobEvents).filter(
+    j => (j.state === 'running' || j.state === 'queued') && !BACKGROUND_ACTIONS.includes(j.action)
+  );
+  const totalFrames = runningJobs.reduce((acc, j) => acc + j.frames_total, 0);
+  const doneFrames = runningJobs.reduce((acc, j) => acc + j.frames_done, 0);
+  const longestEta = runningJobs.reduce((acc, j) => Math.max(acc, j.eta ?? 0), 0);
 
   useEffect(() => {
     const handleClickOutside = (event: MouseEvent) => {
@@ -224,6 +237,19 @@ export const TopBar: React.FC<TopBarProps> = ({ onSettingsClick, onImportClick,
         <button className="btn-icon" title="Export Project" onClick={handleExport}>
           <Download size={18} />
         </button>
+        {runningJobs.length > 0 && (
+          <div
+            className="flex items-center gap-2 bg-[#2c2c30] rounded-full px-2 py-1 text-[10px] font-bold text-blue-400"
+            title={runningJobs.map(j => `${j.action}: ${Math.round(j.progress * 100)}%`).join('\n')}
+          >
+            <Loader2 size={12} className="animate-spin" />
+            <span>
+              {runningJobs.length} render{runningJobs.length > 1 ? 's' : ''}
+              {totalFrames > 0 ? ` · ${Math.round((doneFrames / totalFrames) * 100)}%` : ''}
+              {longestEta > 0 ? ` · ${Math.ceil(longestEta)}s` : ''}
+            </span>
+          </div>
+        )}
         <div className="w-[1px] h-6 bg-[#2c2c30] mx-2"></div>
         <div className="flex items-center gap-2 bg-[#2c2c30] rounded-full px-2 py-1">
              <span className="text-[10px] text-zinc-500 font-bold uppercase">Name</span>
@@ -97,19 +97,18 @@ export const VoiceControl: React.FC<VoiceControlProps> = ({
       offset += chunk.length;
     }
 
-    // Convert to regular array for JSON
-    const audioArray = Array.from(combinedAudio);
-
     try {
-      const response = await fetch("http://localhost:8000/voice", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          audio: audioArray,
-          sr: contextSr,
-          // wake_word: wakeWord // Disabled: Push-to-talk shouldn't require wake word
-        }),
-      });
+      // Raw little-endian float32 PCM: the backend reads it straight into a
+      // NumPy array instead of parsing a JSON list of floats.
+      // wake_word is disabled: Push-to-talk shouldn't require wake word
+      const response = await fetch(
+        `http://localhost:8000/voice?sr=${contextSr}&format=f32`,
+        {
+          method: "POST",
+          headers: { "Content-Type": "application/octet-stream" },
+          body: combinedAudio.buffer,
+        }
+      );
 
       const data = await response.json();
 
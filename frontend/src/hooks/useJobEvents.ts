@@ -0,0 +1,75 @@
+import { useEffect, useState } from "react";
+
+export interface JobEvent {
+  type: string;
+  job_id: string;
+  action: string;
+  file_path: string;
+  state: "queued" | "running" | "done" | "error" | "cancelled";
+  frames_done: number;
+  frames_total: number;
+  progress: number;
+  eta: number | null;
+  fps: number;
+  timings: { decode: number; transform: number; encode: number } | null;
+  output_file: string | null;
+  error: string | null;
+}
+
+type Listener = (jobs: Record<string, JobEvent>) => void;
+
+// One EventSource shared by every component: the backend multiplexes all
+// job progress onto a single stream, so polling per job is unnecessary.
+let source: EventSource | null = null;
+let jobs: Record<string, JobEvent> = {};
+const listeners = new Set<Listener>();
+
+function connect() {
+  if (source) return;
+  source = new EventSource("http://localhost:8000/jobs/events");
+  source.addEventListener("job", (e) => {
+    const event: JobEvent = JSON.parse((e as MessageEvent).data);
+    jobs = { ...jobs, [event.job_id]: event };
+    listeners.forEach((listener) => listener(jobs));
+  });
+  // EventSource reconnects on its own after network errors
+}
+
+function disconnect() {
+  if (listeners.size > 0 || !source) return;
+  source.close();
+  source = null;
+}
+
+export default function useJobEvents() {
+  const [state, setState] = useState<Record<string, JobEvent>>(jobs);
+
+  useEffect(() => {
+    listeners.add(setState);
+    connect();
+    return () => {
+      listeners.delete(setState);
+      disconnect();
+    };
+  }, []);
+
+  return state;
+}
+
+export async function submitJob(
+  body: Record<string, unknown>
+): Promise<string> {
+  const res = await fetch("http://localhost:8000/jobs", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  });
+  if (!res.ok) {
+    throw new Error(`HTTP ${res.status}: ${res.statusText}`);
+  }
+  const data = await res.json();
+  if (data.status !== "success") {
+    throw new Error(data.message || "Job submission failed");
+  }
+  return data.job_id;
+}
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+AIVA Scene Detection Benchmark
+Compares the original every-frame /ai/scene_detect loop against the
+strided, downscaled fast mode (and the uncapped full mode), single
+process and split across time ranges
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from backend.vision.scenes import detect_scenes  # noqa: E402
+
+
+def make_clip(path, width=1280, height=720, fps=30, scenes=8, scene_s=2.5):
+    """Write a synthetic clip of differently coloured moving scenes"""
+    import cv2
+    import numpy as np
+
+    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+    out = cv2.VideoWriter(path, fourcc, fps, (width, height))
+    rng = np.random.default_rng(0)
+    cuts = []
+    frame_idx = 0
+    for s in range(scenes):
+        hue = (s * 47) % 180
+        hsv = np.zeros((height, width, 3), dtype=np.uint8)
+        hsv[..., 0] = (hue + rng.integers(0, 12, (height, width))) % 180
+        hsv[..., 1] = 200
+        hsv[..., 2] = rng.integers(80, 255, (height, width), dtype=np.uint8)
+        base = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+        if s:
+            cuts.append(frame_idx)
+        for i in range(int(fps * scene_s)):
+            out.write(np.roll(base, i * 6, axis=1))
+            frame_idx += 1
+    out.release()
+    return cuts
+
+
+def legacy_detect(input_path):
+    """The original endpoint loop: full-res HSV on every frame, 5000 frame cap"""
+    import cv2
+
+    cap = cv2.VideoCapture(input_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    prev_hist = None
+    scenes = []
+    frame_idx = 0
+    last_cut = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        hist = cv2.calcHist([hsv], [0], None, [180], [0, 180])
+        cv2.normalize(hist, hist, 0, 1, cv2.NORM_MINMAX)
+        if prev_hist is not None:
+            score = cv2.compareHist(prev_hist, hist, cv2.HISTCMP_CORREL)
+            if score < 0.6 and (frame_idx - last_cut) > fps:
+                scenes.append({"time": frame_idx / fps, "frame": frame_idx})
+                last_cut = frame_idx
+        prev_hist = hist
+        frame_idx += 1
+        if frame_idx > 5000:
+            break
+    cap.release()
+    return scenes, frame_idx
+
+
+def main():
+    clip = sys.argv[1] if len(sys.argv) > 1 else None
+    tmp_dir = tempfile.mkdtemp(prefix="aiva_bench_")
+    expected = None
+    if clip is None:
+        clip = os.path.join(tmp_dir, "scenes.mp4")
+        print(f"Generating synthetic 720p clip: {clip}")
+        expected = make_clip(clip)
+
+    # Ranges are only split for files over MIN_RANGE_FRAMES
+    workers = os.cpu_count() or 1
+    runs = [
+        ("legacy", lambda: legacy_detect(clip)),
+        ("full", lambda: detect_scenes(clip, mode="full", workers=1)),
+        ("fast s=5", lambda: detect_scenes(clip, mode="fast", stride=5, workers=1)),
+        ("fast s=10", lambda: detect_scenes(clip, mode="fast", stride=10, workers=1)),
+        (
+            f"fast s=5 x{workers}",
+            lambda: detect_scenes(clip, mode="fast", stride=5, workers=workers),
+        ),
+    ]
+
+    print("=" * 80)
+    print("AIVA SCENE DETECTION BENCHMARK")
+    print("=" * 80)
+    print(f"{'mode':12} {'frames':>7} {'fps':>9} {'speedup':>8} {'cuts':>5}  frames")
+    print("-" * 80)
+
+    baseline = None
+    reference = None
+    for name, run in runs:
+        start = time.perf_counter()
+        scenes, frames = run()
+        elapsed = time.perf_counter() - start
+        fps = frames / elapsed if elapsed else 0.0
+        if baseline is None:
+            baseline = fps
+            reference = [s["frame"] for s in scenes]
+        cut_frames = [s["frame"] for s in scenes]
+        print(
+            f"{name:12} {frames:>7} {fps:>9.1f} {fps / baseline:>7.2f}x "
+            f"{len(scenes):>5}  {cut_frames}"
+        )
+
+    print("-" * 80)
+    print(f"legacy cuts:   {reference}")
+    if expected is not None:
+        print(f"expected cuts: {expected}")
+    print("=" * 80)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
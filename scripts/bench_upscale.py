@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+AIVA Upscale Benchmark
+Compares the original upscale_ai operators (cv2.resize + GaussianBlur +
+addWeighted, all allocating) against the buffered UpscaleEngine, untiled
+and tiled. Each variant runs in its own process so peak RSS is comparable.
+
+Usage: bench_upscale.py [WIDTHxHEIGHT] [FRAMES]   (default 1920x1080, 60)
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+VARIANTS = ["legacy", "engine", "engine-tiled"]
+
+
+def legacy_ops():
+    """The original upscale_ai chain: a fresh cv2.resize output per frame"""
+    from backend.video.pipeline import FrameOp, Sharpen
+
+    class Resize2x(FrameOp):
+        def setup(self, width, height, fps):
+            self.target = (width * 2, height * 2)
+            return self.target
+
+        def apply(self, frame):
+            import cv2
+
+            return cv2.resize(frame, self.target, interpolation=cv2.INTER_CUBIC)
+
+    return [Resize2x(), Sharpen()]
+
+
+def run_variant(variant, width, height, frames):
+    """Transform-only loop (no decode/encode) over synthetic frames"""
+    import cv2
+    import numpy as np
+
+    from collections import deque
+
+    from backend.video.pipeline import UpscaleEngine, queue_depth
+
+    cv2.setNumThreads(1)
+    rng = np.random.default_rng(0)
+    source = cv2.GaussianBlur(
+        rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (5, 5), 2
+    )
+
+    if variant == "legacy":
+        ops = legacy_ops()
+    else:
+        ops = [UpscaleEngine(2, tile_rows=64 if variant == "engine-tiled" else 0)]
+    size = (width, height)
+    for op in ops:
+        size = op.setup(size[0], size[1], 30)
+    # Hold as many outputs as the threaded pipeline keeps in flight, so the
+    # allocating variant is charged for its queued frames too
+    depth = queue_depth(size[0] * size[1] * 3, 8) + 3
+    for op in ops:
+        op.reserve(depth)
+    inflight = deque(maxlen=depth)
+
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for i in range(frames):
+        frame = np.roll(source, i, axis=1)
+        for op in ops:
+            frame = op.apply(frame)
+        inflight.append(frame)
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        "variant": variant,
+        "output": f"{size[0]}x{size[1]}",
+        "inflight": depth,
+        "fps": frames / elapsed,
+        "mpix_s": frames * size[0] * size[1] / elapsed / 1e6,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": peak_rss / 1024,
+        "growth_mb": (peak_rss - base_rss) / 1024,
+    }
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--variant":
+        _, _, variant, size, frames = sys.argv
+        width, height = (int(v) for v in size.split("x"))
+        print(json.dumps(run_variant(variant, width, height, int(frames))))
+        return
+
+    size = sys.argv[1] if len(sys.argv) > 1 else "1920x1080"
+    frames = sys.argv[2] if len(sys.argv) > 2 else "60"
+
+    print("=" * 80)
+    print(f"AIVA UPSCALE BENCHMARK ({size} -> 2x, {frames} frames, 1 thread)")
+    print("=" * 80)
+    print(
+        f"{'variant':14} {'output':>10} {'queue':>5} {'fps':>7} {'Mpix/s':>8} "
+        f"{'peak RSS':>10} {'growth':>9}"
+    )
+    print("-" * 80)
+    for variant in VARIANTS:
+        result = subprocess.run(
+            [sys.executable, __file__, "--variant", variant, size, frames],
+            check=True,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        r = json.loads(result.stdout.strip().splitlines()[-1])
+        print(
+            f"{r['variant']:14} {r['output']:>10} {r['inflight']:>5} "
+            f"{r['fps']:>7.1f} {r['mpix_s']:>8.1f} "
+            f"{r['peak_rss_mb']:>8.0f}MB {r['growth_mb']:>7.0f}MB"
+        )
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+AIVA Voice Upload Benchmark
+Compares the JSON float-list /voice body against raw float32 / int16 / WAV
+uploads: client encode, server decode, and full request round trip
+"""
+
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from backend.audio.processor import decode_audio_bytes  # noqa: E402
+
+SR = 48000
+SECONDS = 5
+RUNS = 20
+
+
+def timed(fn, runs=RUNS):
+    """Median wall time of fn() in milliseconds"""
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+def main():
+    import soundfile as sf
+
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(SR * SECONDS) * 0.1).astype(np.float32)
+
+    wav = io.BytesIO()
+    sf.write(wav, audio, SR, format="WAV", subtype="PCM_16")
+    bodies = {
+        "json": json.dumps({"audio": audio.tolist(), "sr": SR}).encode(),
+        "f32": audio.astype("<f4").tobytes(),
+        "s16": (audio * 32767).astype("<i2").tobytes(),
+        "wav": wav.getvalue(),
+    }
+
+    def decode_json():
+        payload = json.loads(bodies["json"])
+        np.nan_to_num(np.array(payload["audio"], dtype=np.float32))
+
+    decoders = {
+        "json": decode_json,
+        "f32": lambda: decode_audio_bytes(bodies["f32"], "application/octet-stream"),
+        "s16": lambda: decode_audio_bytes(
+            bodies["s16"], "application/octet-stream", fmt="s16"
+        ),
+        "wav": lambda: decode_audio_bytes(bodies["wav"], "audio/wav"),
+    }
+    encoders = {
+        "json": lambda: json.dumps({"audio": audio.tolist(), "sr": SR}),
+        "f32": lambda: audio.astype("<f4").tobytes(),
+        "s16": lambda: (audio * 32767).astype("<i2").tobytes(),
+        "wav": lambda: sf.write(io.BytesIO(), audio, SR, format="WAV"),
+    }
+
+    print("=" * 80)
+    print(f"AIVA VOICE UPLOAD BENCHMARK ({SECONDS}s @ {SR} Hz, median of {RUNS})")
+    print("=" * 80)
+    print(f"{'body':6} {'bytes':>10} {'encode ms':>10} {'decode ms':>10}")
+    print("-" * 80)
+    for name in bodies:
+        print(
+            f"{name:6} {len(bodies[name]):>10} "
+            f"{timed(encoders[name]):>10.2f} {timed(decoders[name]):>10.2f}"
+        )
+
+    # Full round trip through the endpoint (includes transcription when a
+    # Whisper model is installed, so compare the difference between rows)
+    try:
+        from fastapi.testclient import TestClient
+
+        from backend.api import app
+    except Exception as e:
+        print(f"\nSkipping /voice round trip: {e}")
+        return
+
+    client = TestClient(app)
+    requests = {
+        "json": lambda: client.post(
+            "/voice",
+            content=bodies["json"],
+            headers={"Content-Type": "application/json"},
+        ),
+        "f32": lambda: client.post(
+            f"/voice?sr={SR}",
+            content=bodies["f32"],
+            headers={"Content-Type": "application/octet-stream"},
+        ),
+    }
+    print("-" * 80)
+    print(f"{'body':6} {'/voice round trip ms':>22}")
+    for name, send in requests.items():
+        print(f"{name:6} {timed(send, runs=5):>22.2f}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -33,19 +33,20 @@ def main():
     backend_dir = os.path.join(os.path.dirname(__file__), "..", "backend")
     api_path = os.path.join(backend_dir, "api.py")
     analysis_path = os.path.join(backend_dir, "analysis.py")
+    encoder_path = os.path.join(backend_dir, "video", "encoder.py")
 
     all_good = True
 
-    print("1. CHECKING OPENCV CODEC FIXES (api.py)")
+    print("1. CHECKING OPENCV CODEC FIXES (video/encoder.py)")
     print("-" * 80)
-    # Check that mp4v is used instead of vp80
+    # Check that the OpenCV fallback writer uses mp4v instead of vp80
     all_good &= check_file_contains(
-        api_path,
+        encoder_path,
         'fourcc = cv2.VideoWriter_fourcc(*"mp4v")',
         "Using mp4v codec (not vp80)",
     )
     # Verify vp80 is NOT in the actual code (only in comments/strings)
-    with open(api_path, "r", encoding="utf-8") as f:
+    with open(encoder_path, "r", encoding="utf-8") as f:
         lines = [
             l
             for l in f.readlines()
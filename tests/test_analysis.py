@@ -0,0 +1,12 @@
+from backend import analysis
+
+
+def test_stats_memo_keeps_the_most_recently_used(monkeypatch):
+    monkeypatch.setattr(analysis, "_stats_memo", analysis.OrderedDict())
+    monkeypatch.setattr(analysis, "STATS_MEMO_ENTRIES", 3)
+    for name in "abcd":
+        analysis._remember(name, {"name": name})
+    assert list(analysis._stats_memo) == ["b", "c", "d"]
+    analysis._remember("b", {"name": "b"})
+    analysis._remember("e", {"name": "e"})
+    assert list(analysis._stats_memo) == ["d", "b", "e"]
@@ -0,0 +1,90 @@
+import os
+import threading
+
+import pytest
+
+from backend.cache import build_once, entry_key, evict_lru, touch
+
+
+def test_entry_key_matches_list_and_tuple_parts():
+    identity = ("/media/a.mp4", 10, 20)
+    assert entry_key(identity, 320) == entry_key(list(identity), 320)
+    assert entry_key(identity, 320) != entry_key(identity, 160)
+
+
+def test_build_once_writes_through_a_per_process_temp(tmp_path):
+    path = str(tmp_path / "entry.npy")
+    seen = []
+
+    def write(tmp):
+        seen.append(tmp)
+        with open(tmp, "w") as f:
+            f.write("data")
+
+    assert build_once(path, write, 1 << 20, suffix=".npy") == path
+    assert seen == [f"{path}.{os.getpid()}.tmp.npy"]
+    assert open(path).read() == "data"
+    # A hit does not build again
+    build_once(path, write, 1 << 20, suffix=".npy")
+    assert len(seen) == 1
+    assert os.listdir(tmp_path) == ["entry.npy"]
+
+
+def test_build_once_runs_one_build_for_concurrent_callers(tmp_path):
+    path = str(tmp_path / "entry.bin")
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def write(tmp):
+        calls.append(tmp)
+        started.set()
+        release.wait()
+        with open(tmp, "w") as f:
+            f.write("x")
+
+    first = threading.Thread(target=build_once, args=(path, write, 1 << 20))
+    first.start()
+    started.wait()
+    results = []
+    second = threading.Thread(
+        target=lambda: results.append(build_once(path, write, 1 << 20))
+    )
+    second.start()
+    release.set()
+    first.join()
+    second.join()
+    assert results == [path]
+    assert len(calls) == 1
+
+
+def test_failed_build_leaves_nothing_and_can_be_retried(tmp_path):
+    path = str(tmp_path / "entry.bin")
+
+    def fail(tmp):
+        open(tmp, "w").close()
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        build_once(path, fail, 1 << 20)
+    assert os.listdir(tmp_path) == []
+
+    build_once(path, lambda tmp: open(tmp, "w").close(), 1 << 20)
+    assert os.path.exists(path)
+
+
+def test_eviction_skips_temp_files(tmp_path):
+    for name in ("a.npy", "b.npy.123.tmp.npy"):
+        with open(tmp_path / name, "wb") as f:
+            f.write(b"0" * 100)
+    evict_lru(str(tmp_path), 0, suffix=".npy")
+    assert os.listdir(tmp_path) == ["b.npy.123.tmp.npy"]
+
+
+def test_touch_marks_entries_as_recently_used(tmp_path):
+    path = str(tmp_path / "entry.mp4")
+    assert not touch(path)
+    open(path, "w").close()
+    os.utime(path, (0, 0))
+    assert touch(path)
+    assert os.stat(path).st_mtime > 0
@@ -0,0 +1,119 @@
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+from backend.video import extend
+from backend.video.extend import extend_video, tail_options
+
+pytestmark = pytest.mark.skipif(not shutil.which("ffmpeg"), reason="needs ffmpeg")
+
+H264 = {"codec": "h264", "profile": "High", "pix_fmt": "yuv420p", "level": 31}
+MPEG4 = {
+    "codec": "mpeg4",
+    "profile": "Simple Profile",
+    "pix_fmt": "yuv420p",
+    "level": 1,
+}
+
+
+@pytest.fixture
+def clip(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10.0, (64, 48))
+    for i in range(20):
+        out.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    out.release()
+    return path
+
+
+@pytest.fixture
+def reencoded(monkeypatch):
+    calls = []
+
+    def fake(input_path, output_path, seconds, progress=None, cancel=None):
+        calls.append(input_path)
+        return -1
+
+    monkeypatch.setattr(extend, "_reencode", fake)
+    return calls
+
+
+def frame_count(path):
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while cap.grab():
+        count += 1
+    cap.release()
+    return count
+
+
+def test_tail_options_match_profile_and_level():
+    assert tail_options("libx264", H264) == ["-profile:v", "high", "-level:v", "3.1"]
+    hevc = {"codec": "hevc", "profile": "Main", "pix_fmt": "yuv420p", "level": 93}
+    assert tail_options("libx265", hevc) == [
+        "-profile:v",
+        "main",
+        "-x265-params",
+        "level-idc=3.1",
+    ]
+    assert tail_options("mpeg4", MPEG4) == []
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"pix_fmt": "yuv420p10le", "profile": "High 10"},
+        {"pix_fmt": "yuv444p", "profile": "High 4:4:4 Predictive"},
+        {"profile": "High 4:2:2"},
+    ],
+)
+def test_tail_options_refuse_other_layouts(changes):
+    assert tail_options("libx264", {**H264, **changes}) is None
+
+
+def test_unprobed_source_is_reencoded(clip, tmp_path, monkeypatch, reencoded):
+    monkeypatch.setattr(extend, "stream_info", lambda path: None)
+    assert extend_video(clip, str(tmp_path / "out.mp4")) == -1
+    assert reencoded == [clip]
+
+
+def test_ten_bit_source_is_reencoded(clip, tmp_path, monkeypatch, reencoded):
+    info = {**H264, "pix_fmt": "yuv420p10le", "profile": "High 10", "duration": 2.0}
+    monkeypatch.setattr(extend, "stream_info", lambda path: info)
+    assert extend_video(clip, str(tmp_path / "out.mp4")) == -1
+    assert reencoded == [clip]
+
+
+def test_failed_concat_goes_straight_to_reencode(
+    clip, tmp_path, monkeypatch, reencoded
+):
+    # No concat_segments-style fallback first: the clip is encoded once
+    monkeypatch.setattr(extend, "stream_info", lambda path: {**MPEG4, "duration": 2.0})
+
+    def broken(paths, output_path, audio_from=None):
+        raise RuntimeError("concat failed")
+
+    monkeypatch.setattr(extend, "concat_copy", broken)
+    monkeypatch.setattr(
+        "backend.video.segments.render_concat",
+        lambda *a, **k: pytest.fail("segments were re-encoded"),
+    )
+    assert extend_video(clip, str(tmp_path / "out.mp4")) == -1
+    assert reencoded == [clip]
+
+
+def test_stream_copy_appends_the_tail(clip, tmp_path, monkeypatch, reencoded):
+    monkeypatch.setattr(extend, "stream_info", lambda path: {**MPEG4, "duration": None})
+    output = str(tmp_path / "out.mp4")
+    assert extend_video(clip, output, seconds=1.0) == 10
+    assert reencoded == []
+    assert frame_count(output) == 30
+
+
+def test_changed_stream_is_reencoded(clip, tmp_path, monkeypatch, reencoded):
+    infos = iter([{**MPEG4, "duration": None}, {**MPEG4, "profile": "Advanced Simple"}])
+    monkeypatch.setattr(extend, "stream_info", lambda path: next(infos))
+    assert extend_video(clip, str(tmp_path / "out.mp4")) == -1
+    assert reencoded == [clip]
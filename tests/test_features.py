@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+
+from backend import features
+from backend.vision.scenes import detect_scenes
+from tests.test_scenes import clip  # noqa: F401
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(features, "DB_PATH", str(tmp_path / "features.sqlite"))
+    monkeypatch.setattr(features, "_schema_ready", False)
+    return str(tmp_path / "features.sqlite")
+
+
+def used(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [r[0] for r in conn.execute("SELECT used FROM paths")]
+    finally:
+        conn.close()
+
+
+def test_lookup_only_rewrites_stale_use_times(db, tmp_path, monkeypatch):
+    path = tmp_path / "a.bin"
+    path.write_bytes(b"data")
+    conn = features._connect()
+    try:
+        digest = features.file_key(str(path), conn)
+        first = used(db)
+        monkeypatch.setattr(features.time, "time", lambda: first[0] + 60)
+        assert features.lookup_key(str(path), conn) == digest
+        assert used(db) == first
+        later = first[0] + features.USED_RESOLUTION_S
+        monkeypatch.setattr(features.time, "time", lambda: later)
+        features.lookup_key(str(path), conn)
+        assert used(db) == [later]
+    finally:
+        conn.close()
+
+
+def test_indexed_scenes_match_decoded_scenes(db, clip):  # noqa: F811
+    features.ingest(clip)
+    hues = features.get_hues(clip)
+    assert hues is not None and hues["hue"].dtype.name == "float32"
+    indexed = detect_scenes(clip, use_index=True, workers=1)
+    decoded = detect_scenes(clip, use_index=False, workers=1)
+    assert indexed == decoded
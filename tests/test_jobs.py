@@ -0,0 +1,30 @@
+import asyncio
+
+from backend.jobs import _offer
+
+
+def full_queue(size=3):
+    q = asyncio.Queue(maxsize=size)
+    for i in range(size):
+        q.put_nowait({"type": "progress", "n": i})
+    return q
+
+
+def drain(q):
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait())
+    return items
+
+
+def test_progress_is_dropped_when_the_queue_is_full():
+    q = full_queue()
+    _offer(q, {"type": "progress", "n": 9})
+    assert [e["n"] for e in drain(q)] == [0, 1, 2]
+
+
+def test_terminal_events_push_out_the_oldest():
+    q = full_queue()
+    for state in ("done", "error", "cancelled"):
+        _offer(q, {"type": state})
+    assert [e["type"] for e in drain(q)] == ["done", "error", "cancelled"]
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from backend.voice import long_form, whisper_engine
+from backend.voice.long_form import SR, _ModelPool, split_windows
+
+
+def tone(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, 0.2, int(seconds * SR)).astype(np.float32)
+
+
+def blocks_of(data, block_s):
+    size = max(1, int(block_s * SR))
+    return (data[i : i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("block_s", [0.37, 5.0, 100.0])
+def test_windows_cover_the_input_exactly(block_s):
+    data = tone(95.0)
+    windows = list(split_windows(blocks_of(data, block_s)))
+    assert np.array_equal(np.concatenate([w for _, w in windows]), data)
+    offset = 0
+    for start, window in windows:
+        assert start == pytest.approx(offset / SR)
+        offset += len(window)
+
+
+def test_window_lengths_stay_in_search_range():
+    windows = list(split_windows(blocks_of(tone(125.0), 5.0), window_s=30, search_s=6))
+    for _, window in windows[:-1]:
+        assert 24 * SR <= len(window) <= 30 * SR
+    assert len(windows[-1][1]) <= 30 * SR
+
+
+def test_cuts_land_in_quiet_gaps():
+    # Half-second pauses at 27 s and 55 s, inside each search region
+    data = tone(80.0)
+    for at in (27.0, 55.0):
+        data[int(at * SR) : int((at + 0.5) * SR)] = 0.0
+    windows = list(split_windows(blocks_of(data, 5.0), window_s=30, search_s=6))
+    cuts = [start for start, _ in windows[1:]]
+    assert len(cuts) == 2
+    assert 27.0 <= cuts[0] <= 27.5
+    assert 55.0 <= cuts[1] <= 55.5
+
+
+def test_block_size_does_not_move_cuts():
+    data = tone(70.0, seed=1)
+    starts = [s for s, _ in split_windows(blocks_of(data, 100.0))]
+    assert [s for s, _ in split_windows(blocks_of(data, 0.5))] == starts
+
+
+def test_short_input_is_one_window():
+    data = tone(3.0)
+    windows = list(split_windows(blocks_of(data, 1.0)))
+    assert len(windows) == 1
+    assert windows[0][0] == 0.0
+    assert np.array_equal(windows[0][1], data)
+
+
+def test_empty_input_yields_nothing():
+    assert list(split_windows(iter([]))) == []
+
+
+class FakeModel:
+    def transcribe(self, audio, fp16=False):
+        return {"segments": [{"start": 0.0, "end": 1.0, "text": " hi"}]}
+
+
+def fake_replicas(monkeypatch):
+    handed = {"out": [], "back": []}
+
+    def acquire(size):
+        m = FakeModel()
+        handed["out"].append(m)
+        return m
+
+    def shared(size=None):
+        raise AssertionError("long-form workers must not use the shared model")
+
+    monkeypatch.setattr(whisper_engine, "acquire_replica", acquire)
+    monkeypatch.setattr(
+        whisper_engine, "release_replica", lambda size, m: handed["back"].append(m)
+    )
+    monkeypatch.setattr(whisper_engine, "get_model", shared)
+    return handed
+
+
+def test_every_worker_gets_its_own_replica(monkeypatch):
+    import threading
+
+    handed = fake_replicas(monkeypatch)
+    pool = _ModelPool("tiny")
+    seen = []
+    threads = [
+        threading.Thread(target=lambda: seen.append(pool.get())) for _ in range(3)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(map(id, seen))) == 3
+    pool.close()
+    assert sorted(map(id, handed["back"])) == sorted(map(id, handed["out"]))
+
+
+def test_closing_the_stream_stops_the_decoder(monkeypatch):
+    handed = fake_replicas(monkeypatch)
+    state = {"closed": False}
+
+    def audio(file_path, block_s=5.0, sr=SR):
+        try:
+            while True:
+                yield tone(5.0)
+        finally:
+            state["closed"] = True
+
+    monkeypatch.setattr(long_form, "stream_audio", audio)
+    items = long_form.transcribe_long("endless.wav", workers=2, use_cache=False)
+    assert next(items)["type"] == "segment"
+    items.close()
+    assert state["closed"]
+    assert len(handed["back"]) == len(handed["out"])
@@ -0,0 +1,150 @@
+import cv2
+import numpy as np
+import pytest
+
+from backend.video.lut import (
+    compile_steps,
+    compose,
+    contrast_table,
+    gamma_table,
+    identity,
+    shift_table,
+)
+from backend.video.pipeline import (
+    ChannelShift,
+    Contrast,
+    CubeLUT,
+    Sharpen,
+    ToneLUT,
+    build_ops,
+    fuse_luts,
+)
+
+
+def random_frame(seed=0, shape=(48, 64)):
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, (*shape, 3), dtype=np.uint8)
+    # Every value on every channel, so the tables are checked at each input
+    frame[:4, :, :].reshape(-1, 3)[:256] = np.arange(256, dtype=np.uint8)[:, None]
+    return frame
+
+
+def run(ops, frame):
+    h, w = frame.shape[:2]
+    for op in ops:
+        w, h = op.setup(w, h, 30.0)
+    for op in ops:
+        frame = op.apply(frame)
+    return frame
+
+
+def test_compose_matches_two_lookups():
+    rng = np.random.default_rng(1)
+    first = rng.integers(0, 256, (256, 1, 3), dtype=np.uint8)
+    then = rng.integers(0, 256, (256, 1, 3), dtype=np.uint8)
+    frame = random_frame()
+    expected = cv2.LUT(cv2.LUT(frame, first), then)
+    assert np.array_equal(cv2.LUT(frame, compose(first, then)), expected)
+
+
+def test_identity_is_neutral():
+    table = gamma_table(1.8)
+    assert np.array_equal(compose(identity(), table), table)
+    assert np.array_equal(compose(table, identity()), table)
+
+
+@pytest.mark.parametrize("alpha,beta", [(1.2, 30), (1.1, 5), (0.5, -40), (2.0, 0)])
+def test_contrast_table_matches_convert_scale_abs(alpha, beta):
+    frame = random_frame()
+    expected = cv2.convertScaleAbs(frame, alpha=alpha, beta=beta)
+    assert np.array_equal(cv2.LUT(frame, contrast_table(alpha, beta)), expected)
+
+
+def test_shift_table_matches_saturating_add():
+    frame = random_frame()
+    expected = cv2.add(frame, (30, -10, 20, 0))
+    assert np.array_equal(cv2.LUT(frame, shift_table(30, -10, 20)), expected)
+
+
+def test_compile_steps_matches_sequential_tables():
+    frame = random_frame()
+    steps = [("contrast", 1.2, 30), ("shift", 30, -10, 20), ("gamma", 0.8)]
+    expected = frame
+    for table in (contrast_table(1.2, 30), shift_table(30, -10, 20), gamma_table(0.8)):
+        expected = cv2.LUT(expected, table)
+    assert np.array_equal(cv2.LUT(frame, compile_steps(steps)), expected)
+
+
+def test_compile_steps_rejects_unknown_step():
+    with pytest.raises(ValueError):
+        compile_steps([("blur", 3)])
+
+
+def contrasts():
+    return [Contrast(1.2, 30), Contrast(1.1, 5), Contrast(0.9, -3), Contrast(1.3, 0)]
+
+
+def test_cheap_run_is_fused_into_one_table():
+    fused = fuse_luts(contrasts())
+    assert len(fused) == 1 and type(fused[0]) is ToneLUT
+    frame = random_frame()
+    expected = run(contrasts(), frame.copy())
+    assert np.array_equal(run(fused, frame.copy()), expected)
+
+
+def test_expensive_fusion_is_skipped():
+    # Two cheap in-place ops beat one per-channel table
+    ops = [Contrast(1.2, 30), ChannelShift(30, -10, 20)]
+    assert fuse_luts(ops) == ops
+
+
+@pytest.mark.parametrize(
+    "actions",
+    [
+        ["color_boost", "cinematic_grade"],
+        ["color_boost", "smart_enhance", "cinematic_grade"],
+        ["cinematic_grade", "color_boost", "color_boost"],
+    ],
+)
+def test_fused_chain_matches_unfused(actions, monkeypatch):
+    frame = random_frame(2)
+    fused = run(build_ops(actions), frame.copy())
+    monkeypatch.setattr("backend.video.pipeline.fuse_luts", lambda ops: ops)
+    unfused_ops = build_ops(actions)
+    assert not any(type(op) is ToneLUT for op in unfused_ops)
+    assert np.array_equal(fused, run(unfused_ops, frame.copy()))
+
+
+def write_cube(path, size=9):
+    # Warm, slightly crushed grade: RGB out = f(RGB in)
+    grid = np.linspace(0.0, 1.0, size)
+    with open(path, "w") as f:
+        f.write(f"LUT_3D_SIZE {size}\n")
+        for b in grid:
+            for g in grid:
+                for r in grid:
+                    out = (min(1.0, r * 1.1), g**1.2, b * 0.9)
+                    f.write(" ".join(f"{v:.6f}" for v in out) + "\n")
+
+
+def test_tone_curve_is_folded_into_cube(tmp_path):
+    path = str(tmp_path / "grade.cube")
+    write_cube(path)
+    fused = fuse_luts([Contrast(1.1, 5), CubeLUT(path)])
+    assert len(fused) == 1 and isinstance(fused[0], CubeLUT)
+    assert fused[0].pre is not None
+
+    frame = random_frame(3)
+    got = run(fused, frame.copy()).astype(int)
+    expected = run([Contrast(1.1, 5), CubeLUT(path)], frame.copy()).astype(int)
+    # Both sample the dense grid; folding moves the tone curve from each
+    # pixel to each cell centre, so they agree to within two grid steps
+    step = 256 >> CubeLUT(path).bits
+    assert np.abs(got - expected).max() <= 2 * step
+    assert np.abs(got - expected).mean() < 1.5
+
+
+def test_non_tone_op_breaks_a_run():
+    ops = contrasts() + [Sharpen()] + contrasts()
+    kinds = [type(op).__name__ for op in fuse_luts(ops)]
+    assert kinds == ["ToneLUT", "Sharpen", "ToneLUT"]
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from backend.video.pipeline import _chain, _tail, build_ops
+
+
+def render_frames(ops, frames):
+    h, w = frames[0].shape[:2]
+    for op in ops:
+        w, h = op.setup(w, h, 10.0)
+    out = [_chain(ops, frame.copy()).copy() for frame in frames]
+    return out + [frame.copy() for frame in _tail(ops)]
+
+
+@pytest.mark.parametrize(
+    "actions",
+    [
+        ["extend_scene", "color_boost"],
+        ["extend_scene", "smart_enhance"],
+        ["extend_scene", "cinematic_grade", "color_adjust"],
+    ],
+)
+def test_tail_frames_are_graded_once(actions):
+    # Ops after extend_scene work in place; each tail frame must come out
+    # exactly like the last regular frame
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(40, 200, (24, 32, 3), dtype=np.uint8) for _ in range(3)]
+    out = render_frames(build_ops(actions), frames)
+    assert len(out) == 3 + 10
+    for frame in out[3:]:
+        assert np.array_equal(frame, out[2])
+
+
+def test_tail_is_empty_without_frames():
+    ops = build_ops(["extend_scene"])
+    ops[0].setup(32, 24, 10.0)
+    assert list(_tail(ops)) == []
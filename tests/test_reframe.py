@@ -0,0 +1,42 @@
+import numpy as np
+
+from backend.video.pipeline import SmartCrop
+from backend.vision.reframe import SubjectFollower
+
+W, H = 320, 180
+
+
+def frame_with_subject(x):
+    # Flat grey background with a textured block centred on column x
+    rng = np.random.default_rng(int(x))
+    frame = np.full((H, W, 3), 90, dtype=np.uint8)
+    block = rng.integers(0, 256, (60, 40, 3), dtype=np.uint8)
+    x0 = int(x) - 20
+    frame[60:120, x0 : x0 + 40] = block
+    return frame
+
+
+def test_follower_starts_on_the_subject():
+    follower = SubjectFollower(every=5, smoothing=10)
+    assert abs(follower.update(frame_with_subject(260)) * W - 260) < 20
+
+
+def test_smart_crop_follows_the_subject_in_one_pass():
+    op = SmartCrop(9 / 16, every=2, smoothing=3)
+    w, h = op.setup(W, H, 30.0)
+    assert (w, h) == (int(H * 9 / 16), H)
+    offsets = []
+    for i in range(60):
+        out = op.apply(frame_with_subject(40 + 4 * i))
+        assert out.shape == (H, w, 3)
+        assert 0 <= op.x1 <= W - w
+        offsets.append(op.x1)
+    assert offsets[0] == 0
+    assert offsets == sorted(offsets)
+    assert offsets[-1] > W - w - 20
+
+
+def test_smart_crop_is_a_plain_slice_when_nothing_to_follow():
+    op = SmartCrop(9 / 16)
+    op.setup(90, 160, 30.0)
+    assert op.follower is None
@@ -0,0 +1,81 @@
+import cv2
+import numpy as np
+import pytest
+
+from backend.vision.scenes import (
+    _scan_range,
+    detect_fast,
+    detect_full,
+    detect_scenes,
+    enforce_spacing,
+)
+
+FPS = 30.0
+FRAMES = 160
+# Shots change at these frames; 60 sits exactly on the range seam below
+CUTS = [23, 60, 101, 137]
+# BGR colours with clearly different hues, one per shot
+COLOURS = [(0, 0, 200), (0, 200, 0), (200, 0, 0), (0, 200, 200), (200, 0, 200)]
+
+
+@pytest.fixture(scope="module")
+def clip(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("scenes") / "shots.mp4")
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), FPS, (96, 64))
+    rng = np.random.default_rng(0)
+    shot = 0
+    for i in range(FRAMES):
+        if shot < len(CUTS) and i == CUTS[shot]:
+            shot += 1
+        frame = np.empty((64, 96, 3), dtype=np.uint8)
+        frame[:] = COLOURS[shot]
+        # A little texture so the encoder has something to do
+        noise = rng.integers(-8, 8, frame.shape)
+        out.write(np.clip(frame.astype(int) + noise, 0, 255).astype(np.uint8))
+    out.release()
+    return path
+
+
+def test_enforce_spacing_keeps_first_of_close_cuts():
+    assert enforce_spacing([40, 45, 80, 100, 111, 200], 30) == [40, 80, 111, 200]
+
+
+def test_enforce_spacing_counts_from_frame_zero():
+    assert enforce_spacing([10, 31, 50], 30) == [31]
+
+
+def test_enforce_spacing_sorts_and_handles_empty():
+    assert enforce_spacing([], 30) == []
+    assert enforce_spacing([200, 40], 30) == [40, 200]
+
+
+def test_full_and_fast_find_the_same_cuts(clip):
+    full, fps, frames = detect_full(clip)
+    assert full == CUTS
+    assert frames == FRAMES
+    for stride in (1, 5, 7):
+        fast, _, _ = detect_fast(clip, stride=stride)
+        assert fast == CUTS
+
+
+@pytest.mark.parametrize("mode,stride", [("full", 1), ("fast", 5), ("fast", 7)])
+@pytest.mark.parametrize("seam", [59, 60, 61])
+def test_split_scan_owns_each_cut_once(clip, mode, stride, seam):
+    # Cuts near the seam are seen by both overlapping scans but reported
+    # only by the range that owns them
+    overlap = 1 if mode == "full" else stride
+    first = _scan_range((clip, mode, stride, 160, 0.6, 0, seam, overlap))
+    second = _scan_range((clip, mode, stride, 160, 0.6, seam, None, overlap))
+    assert all(c < seam for c in first[0])
+    assert all(c >= seam for c in second[0])
+    assert first[2] == seam
+    assert second[2] == FRAMES
+    assert first[0] + second[0] == CUTS
+
+
+def test_detect_scenes_applies_spacing_once(clip):
+    scenes, frames = detect_scenes(clip, use_index=False, workers=1)
+    # Frame 23 falls inside the first second and is dropped
+    assert [s["frame"] for s in scenes] == enforce_spacing(CUTS, FPS) == CUTS[1:]
+    assert frames == FRAMES
+    assert [s["time"] for s in scenes] == pytest.approx([c / FPS for c in CUTS[1:]])
@@ -0,0 +1,98 @@
+from backend.video import segments
+from backend.video.segments import _PolledEvent, plan_segments
+
+
+def _check_cover(segments, total):
+    assert segments[0][0] == 0
+    assert segments[-1][1] == total
+    for (_, end), (start, _) in zip(segments, segments[1:]):
+        assert end == start
+    assert all(start < end for start, end in segments)
+
+
+def test_short_clip_is_one_segment():
+    assert plan_segments(500, [], workers=4) == [(0, 500)]
+
+
+def test_single_worker_is_one_segment():
+    assert plan_segments(10000, [0, 5000], workers=1) == [(0, 10000)]
+
+
+def test_even_split_without_keyframes():
+    segments = plan_segments(1200, [], workers=4)
+    assert segments == [(0, 300), (300, 600), (600, 900), (900, 1200)]
+
+
+def test_segment_count_limited_by_min_frames():
+    segments = plan_segments(1000, [], workers=8, min_frames=300)
+    assert len(segments) == 3
+    _check_cover(segments, 1000)
+
+
+def test_cuts_snap_to_nearest_keyframe():
+    keyframes = [0, 250, 290, 610, 880, 1200]
+    segments = plan_segments(1200, keyframes, workers=4)
+    assert segments == [(0, 290), (290, 610), (610, 880), (880, 1200)]
+
+
+def test_keyframes_outside_range_are_ignored():
+    segments = plan_segments(1200, [-10, 0, 600, 1200, 5000], workers=2)
+    assert segments == [(0, 600), (600, 1200)]
+
+
+def test_shared_nearest_keyframe_merges_segments():
+    # Every ideal cut snaps to the same keyframe: one cut, two segments
+    segments = plan_segments(1200, [0, 500], workers=4)
+    assert segments == [(0, 500), (500, 1200)]
+    _check_cover(segments, 1200)
+
+
+class CountingEvent:
+    def __init__(self):
+        self.flag = False
+        self.asked = 0
+
+    def is_set(self):
+        self.asked += 1
+        return self.flag
+
+
+def test_polled_event_asks_every_n_calls():
+    event = CountingEvent()
+    polled = _PolledEvent(event, every=10)
+    assert not any(polled.is_set() for _ in range(25))
+    assert event.asked == 3
+    event.flag = True
+    # Seen at the next poll, then remembered without asking again
+    assert [polled.is_set() for _ in range(5)] == [False] * 5
+    assert polled.is_set()
+    asked = event.asked
+    assert polled.is_set() and event.asked == asked
+
+
+def test_unknown_keyframes_render_in_one_pass(monkeypatch, tmp_path):
+    import cv2
+    import numpy as np
+
+    path = str(tmp_path / "clip.mp4")
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30.0, (64, 48))
+    for _ in range(10):
+        out.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    out.release()
+
+    calls = []
+
+    def fake_render(input_path, output_path, ops, **kwargs):
+        calls.append(kwargs)
+        return {"frames": 10}
+
+    monkeypatch.setattr(segments, "probe_keyframes", lambda p: [])
+    monkeypatch.setattr(
+        segments, "plan_segments", lambda total, keyframes, workers: [(0, 5), (5, 10)]
+    )
+    monkeypatch.setattr(segments, "render", fake_render)
+    frames = segments.render_parallel(
+        path, str(tmp_path / "out.mp4"), ["color_boost"], workers=2
+    )
+    assert frames == 10
+    assert len(calls) == 1 and calls[0]["audio_from"] == path
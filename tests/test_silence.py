@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from backend.audio.processor import (
+    SilenceDetector,
+    detect_silence,
+    detect_silence_intervals,
+    silence_ratio,
+)
+
+SR = 16000
+
+
+def reference_intervals(
+    data,
+    sr,
+    threshold=0.01,
+    release=2.0,
+    min_silence_len=0.5,
+    keep_padding=0.1,
+    frame_s=0.01,
+):
+    # Baseline: the same rules as SilenceDetector, as a plain per-frame loop
+    # over the whole signal at once
+    frame_len = max(1, int(sr * frame_s))
+    min_frames = int(round(min_silence_len / frame_s))
+    pad = int(round(keep_padding * sr))
+    levels = [
+        np.sqrt(np.mean(data[i : i + frame_len] ** 2))
+        for i in range(0, len(data), frame_len)
+    ]
+
+    def close(first, last, at_end):
+        if last - first < min_frames:
+            return []
+        start = first * frame_len
+        end = len(data) if at_end else last * frame_len
+        if start > 0:
+            start += pad
+        if not at_end:
+            end -= pad
+        return [(start / sr, end / sr)] if end > start else []
+
+    intervals = []
+    silent = False
+    opened = None
+    for i, level in enumerate(levels):
+        if not silent and level < threshold:
+            silent, opened = True, i
+        elif silent and level > threshold * release:
+            intervals += close(opened, i, False)
+            silent, opened = False, None
+    if silent:
+        intervals += close(opened, len(levels), True)
+    return intervals
+
+
+def speech_like(seed=0, seconds=12.0):
+    # Bursts of noise separated by pauses of varying length and level,
+    # including a level that hovers between the two thresholds
+    rng = np.random.default_rng(seed)
+    parts = []
+    for _ in range(int(seconds)):
+        parts.append(rng.normal(0, 0.2, int(SR * rng.uniform(0.2, 0.8))))
+        quiet = rng.choice([0.0, 0.005, 0.015])
+        parts.append(rng.normal(0, quiet, int(SR * rng.uniform(0.1, 1.2))))
+    return np.concatenate(parts)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_reference(seed):
+    data = speech_like(seed)
+    expected = reference_intervals(data, SR)
+    assert expected
+    got = detect_silence_intervals(data, SR)
+    np.testing.assert_allclose(np.array(got), np.array(expected))
+
+
+@pytest.mark.parametrize("block_s", [0.013, 0.5, 1.0, 100.0])
+def test_block_size_does_not_change_result(block_s):
+    data = speech_like(3)
+    whole = detect_silence_intervals(data, SR, block_s=100.0)
+    assert detect_silence_intervals(data, SR, block_s=block_s) == whole
+
+
+def test_trailing_silence_runs_to_end_of_file():
+    data = np.concatenate([np.full(SR, 0.3), np.zeros(SR)])
+    intervals = detect_silence_intervals(data, SR)
+    assert intervals == [(1.1, 2.0)]
+
+
+def test_short_pause_is_ignored():
+    data = np.concatenate([np.full(SR, 0.3), np.zeros(SR // 5), np.full(SR, 0.3)])
+    assert detect_silence_intervals(data, SR) == []
+
+
+def test_stereo_input_is_mixed_down():
+    mono = speech_like(4)
+    stereo = np.stack([mono, mono], axis=1)
+    detector = SilenceDetector(SR)
+    got = detector.feed(stereo) + detector.finish()
+    assert got == detect_silence_intervals(mono, SR)
+
+
+def test_detect_silence_ratio():
+    data = np.concatenate([np.zeros(SR), np.full(SR, 0.3)])
+    intervals = detect_silence_intervals(data, SR)
+    assert detect_silence(data, SR) == silence_ratio(intervals, 2.0)
+    assert detect_silence(data, SR) == pytest.approx(0.45)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from backend.video.pipeline import UpscaleEngine
+
+
+def frames(shape, count=3, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (*shape, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def upscale(engine, frame):
+    h, w = frame.shape[:2]
+    engine.setup(w, h, 30.0)
+    engine.reserve(2)
+    return engine.apply(frame).copy()
+
+
+@pytest.mark.parametrize("shape", [(72, 96), (67, 101), (9, 40)])
+@pytest.mark.parametrize("tile_rows", [1, 8, 13, 64])
+@pytest.mark.parametrize("sharpen", [True, False])
+def test_tiled_output_matches_untiled(shape, tile_rows, sharpen):
+    for frame in frames(shape):
+        full = upscale(UpscaleEngine(2, sharpen=sharpen, tile_rows=0), frame)
+        tiled = upscale(UpscaleEngine(2, sharpen=sharpen, tile_rows=tile_rows), frame)
+        assert np.array_equal(tiled, full)
+
+
+def test_output_size_and_auto_tiling():
+    engine = UpscaleEngine(2)
+    assert engine.setup(96, 72, 30.0) == (192, 144)
+    assert engine.tile_rows == 0
+    big = UpscaleEngine(2)
+    big.setup(3840, 2160, 30.0)
+    assert big.tile_rows > 0
+
+
+def test_ring_buffers_are_reused_after_reserve():
+    engine = UpscaleEngine(2, tile_rows=0)
+    engine.setup(32, 24, 30.0)
+    engine.reserve(3)
+    outputs = [engine.apply(f) for f in frames((24, 32), count=6)]
+    assert len({id(o) for o in outputs}) == 3
+    assert outputs[0] is outputs[3]